@@ -1,22 +1,57 @@
 # ai_player.py
 # AI玩家接口和实现
 
+import json
 import random
 import time
-from typing import List, Dict, Any, Tuple, Optional
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import List, Dict, Any, Tuple, Optional, Union
 from engine_info import Card, Action, GameStage, Player
 from openai import OpenAI
 from game_info import GameAction, GameInfoState, GamePlayerAction, GameResult
 import re
 from anthropic import Anthropic
+from profiling import phase
+from decision_session import DEFAULT_TOKEN_BUDGET, DecisionSession, estimate_tokens
+from prompts import (DECISION_DELTA_PROMPT_PATH, DECISION_MEMORY_PROMPT_PATH, DECISION_STATE_PROMPT_PATH,
+                     DECISION_SYSTEM_PROMPT_PATH, PromptLayout, prompt_text)
 
-DESISION_PROMPT_PATH = "prompt/decision_prompt.txt"
 REFLECT_PROMPT_PATH = "prompt/reflect_prompt.txt"
 REFLECT_ALL_PROMPT_PATH = "prompt/reflect_all_prompt.txt"
 RED = '\033[31m'
 RESET = '\033[0m'
 
 
+def _openai_usage(response: Any) -> Dict[str, int]:
+    """OpenAI 兼容接口的token用量；cached_tokens 为命中前缀缓存的输入token"""
+    usage = getattr(response, "usage", None)
+    if usage is None:
+        return {}
+    details = getattr(usage, "prompt_tokens_details", None)
+    return {
+        "input_tokens": usage.prompt_tokens or 0,
+        "output_tokens": usage.completion_tokens or 0,
+        "cached_tokens": (getattr(details, "cached_tokens", 0) or 0) if details else 0,
+        "cache_write_tokens": 0,
+    }
+
+
+def _anthropic_usage(response: Any) -> Dict[str, int]:
+    """Anthropic 接口的token用量；input_tokens 折算为包含缓存读写在内的总输入"""
+    usage = getattr(response, "usage", None)
+    if usage is None:
+        return {}
+    cached = getattr(usage, "cache_read_input_tokens", 0) or 0
+    written = getattr(usage, "cache_creation_input_tokens", 0) or 0
+    return {
+        "input_tokens": (usage.input_tokens or 0) + cached + written,
+        "output_tokens": usage.output_tokens or 0,
+        "cached_tokens": cached,
+        "cache_write_tokens": written,
+    }
+
+
 def prepare_game_state_for_log(game_state) -> Dict[str, Any]:
     """准备用于日志记录的游戏状态（避免循环引用）"""
     return {
@@ -45,6 +80,17 @@ def prepare_game_state_for_log(game_state) -> Dict[str, Any]:
     }
 
 
+@dataclass
+class ReflectionOutcome:
+    """一次反思请求的结果；content 为 None 表示请求失败"""
+    hand_number: int
+    game_result: str
+    prompt: str = ""
+    raw_response: str = ""
+    content: Optional[str] = None
+    error: str = ""
+
+
 class AIPlayer:
     """AI玩家基类,定义AI玩家接口"""
 
@@ -80,11 +126,40 @@ class AIPlayer:
         """在游戏结束后，根据游戏结果进行反思和学习"""
         raise NotImplementedError("子类必须实现此方法")
 
+    def request_reflection(self, game_state: GameInfoState, game_result: GameResult) -> Any:
+        """反思中可以放到后台线程的部分（如LLM请求），结果依次交给 apply_reflection 和 log_reflection
+
+        默认不拆分：这里只保存参数，由 apply_reflection 调用 reflect_on_game 完成整个反思。
+        """
+        return game_state, game_result
+
+    def apply_reflection(self, outcome: Any):
+        """在控制器线程中用反思结果更新记忆"""
+        self.reflect_on_game(*outcome)
+
+    def log_reflection(self, outcome: Any):
+        """在控制器线程中记录反思结果"""
+        pass
+
+    def reset_memory(self):
+        """清空跨牌局积累的记忆（复式赛每次轮换座位前调用），默认无状态"""
+        pass
+
+    def export_memory(self) -> Dict[str, Any]:
+        """导出跨牌局积累的记忆，用于检查点保存"""
+        return {}
+
+    def restore_memory(self, memory: Dict[str, Any]):
+        """从检查点恢复记忆"""
+        pass
+
 
 class LLMPlayer(AIPlayer):
     """由大语言模型驱动的AI玩家"""
 
-    def __init__(self, name: str, model_name: str, api_key: Optional[str] = None, base_url: Optional[str] = None, game_logger: Optional[Any] = None):
+    def __init__(self, name: str, model_name: str, api_key: Optional[str] = None, base_url: Optional[str] = None, game_logger: Optional[Any] = None,
+                 structured_output: bool = False, session_mode: bool = False,
+                 session_token_budget: int = DEFAULT_TOKEN_BUDGET):
         super().__init__(Player(name=name))
         self.model_name = model_name
         self.api_key = api_key
@@ -93,73 +168,170 @@ class LLMPlayer(AIPlayer):
         self.opinions = {}
         self.all_player_previous = '对他们还不了解'
         self.game_logger = game_logger  # 新增：日志记录器
+        self.metrics = None  # 运行指标注册表，由GameController注入
+        self.profiler = None  # 分阶段耗时分析器，由GameController注入
+        self.llm_scheduler = None  # 多牌桌共用的LLM请求调度器，由GameController注入
+        self.table_id = ""  # 所在牌桌（调度器按牌桌轮转），由GameController注入
+        # 是否使用服务端结构化输出（JSON Schema / 工具调用）把行动约束在合法范围内
+        self.structured_output = structured_output
+        # 多轮会话模式：同一手牌内后续决策只发送增量局面，会话按 session_token_budget 裁剪
+        self.session_mode = session_mode
+        self.session_token_budget = session_token_budget
+        self.session: Optional[DecisionSession] = None
+
+    def reset_memory(self):
+        """清空对其他玩家的印象"""
+        self.opinions = {}
+        self.all_player_previous = '对他们还不了解'
+        self.session = None
+
+    def export_memory(self) -> Dict[str, Any]:
+        return {"opinions": dict(self.opinions), "all_player_previous": self.all_player_previous}
+
+    def restore_memory(self, memory: Dict[str, Any]):
+        self.opinions = dict(memory.get("opinions", {}))
+        self.all_player_previous = memory.get("all_player_previous", self.all_player_previous)
+
+    def _metric_labels(self) -> Dict[str, str]:
+        return {"player": self.name, "model": self.model_name}
 
     def _call_llm_api(self, prompt: str) -> str:
         """调用大语言模型API获取响应"""
         raise NotImplementedError("子类必须实现此方法")
 
-    def _call_llm_api_with_metadata(self, prompt: str) -> Dict[str, str]:
-        """调用大语言模型API获取响应及元数据"""
+    def _call_llm_api_with_metadata(self, prompt: Union[str, PromptLayout],
+                                    response_schema: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """调用大语言模型API获取响应及元数据
+
+        Args:
+            prompt: 提示词；PromptLayout 时由子类拆成 system/user 消息并加上缓存提示
+            response_schema: 期望输出的JSON Schema，支持结构化输出的子类用它做约束解码
+
+        Returns:
+            content、reasoning_content，以及可选的 usage（input_tokens/output_tokens/cached_tokens/cache_write_tokens）
+        """
         # 默认实现，只返回内容
-        content = self._call_llm_api(prompt)
+        content = self._call_llm_api(prompt_text(prompt))
         return {"content": content, "reasoning_content": ""}
 
+    @contextmanager
+    def _llm_slot(self, kind: str, timings: Optional[Dict[str, float]] = None):
+        """设置了调度器时先排队取得名额（排队时间计入 llm_queue 阶段），请求结束后归还"""
+        if self.llm_scheduler is None:
+            yield
+            return
+        with phase(self.profiler, "llm_queue", timings):
+            ticket = self.llm_scheduler.acquire(self.model_name, self.base_url or "", self.table_id, kind)
+        try:
+            yield
+        finally:
+            self.llm_scheduler.release(ticket)
+
+    def _record_usage(self, usage: Dict[str, int], kind: str):
+        """累计token用量指标（含命中缓存的输入token）"""
+        if not self.metrics or not usage:
+            return
+        labels = {**self._metric_labels(), "kind": kind}
+        self.metrics.inc("llm_input_tokens_total", usage.get("input_tokens", 0), labels)
+        self.metrics.inc("llm_output_tokens_total", usage.get("output_tokens", 0), labels)
+        self.metrics.inc("llm_cached_tokens_total", usage.get("cached_tokens", 0), labels)
+
     def make_decision(self, game_state: GameInfoState) -> GamePlayerAction:
         print(f'玩家 {self.name} 正在思考...')
         print(f"他的手牌是：{', '.join(str(card) for card in self.player.hand)}")
         print(f"他的筹码量：{self.player.chips}")
 
-        prompt = ""
+        prompt: Union[str, PromptLayout] = ""
         raw_response = ""
         reasoning_content = ""
+        usage: Dict[str, int] = {}
         error = ""
         start_time = time.time()
         game_state_dict = prepare_game_state_for_log(game_state)
+        response_schema = None
+        # 各阶段累计耗时（含重试），与总的 response_time 一起写入决策日志
+        timings: Dict[str, float] = {}
+        if self.structured_output and game_state.legal_actions:
+            response_schema = game_state.legal_actions.to_json_schema()
 
         for i in range(3):
+            step = "prompt"
+            if i > 0 and self.metrics:
+                self.metrics.inc("llm_retries_total", labels=self._metric_labels())
             try:
                 # 构建提示信息
-                prompt = self._build_prompt(game_state)
+                with phase(self.profiler, "prompt_build", timings):
+                    prompt = self._build_prompt(game_state)
 
                 # 调用大语言模型获取决策
-                response_with_metadata = self._call_llm_api_with_metadata(prompt)
+                step = "api"
+                with self._llm_slot("decision", timings):
+                    call_start = time.time()
+                    with phase(self.profiler, "llm_network", timings):
+                        response_with_metadata = self._call_llm_api_with_metadata(prompt, response_schema)
                 raw_response = response_with_metadata.get("content", "")
                 reasoning_content = response_with_metadata.get("reasoning_content", "")
-
-                result = self._parse_response(raw_response, game_state)
+                usage = response_with_metadata.get("usage") or {}
+                self._record_usage(usage, "decision")
+                if self.metrics:
+                    self.metrics.observe("llm_call_seconds", time.time() - call_start,
+                                         {**self._metric_labels(), "kind": "decision"})
+
+                step = "parse"
+                with phase(self.profiler, "parse", timings):
+                    result = self._parse_response(raw_response, game_state)
+
+                if self.metrics:
+                    self.metrics.observe("decision_latency_seconds", time.time() - start_time,
+                                         self._metric_labels())
+                if self.session is not None and isinstance(prompt, PromptLayout):
+                    self.session.record(prompt.history, prompt.user_turn(), raw_response,
+                                        len(game_state.action_history))
 
                 # 记录决策过程到日志
                 if self.game_logger:
-                    self.game_logger.log_llm_decision(
-                        player_name=self.name,
-                        model_name=self.model_name,
-                        hand_number=game_state.hand_num,
-                        stage=game_state.stage,
-                        prompt=prompt,
-                        game_state=game_state_dict,
-                        raw_response=raw_response,
-                        parsed_action=result.action,
-                        action_amount=result.amount,
-                        play_reason=result.play_reason,
-                        behavior=result.behavior,
-                        reasoning_content=reasoning_content,
-                        response_time=time.time() - start_time,
-                        error=error
-                    )
+                    timings["attempts"] = i + 1
+                    with phase(self.profiler, "logging"):
+                        self.game_logger.log_llm_decision(
+                            player_name=self.name,
+                            model_name=self.model_name,
+                            hand_number=game_state.hand_num,
+                            stage=game_state.stage,
+                            prompt=prompt_text(prompt),
+                            game_state=game_state_dict,
+                            raw_response=raw_response,
+                            parsed_action=result.action,
+                            action_amount=result.amount,
+                            play_reason=result.play_reason,
+                            behavior=result.behavior,
+                            reasoning_content=reasoning_content,
+                            response_time=time.time() - start_time,
+                            error=error,
+                            timings=timings,
+                            usage=usage
+                        )
 
                 return result
             except Exception as e:
                 error = str(e)
                 print(e)
+                if self.metrics:
+                    failure = "parse_failures_total" if step == "parse" else "llm_errors_total"
+                    self.metrics.inc(failure, labels=self._metric_labels())
+
+        if self.metrics:
+            self.metrics.inc("decision_fallbacks_total", labels=self._metric_labels())
+            self.metrics.observe("decision_latency_seconds", time.time() - start_time, self._metric_labels())
 
         # 如果所有重试都失败，记录失败的决策
         if self.game_logger:
+            timings["attempts"] = 3
             self.game_logger.log_llm_decision(
                 player_name=self.name,
                 model_name=self.model_name,
                 hand_number=game_state.hand_num,
                 stage=game_state.stage,
-                prompt=prompt if prompt else "",
+                prompt=prompt_text(prompt) if prompt else "",
                 game_state=game_state_dict,
                 raw_response=raw_response if raw_response else "",
                 parsed_action=Action.FOLD,
@@ -168,7 +340,9 @@ class LLMPlayer(AIPlayer):
                 behavior='无表情',
                 reasoning_content=reasoning_content,
                 response_time=time.time() - start_time,
-                error=error
+                error=error,
+                timings=timings,
+                usage=usage
             )
 
         return GamePlayerAction(
@@ -178,9 +352,9 @@ class LLMPlayer(AIPlayer):
             behavior='无表情'
         )
 
-    def _build_prompt(self, game_state: GameInfoState) -> str:
-        """构建提示信息"""
-        basePrompt = self._read_file(DESISION_PROMPT_PATH)
+    def _build_prompt(self, game_state: GameInfoState) -> PromptLayout:
+        """构建提示信息：静态指令、对手印象、当前局面依次排列，便于服务端缓存公共前缀"""
+        system_prompt = self._read_file(DECISION_SYSTEM_PROMPT_PATH)
 
         # 生成游戏游戏相关信息
         game_info = game_state.get_common_game_info()
@@ -188,24 +362,50 @@ class LLMPlayer(AIPlayer):
         # 生成玩家当前信息
         self_info = self.get_self_current_round_info(game_state)
 
+        history: List[Dict[str, Any]] = []
+        if self.session_mode:
+            session = self._current_session(game_state)
+            if session.turns:
+                delta_prompt = self._read_file(DECISION_DELTA_PROMPT_PATH).format(
+                    new_actions=self.get_action_history(game_state.action_history[session.seen_actions:]) or "无",
+                    game_info=game_info,
+                    self_info=self_info
+                )
+                history, trimmed = session.fit(self.session_token_budget,
+                                               estimate_tokens(system_prompt) + estimate_tokens(delta_prompt))
+                # 丢弃过轮次时中间的行动已不在对话里，改为重新发送完整局面
+                if history and not trimmed:
+                    return PromptLayout(system=system_prompt, memory="", state=delta_prompt, history=history,
+                                        cache_state=True)
+
         # 生成所有玩家信息
         player_info = self.get_all_player_info(game_state)
 
         # 生成当前轮次的对局历史
         action_history = self.get_action_history(game_state.action_history)
 
-        # 生成当前玩家对其他人物的评估
-        player_performance = self.get_player_performance(game_state.players_info)
-
-        prompt = basePrompt.format(
+        state = self._read_file(DECISION_STATE_PROMPT_PATH).format(
             game_info=game_info,
             self_info=self_info,
             player_info=player_info,
-            action_history=action_history,
-            player_performance=self.all_player_previous
+            action_history=action_history
+        )
+        if history:
+            return PromptLayout(system=system_prompt, memory="", state=state, history=history, cache_state=True)
+        memory_prompt = self._read_file(DECISION_MEMORY_PROMPT_PATH)
+        return PromptLayout(
+            system=system_prompt,
+            memory=memory_prompt.format(player_performance=self.all_player_previous),
+            state=state,
+            cache_state=self.session_mode
         )
 
-        return prompt
+    def _current_session(self, game_state: GameInfoState) -> DecisionSession:
+        """当前这手牌的会话；手数或手牌变化时开始新的会话（复式赛重开牌桌时手数会从头计数）"""
+        hand_key = (game_state.hand_num, tuple(str(card) for card in game_state.hand))
+        if self.session is None or self.session.hand_key != hand_key:
+            self.session = DecisionSession(hand_key)
+        return self.session
 
     def _parse_response(self, response: str, game_state: GameInfoState) -> GamePlayerAction:
         """解析大语言模型的响应"""
@@ -244,10 +444,14 @@ class LLMPlayer(AIPlayer):
             elif action_str == 'RAISE':
                 # 确保加注金额合法
                 min_raise = max(game_state.min_raise, game_state.current_bet * 2)
-                amount = max(min_raise, amount)  # 确保金额不小于最小加注
+                amount = max(min_raise, int(amount or 0))  # 确保金额不小于最小加注
                 amount = min(amount, self.player.chips)  # 确保金额不超过玩家筹码
                 action = Action.RAISE
 
+            # 按引擎给出的合法行动就地修正（如面对下注时的CHECK、低于下限的加注）
+            if game_state.legal_actions:
+                action, amount = game_state.legal_actions.coerce(action, amount)
+
             return GamePlayerAction(
                 action=action,
                 amount=amount,
@@ -258,6 +462,12 @@ class LLMPlayer(AIPlayer):
             raise ValueError("无法从响应中提取有效数据")
 
     def reflect_on_game(self, game_state: GameInfoState, game_result: GameResult):
+        outcome = self.request_reflection(game_state, game_result)
+        self.apply_reflection(outcome)
+        self.log_reflection(outcome)
+
+    def request_reflection(self, game_state: GameInfoState, game_result: GameResult) -> ReflectionOutcome:
+        """构建反思提示词并请求LLM，不修改记忆、不写日志（可在后台线程执行）"""
         print(f'玩家 {self.name} 正在反思和总结...')
         # 生成当前轮次的对局历史
         action_history = self.get_action_history(game_state.action_history)
@@ -268,47 +478,50 @@ class LLMPlayer(AIPlayer):
 
         # 使用一次调用为所有玩家进行分析
         basePrompt = self._read_file(REFLECT_ALL_PROMPT_PATH)
-        prompt = ""
-        raw_response = ""
+        outcome = ReflectionOutcome(hand_number=game_state.hand_num, game_result=result_str)
+        start_time = time.time()
         try:
-            prompt = basePrompt.format(
+            outcome.prompt = basePrompt.format(
                 self_name=self.player.name,
                 user_info=player_info,
                 action_history=action_history,
                 game_result=result_str,
                 previous_opinion=self.all_player_previous
             )
-            response_with_metadata = self._call_llm_api_with_metadata(prompt)
-            raw_response = response_with_metadata.get("content", "")
-            content = raw_response
-            # 更新对其他玩家的印象
-            self.all_player_previous = content.strip()
-            print(f"{self.name} 更新了对其他玩家的印象: {content}")
-
-            # 记录反思过程到日志
-            if self.game_logger:
-                self.game_logger.log_llm_reflection(
-                    player_name=self.name,
-                    model_name=self.model_name,
-                    hand_number=game_state.hand_num,
-                    prompt=prompt,
-                    game_result=result_str,
-                    raw_response=raw_response,
-                    updated_opinions={"all_players": content}
-                )
+            with self._llm_slot("reflection"):
+                response_with_metadata = self._call_llm_api_with_metadata(outcome.prompt)
+            outcome.raw_response = response_with_metadata.get("content", "")
+            outcome.content = outcome.raw_response
+            self._record_usage(response_with_metadata.get("usage") or {}, "reflection")
+            if self.metrics:
+                self.metrics.observe("reflection_latency_seconds", time.time() - start_time, self._metric_labels())
         except Exception as e:
+            outcome.error = str(e)
             print(f"反思自己时出错: {str(e)}")
-            # 记录反思错误到日志
-            if self.game_logger:
-                self.game_logger.log_llm_reflection(
-                    player_name=self.name,
-                    model_name=self.model_name,
-                    hand_number=game_state.hand_num,
-                    prompt=prompt if prompt else "",
-                    game_result=result_str,
-                    raw_response=raw_response if raw_response else "",
-                    updated_opinions={}
-                )
+            if self.metrics:
+                self.metrics.inc("reflection_errors_total", labels=self._metric_labels())
+        return outcome
+
+    def apply_reflection(self, outcome: ReflectionOutcome):
+        """用反思结果更新对其他玩家的印象"""
+        if outcome.content is None:
+            return
+        self.all_player_previous = outcome.content.strip()
+        print(f"{self.name} 更新了对其他玩家的印象: {outcome.content}")
+
+    def log_reflection(self, outcome: ReflectionOutcome):
+        """记录反思过程到日志（出错时 updated_opinions 为空）"""
+        if not self.game_logger:
+            return
+        self.game_logger.log_llm_reflection(
+            player_name=self.name,
+            model_name=self.model_name,
+            hand_number=outcome.hand_number,
+            prompt=outcome.prompt,
+            game_result=outcome.game_result,
+            raw_response=outcome.raw_response,
+            updated_opinions={"all_players": outcome.content} if outcome.content is not None else {}
+        )
 
     def _read_file(self, filepath: str) -> str:
         """读取文件内容"""
@@ -320,11 +533,14 @@ class LLMPlayer(AIPlayer):
             return ""
 
     def get_self_current_round_info(self, game_state: GameInfoState) -> str:
+        features = game_state.get_hand_features_info(self.player)
+        features_line = f"\n        - 你的牌力：{features}" if features else ""
         return f"""
-        - 你的手牌：{', '.join(str(card) for card in self.player.hand)}
+        - 你的手牌：{', '.join(str(card) for card in self.player.hand)}{features_line}
         - 你已下注：{self.player.bet_in_round}
         - 你的剩余筹码：{self.player.chips}
         - 你的位置：{game_state.position}
+        - 你当前可选的行动：{game_state.legal_actions.describe() if game_state.legal_actions else '任意'}
         """
 
     def get_all_player_info(self, game_state: GameInfoState) -> str:
@@ -333,7 +549,10 @@ class LLMPlayer(AIPlayer):
             is_self = player_info.name == self.player.name
             position_str = "(你)" if is_self else ""
             dealer_str = "(庄家)" if i == game_state.dealer_position else ""
-            prompt += f"- 玩家{position_str}{dealer_str}: {player_info.name},位置：{i}, 剩余筹码: {player_info.chips}, 已下注: {player_info.bet_in_round}, {'已弃牌' if player_info.folded else '未弃牌'}, {'已全押' if player_info.all_in else '未全押'}\n"
+            stats = game_state.player_stats.describe(player_info.name) \
+                if game_state.player_stats and not is_self else ""
+            stats_str = f", 历史统计: {stats}" if stats else ""
+            prompt += f"- 玩家{position_str}{dealer_str}: {player_info.name},位置：{i}, 剩余筹码: {player_info.chips}, 已下注: {player_info.bet_in_round}, {'已弃牌' if player_info.folded else '未弃牌'}, {'已全押' if player_info.all_in else '未全押'}{stats_str}\n"
         return prompt
 
     def get_action_history(self, action_history: List[GameAction]) -> str:
@@ -382,18 +601,32 @@ class OpenAiLLMUser(LLMPlayer):
             print(f"{RED} LLM推理内容: {content} {RESET}")
             return content
 
-    def _call_llm_api_with_metadata(self, prompt: str) -> Dict[str, str]:
-        """调用OpenAI兼容接口，返回内容和推理内容"""
+    def _call_llm_api_with_metadata(self, prompt: Union[str, PromptLayout],
+                                    response_schema: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """调用OpenAI兼容接口，返回内容、推理内容和token用量"""
         if self.client is None:
             self.client = OpenAI(api_key=self.api_key, base_url=self.base_url)
 
-        messages = [
-            {"role": "user", "content": prompt}
-        ]
+        # 服务端自动缓存最长公共前缀：静态指令放在 system 消息，变化的局面放在最后
+        if isinstance(prompt, PromptLayout):
+            messages = prompt.openai_messages()
+        else:
+            messages = [
+                {"role": "user", "content": prompt}
+            ]
+
+        extra_args = {}
+        if response_schema:
+            # 结构化输出：服务端按 JSON Schema 约束解码，行动只能取合法枚举值
+            extra_args["response_format"] = {
+                "type": "json_schema",
+                "json_schema": {"name": "poker_decision", "schema": response_schema, "strict": True}
+            }
 
         response = self.client.chat.completions.create(
             model=self.model_name,
-            messages=messages
+            messages=messages,
+            **extra_args
         )
 
         if response.choices:
@@ -405,10 +638,11 @@ class OpenAiLLMUser(LLMPlayer):
             print(f"{RED} LLM回复内容: {content} {RESET}")
             return {
                 "content": content,
-                "reasoning_content": reasoning_content
+                "reasoning_content": reasoning_content,
+                "usage": _openai_usage(response)
             }
 
-        return {"content": "", "reasoning_content": ""}
+        return {"content": "", "reasoning_content": "", "usage": _openai_usage(response)}
 
 
 class AnthropicLLMUser(LLMPlayer):
@@ -435,20 +669,41 @@ class AnthropicLLMUser(LLMPlayer):
 
             return content
 
-    def _call_llm_api_with_metadata(self, prompt: str) -> Dict[str, str]:
-        """调用Anthropic接口，返回内容"""
+    def _call_llm_api_with_metadata(self, prompt: Union[str, PromptLayout],
+                                    response_schema: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """调用Anthropic接口，返回内容和token用量"""
         if self.client is None:
             self.client = Anthropic(api_key=self.api_key, base_url=self.base_url)
 
-        messages = [
-            {"role": "user", "content": prompt}
-        ]
+        # 静态指令与对手印象后各设一个缓存断点，之后的请求只需按全价计算当前局面部分
+        if isinstance(prompt, PromptLayout):
+            extra_args = prompt.anthropic_request()
+        else:
+            extra_args = {"messages": [
+                {"role": "user", "content": prompt}
+            ]}
+
+        if response_schema:
+            # 强制调用决策工具，由工具的 input_schema 约束行动取值
+            extra_args["tools"] = [{
+                "name": "poker_decision",
+                "description": "提交本次德州扑克决策",
+                "input_schema": response_schema
+            }]
+            extra_args["tool_choice"] = {"type": "tool", "name": "poker_decision"}
 
         response = self.client.messages.create(
             max_tokens=1024,
             model=self.model_name,
-            messages=messages
+            **extra_args
         )
+        usage = _anthropic_usage(response)
+
+        tool_use = next((block for block in response.content if block.type == "tool_use"), None)
+        if tool_use is not None:
+            content = json.dumps(tool_use.input, ensure_ascii=False)
+            print(f"{RED} LLM回复内容: {content} {RESET}")
+            return {"content": content, "reasoning_content": "", "usage": usage}
 
         if response.content:
             message = response.content[0]
@@ -456,7 +711,8 @@ class AnthropicLLMUser(LLMPlayer):
             print(f"{RED} LLM回复内容: {content} {RESET}")
             return {
                 "content": content,
-                "reasoning_content": ""  # Anthropic不提供单独的推理内容字段
+                "reasoning_content": "",  # Anthropic不提供单独的推理内容字段
+                "usage": usage
             }
 
-        return {"content": "", "reasoning_content": ""}
+        return {"content": "", "reasoning_content": "", "usage": usage}
@@ -3,8 +3,234 @@
 
 import json
 import os
-from typing import Dict, List, Any
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from typing import Dict, List, Any, Callable, Optional
 from collections import defaultdict
+from log_reader import EnhancedLogReader, DECISION_TEXT_FIELDS, REFLECTION_TEXT_FIELDS, iter_game_log
+from hand_history import HandHistoryReader
+from player_stats import PlayerStatsTracker, stats_from_records
+from hand_evaluator import calculate_equity, parse_cards
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # 列式导出为可选功能，未安装 pyarrow 时不影响其他分析
+    pa = None
+    pq = None
+
+# 统计决策模式时需要的字段，其余字段（尤其是大文本）在流式读取时直接跳过
+PATTERN_FIELDS = ("player_name", "model_name", "stage", "parsed_action", "response_time")
+
+
+def _normalize_action(action: str) -> str:
+    """统一行动名称：日志中既可能是 Action.value（如 "all-in"），也可能是大写名称（如 "ALL_IN"）"""
+    return (action or "").upper().replace("-", "_")
+
+
+def _new_partial_stats() -> Dict[str, Any]:
+    """创建空的局部统计结构（map 阶段的输出单元）"""
+    return {
+        "decisions": 0,
+        "total_response_time": 0.0,
+        "actions": defaultdict(int),
+        "stages": defaultdict(lambda: defaultdict(int)),
+    }
+
+
+def _summarize_log_file(path: str, start_date: Optional[datetime] = None, end_date: Optional[datetime] = None,
+                        models: Optional[List[str]] = None) -> Optional[Dict[str, Any]]:
+    """在工作进程中汇总单个日志文件的决策统计，不满足过滤条件时返回 None"""
+    reader = EnhancedLogReader(path)
+    metadata = reader.read_metadata(["game_id", "start_time"])
+    start_time = metadata.get("start_time", "")
+    if start_date or end_date:
+        try:
+            game_time = datetime.fromisoformat(start_time)
+        except ValueError:
+            return None
+        if (start_date and game_time < start_date) or (end_date and game_time >= end_date):
+            return None
+
+    players = defaultdict(_new_partial_stats)
+    model_stats = defaultdict(_new_partial_stats)
+    for decision in reader.iter_decisions(fields=PATTERN_FIELDS):
+        model_name = decision.get("model_name", "unknown")
+        if models and model_name not in models:
+            continue
+        action = decision.get("parsed_action", "")
+        response_time = decision.get("response_time", 0) or 0
+        for stats in (players[decision.get("player_name", "")], model_stats[model_name]):
+            stats["decisions"] += 1
+            stats["total_response_time"] += response_time
+            stats["actions"][action] += 1
+            stats["stages"][decision.get("stage", "")][action] += 1
+
+    return {
+        "game_id": metadata.get("game_id", ""),
+        "hands": max((e.get("hand_number", 0) for e in reader.iter_events(fields=["hand_number"])), default=0),
+        "players": {name: _freeze_partial_stats(stats) for name, stats in players.items()},
+        "models": {name: _freeze_partial_stats(stats) for name, stats in model_stats.items()},
+    }
+
+
+def _freeze_partial_stats(stats: Dict[str, Any]) -> Dict[str, Any]:
+    """将 defaultdict 转为普通 dict，便于跨进程传递"""
+    return {
+        "decisions": stats["decisions"],
+        "total_response_time": stats["total_response_time"],
+        "actions": dict(stats["actions"]),
+        "stages": {stage: dict(actions) for stage, actions in stats["stages"].items()},
+    }
+
+
+def _merge_partial_stats(target: Dict[str, Any], partial: Dict[str, Any]):
+    """reduce 阶段：把一个局部统计合并进汇总结果"""
+    target["decisions"] += partial["decisions"]
+    target["total_response_time"] += partial["total_response_time"]
+    for action, count in partial["actions"].items():
+        target["actions"][action] += count
+    for stage, actions in partial["stages"].items():
+        for action, count in actions.items():
+            target["stages"][stage][action] += count
+
+
+def _finalize_stats(stats: Dict[str, Any]) -> Dict[str, Any]:
+    """根据汇总计数计算与 analyze_decision_patterns / compare_models 一致的比率指标"""
+    total = stats["decisions"]
+    actions = defaultdict(int)
+    for action, count in stats["actions"].items():
+        actions[_normalize_action(action)] += count
+
+    def rate(count: float) -> float:
+        return count / total if total > 0 else 0
+
+    return {
+        "total_decisions": total,
+        "action_distribution": dict(stats["actions"]),
+        "stage_action_distribution": {stage: dict(a) for stage, a in stats["stages"].items()},
+        "avg_response_time": rate(stats["total_response_time"]),
+        "aggression_score": rate(actions["RAISE"] + actions["ALL_IN"]),
+        "aggression_rate": rate(actions["RAISE"]),
+        "fold_rate": rate(actions["FOLD"]),
+        "call_rate": rate(actions["CALL"]),
+    }
+
+
+def _collect_known_hands(reader: EnhancedLogReader, decisions: List[Dict[str, Any]]) -> Dict[int, Dict[str, List[str]]]:
+    """汇总每手牌中各玩家的真实底牌（来自各玩家自己的决策记录以及摊牌/结算事件）"""
+    known = defaultdict(dict)
+    for decision in decisions:
+        hand = decision.get("game_state", {}).get("hand")
+        if hand:
+            known[decision["hand_number"]][decision["player_name"]] = hand
+    for event in reader.iter_events(fields=["type", "hand_number", "players"]):
+        if event.get("type") not in (1, 4, 6):
+            continue
+        for player in event.get("players", []):
+            name = player.get("name", player.get("player_name"))
+            if name and player.get("hand"):
+                known[event.get("hand_number", 0)].setdefault(name, player["hand"])
+    return known
+
+
+def _estimate_action_ev(action: str, amount: int, equity: float, pot: int, to_call: int,
+                        bet_in_round: int, current_bet: int, chips: int) -> float:
+    """粗略估算某个行动的筹码期望（假设摊牌、对手只跟注一次）"""
+    action = _normalize_action(action)
+    if action == "FOLD":
+        return 0.0
+    if action == "CHECK":
+        return equity * pot
+    if action == "CALL":
+        call = min(to_call, chips)
+        return equity * (pot + call) - call
+    invest = chips if action == "ALL_IN" else min(amount, chips)
+    # 对手为跟上本次加注需要补的筹码
+    opponent_call = max(0, bet_in_round + invest - current_bet)
+    return equity * (pot + invest + opponent_call) - invest
+
+
+def _annotate_log_ev(path: str, iterations: int = 300) -> List[Dict[str, Any]]:
+    """为单个日志中的每条决策标注底池赔率、胜率和EV差值（可在工作进程中执行）"""
+    reader = EnhancedLogReader(path)
+    game_id = reader.read_metadata(["game_id"]).get("game_id", "")
+    decisions = list(reader.iter_decisions(exclude=DECISION_TEXT_FIELDS))
+    known_hands = _collect_known_hands(reader, decisions)
+
+    annotated = []
+    for decision in decisions:
+        game_state = decision.get("game_state", {})
+        position = game_state.get("position", -1)
+        players_info = game_state.get("players_info", [])
+        if not game_state.get("hand") or not 0 <= position < len(players_info):
+            continue
+        hero_info = players_info[position]
+        hero = parse_cards(game_state["hand"])
+        board = parse_cards(game_state.get("community_cards", []))
+        opponents = [p for i, p in enumerate(players_info)
+                     if i != position and p.get("is_active", True) and not p.get("folded")]
+        if not opponents:
+            continue
+
+        hand_known = known_hands.get(decision["hand_number"], {})
+        villains = [parse_cards(hand_known[p["name"]]) for p in opponents if p["name"] in hand_known]
+        unknown = len(opponents) - len(villains)
+        equity = calculate_equity(hero, board, villains, unknown, iterations)
+        equity_random = calculate_equity(hero, board, (), len(opponents), iterations)
+
+        pot = game_state.get("pot", 0)
+        current_bet = game_state.get("current_bet", 0)
+        bet_in_round = hero_info.get("bet_in_round", 0)
+        chips = hero_info.get("chips", 0)
+        to_call = max(0, current_bet - bet_in_round)
+        pot_odds = to_call / (pot + to_call) if to_call > 0 else 0.0
+
+        ev_action = _estimate_action_ev(decision.get("parsed_action", ""), decision.get("action_amount", 0),
+                                        equity, pot, to_call, bet_in_round, current_bet, chips)
+        # 基准：弃牌与被动跟注/过牌中较好的一个
+        ev_passive = equity * (pot + min(to_call, chips)) - min(to_call, chips)
+        baseline = max(0.0, ev_passive)
+        big_blind = game_state.get("big_blind") or 1
+
+        annotated.append({
+            "game_id": game_id,
+            "hand_number": decision["hand_number"],
+            "stage": decision.get("stage", ""),
+            "player_name": decision.get("player_name", ""),
+            "model_name": decision.get("model_name", ""),
+            "action": decision.get("parsed_action", ""),
+            "amount": decision.get("action_amount", 0),
+            "pot": pot,
+            "to_call": to_call,
+            "pot_odds": pot_odds,
+            "opponents": len(opponents),
+            "known_opponents": len(villains),
+            "equity": equity,
+            "equity_random": equity_random,
+            "ev_action": ev_action,
+            "ev_delta": ev_action - baseline,
+            "ev_delta_bb": (ev_action - baseline) / big_blind,
+        })
+    return annotated
+
+
+def _summarize_ev(annotated: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """按模型汇总EV标注结果"""
+    totals = defaultdict(lambda: {"decisions": 0, "equity": 0.0, "equity_random": 0.0, "ev_delta_bb": 0.0})
+    for row in annotated:
+        stats = totals[row["model_name"]]
+        stats["decisions"] += 1
+        stats["equity"] += row["equity"]
+        stats["equity_random"] += row["equity_random"]
+        stats["ev_delta_bb"] += row["ev_delta_bb"]
+    return {model: dict(stats) for model, stats in totals.items()}
+
+
+def _parse_date(value: Any) -> Optional[datetime]:
+    if value is None or isinstance(value, datetime):
+        return value
+    return datetime.fromisoformat(value)
 
 
 class LogAnalyzer:
@@ -24,49 +250,58 @@ class LogAnalyzer:
                 logs.append(os.path.join(self.log_dir, file))
         return logs
 
-    def load_log(self, game_id: str) -> Dict[str, Any]:
-        """加载指定游戏的增强日志"""
+    def _log_path(self, game_id: str) -> str:
         filename = os.path.join(self.log_dir, f"enhanced_poker_game_{game_id}.json")
         if not os.path.exists(filename):
             raise FileNotFoundError(f"找不到日志文件: {filename}")
+        return filename
 
-        with open(filename, 'r', encoding='utf-8') as f:
+    def load_log(self, game_id: str) -> Dict[str, Any]:
+        """加载指定游戏的增强日志"""
+        with open(self._log_path(game_id), 'r', encoding='utf-8') as f:
             return json.load(f)
 
+    def open_reader(self, game_id: str) -> EnhancedLogReader:
+        """获取指定游戏的流式日志读取器，适用于无法整体载入内存的大日志"""
+        return EnhancedLogReader(self._log_path(game_id))
+
     def get_game_summary(self, game_id: str) -> Dict[str, Any]:
         """获取游戏摘要"""
-        log = self.load_log(game_id)
+        reader = self.open_reader(game_id)
+        log = reader.read_metadata()
 
         return {
             "game_id": log["game_id"],
             "start_time": log["start_time"],
             "end_time": log.get("end_time", "进行中"),
             "players": log["players"],
-            "total_decisions": len(log["llm_decisions"]),
-            "total_reflections": len(log["llm_reflections"]),
+            "total_decisions": sum(1 for _ in reader.iter_decisions(fields=())),
+            "total_reflections": sum(1 for _ in reader.iter_reflections(fields=())),
             "final_rankings": log.get("final_rankings", []),
-            "total_hands": max([e.get("hand_number", 0) for e in log["events"]], default=0)
+            "total_hands": max((e.get("hand_number", 0) for e in reader.iter_events(fields=["hand_number"])),
+                               default=0)
         }
 
-    def get_player_decisions(self, game_id: str, player_name: str) -> List[Dict[str, Any]]:
-        """获取指定玩家的所有决策"""
-        log = self.load_log(game_id)
+    def get_player_decisions(self, game_id: str, player_name: str,
+                             fields: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """获取指定玩家的所有决策，fields 用于只读取需要的字段"""
+        if fields is not None and "player_name" not in fields:
+            fields = list(fields) + ["player_name"]
         return [
-            decision for decision in log["llm_decisions"]
+            decision for decision in self.open_reader(game_id).iter_decisions(fields=fields)
             if decision["player_name"] == player_name
         ]
 
     def get_player_reflections(self, game_id: str, player_name: str) -> List[Dict[str, Any]]:
         """获取指定玩家的所有反思"""
-        log = self.load_log(game_id)
         return [
-            reflection for reflection in log["llm_reflections"]
+            reflection for reflection in self.open_reader(game_id).iter_reflections()
             if reflection["player_name"] == player_name
         ]
 
     def analyze_decision_patterns(self, game_id: str, player_name: str) -> Dict[str, Any]:
         """分析玩家的决策模式"""
-        decisions = self.get_player_decisions(game_id, player_name)
+        decisions = self.get_player_decisions(game_id, player_name, fields=PATTERN_FIELDS)
 
         action_counts = defaultdict(int)
         stage_action_counts = defaultdict(lambda: defaultdict(int))
@@ -82,6 +317,7 @@ class LogAnalyzer:
             stage_action_counts[decision["stage"]][action] += 1
             total_response_time += decision.get("response_time", 0)
 
+            action = _normalize_action(action)
             if action == "FOLD":
                 fold_count += 1
             elif action == "RAISE":
@@ -109,10 +345,8 @@ class LogAnalyzer:
 
     def get_decision_by_stage(self, game_id: str, hand_number: int, stage: str, player_name: str = None) -> List[Dict[str, Any]]:
         """获取特定阶段的所有决策"""
-        log = self.load_log(game_id)
-
         decisions = [
-            decision for decision in log["llm_decisions"]
+            decision for decision in self.open_reader(game_id).iter_decisions()
             if decision["hand_number"] == hand_number and decision["stage"] == stage
         ]
 
@@ -121,10 +355,25 @@ class LogAnalyzer:
 
         return decisions
 
+    def get_player_stats(self, game_id: str) -> Dict[str, Dict[str, Any]]:
+        """从旧版游戏日志（优先使用二进制手牌历史）统计每名玩家的 VPIP/PFR/3-bet/AF/WTSD/c-bet"""
+        base = os.path.join(self.log_dir, f"poker_game_{game_id}")
+        if os.path.exists(f"{base}.pkh"):
+            records = HandHistoryReader(f"{base}.pkh").iter_records()
+        elif os.path.exists(f"{base}.json"):
+            records = iter_game_log(f"{base}.json", fields=["type", "hand_number", "stage", "player_name",
+                                                            "action", "amount", "players"])
+        else:
+            raise FileNotFoundError(f"找不到游戏日志: {base}.json")
+        return stats_from_records(records).summary()
+
+    @staticmethod
+    def load_player_stats(stats_file: str) -> Dict[str, Dict[str, Any]]:
+        """读取跨锦标赛累积的统计存储（GameController(stats_file=...)）"""
+        return PlayerStatsTracker.load(stats_file).summary()
+
     def compare_models(self, game_id: str) -> Dict[str, Any]:
         """对比不同模型的表现"""
-        log = self.load_log(game_id)
-
         model_stats = defaultdict(lambda: {
             "decisions": 0,
             "total_response_time": 0,
@@ -133,13 +382,13 @@ class LogAnalyzer:
             "call_count": 0
         })
 
-        for decision in log["llm_decisions"]:
+        for decision in self.open_reader(game_id).iter_decisions(fields=PATTERN_FIELDS):
             model_name = decision["model_name"]
             stats = model_stats[model_name]
             stats["decisions"] += 1
             stats["total_response_time"] += decision.get("response_time", 0)
 
-            action = decision["parsed_action"]
+            action = _normalize_action(decision["parsed_action"])
             if action == "FOLD":
                 stats["fold_count"] += 1
             elif action == "RAISE":
@@ -162,10 +411,8 @@ class LogAnalyzer:
 
     def export_decision_timeline(self, game_id: str, output_file: str = None) -> str:
         """导出决策时间线（用于Web展示）"""
-        log = self.load_log(game_id)
-
         timeline = []
-        for decision in log["llm_decisions"]:
+        for decision in self.open_reader(game_id).iter_decisions(exclude=DECISION_TEXT_FIELDS):
             timeline.append({
                 "time": decision["timestamp"],
                 "hand_number": decision["hand_number"],
@@ -191,6 +438,313 @@ class LogAnalyzer:
 
         return json.dumps(timeline, ensure_ascii=False, indent=2)
 
+    def analyze_corpus(self, start_date: Any = None, end_date: Any = None, models: Optional[List[str]] = None,
+                       max_workers: Optional[int] = None,
+                       progress: Optional[Callable[[int, int], None]] = None) -> Dict[str, Any]:
+        """并行分析日志目录下的全部增强日志（map-reduce）
+
+        每个日志在独立进程中汇总为局部统计，主进程再合并为按玩家和按模型的整体结果。
+
+        Args:
+            start_date: 仅统计开始时间不早于该时间的对局（datetime 或 ISO 格式字符串）
+            end_date: 仅统计开始时间早于该时间的对局
+            models: 仅统计这些模型的决策
+            max_workers: 进程数，默认为 CPU 核数；为 1 时在当前进程中串行执行
+            progress: 进度回调 progress(已完成数, 总数)
+        """
+        start_date = _parse_date(start_date)
+        end_date = _parse_date(end_date)
+        paths = self.list_enhanced_logs()
+        total = len(paths)
+
+        players = defaultdict(_new_partial_stats)
+        model_stats = defaultdict(_new_partial_stats)
+        game_ids = []
+        total_hands = 0
+
+        def reduce(result: Optional[Dict[str, Any]]):
+            nonlocal total_hands
+            if result is None:
+                return
+            game_ids.append(result["game_id"])
+            total_hands += result["hands"]
+            for name, partial in result["players"].items():
+                _merge_partial_stats(players[name], partial)
+            for name, partial in result["models"].items():
+                _merge_partial_stats(model_stats[name], partial)
+
+        if max_workers == 1 or total <= 1:
+            for done, path in enumerate(paths, 1):
+                reduce(_summarize_log_file(path, start_date, end_date, models))
+                if progress:
+                    progress(done, total)
+        else:
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                futures = [executor.submit(_summarize_log_file, path, start_date, end_date, models)
+                           for path in paths]
+                for done, future in enumerate(as_completed(futures), 1):
+                    reduce(future.result())
+                    if progress:
+                        progress(done, total)
+
+        return {
+            "games": sorted(game_ids),
+            "total_hands": total_hands,
+            "players": {name: _finalize_stats(stats) for name, stats in players.items()},
+            "models": {name: _finalize_stats(stats) for name, stats in model_stats.items()},
+        }
+
+    def analyze_decision_ev(self, game_id: str, iterations: int = 300) -> List[Dict[str, Any]]:
+        """对每条决策做事后EV分析
+
+        根据决策时记录的 game_state 还原牌桌，计算英雄对真实对手手牌（来自各玩家决策与摊牌记录）
+        以及对随机手牌范围的胜率，并标注底池赔率和相对“弃牌/被动跟注”基准的粗略EV差值。
+        """
+        return _annotate_log_ev(self._log_path(game_id), iterations)
+
+    def rank_models_by_ev(self, game_ids: List[str] = None, iterations: int = 300,
+                          max_workers: Optional[int] = None,
+                          progress: Optional[Callable[[int, int], None]] = None) -> List[Dict[str, Any]]:
+        """并行对多局日志做EV分析，并按平均EV差值（大盲/决策）对模型排序"""
+        if game_ids is None:
+            paths = self.list_enhanced_logs()
+        else:
+            paths = [self._log_path(game_id) for game_id in game_ids]
+        total = len(paths)
+
+        merged = defaultdict(lambda: {"decisions": 0, "equity": 0.0, "equity_random": 0.0, "ev_delta_bb": 0.0})
+
+        def reduce(annotated: List[Dict[str, Any]]):
+            for model, stats in _summarize_ev(annotated).items():
+                for key, value in stats.items():
+                    merged[model][key] += value
+
+        if max_workers == 1 or total <= 1:
+            for done, path in enumerate(paths, 1):
+                reduce(_annotate_log_ev(path, iterations))
+                if progress:
+                    progress(done, total)
+        else:
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                futures = [executor.submit(_annotate_log_ev, path, iterations) for path in paths]
+                for done, future in enumerate(as_completed(futures), 1):
+                    reduce(future.result())
+                    if progress:
+                        progress(done, total)
+
+        ranking = []
+        for model, stats in merged.items():
+            decisions = stats["decisions"]
+            ranking.append({
+                "model_name": model,
+                "total_decisions": decisions,
+                "avg_equity": stats["equity"] / decisions if decisions else 0,
+                "avg_equity_random": stats["equity_random"] / decisions if decisions else 0,
+                "total_ev_delta_bb": stats["ev_delta_bb"],
+                "avg_ev_delta_bb": stats["ev_delta_bb"] / decisions if decisions else 0,
+            })
+        ranking.sort(key=lambda r: r["avg_ev_delta_bb"], reverse=True)
+        return ranking
+
+    def export_columnar(self, game_ids: List[str] = None, output_dir: str = None,
+                        include_text: bool = False, file_format: str = "parquet") -> Dict[str, str]:
+        """将多个增强日志的决策、反思和事件导出为列式文件（Parquet/Arrow），用于批量统计分析
+
+        Args:
+            game_ids: 需要导出的游戏ID列表，默认导出日志目录下的全部增强日志
+            output_dir: 输出目录，默认为 {log_dir}/columnar
+            include_text: 是否包含 prompt、原始响应、推理内容等大文本列
+            file_format: "parquet" 或 "arrow"
+
+        Returns:
+            各数据表对应的输出文件路径
+        """
+        if pa is None:
+            raise ImportError("列式导出需要安装 pyarrow: pip install pyarrow")
+        if file_format not in ("parquet", "arrow"):
+            raise ValueError(f"不支持的导出格式: {file_format}")
+
+        if game_ids is None:
+            game_ids = [self._game_id_from_path(path) for path in sorted(self.list_enhanced_logs())]
+        output_dir = output_dir or os.path.join(self.log_dir, "columnar")
+        os.makedirs(output_dir, exist_ok=True)
+
+        schemas = {
+            "decisions": self._decision_schema(include_text),
+            "reflections": self._reflection_schema(include_text),
+            "events": self._event_schema(),
+        }
+        extension = "parquet" if file_format == "parquet" else "arrow"
+        paths = {name: os.path.join(output_dir, f"{name}.{extension}") for name in schemas}
+        writers = {}
+        try:
+            for name, schema in schemas.items():
+                if file_format == "parquet":
+                    writers[name] = pq.ParquetWriter(paths[name], schema, compression="zstd")
+                else:
+                    writers[name] = pa.ipc.new_file(paths[name], schema)
+
+            # 每个日志单独写入一个 row group，内存占用只与单个日志大小相关
+            decision_exclude = None if include_text else DECISION_TEXT_FIELDS
+            reflection_exclude = None if include_text else REFLECTION_TEXT_FIELDS
+            for game_id in game_ids:
+                reader = self.open_reader(game_id)
+                rows = {
+                    "decisions": [self._decision_row(game_id, d, include_text)
+                                  for d in reader.iter_decisions(exclude=decision_exclude)],
+                    "reflections": [self._reflection_row(game_id, r, include_text)
+                                    for r in reader.iter_reflections(exclude=reflection_exclude)],
+                    "events": [self._event_row(game_id, i, e)
+                               for i, e in enumerate(reader.iter_events())],
+                }
+                for name, table_rows in rows.items():
+                    if not table_rows:
+                        continue
+                    table = pa.Table.from_pylist(table_rows, schema=schemas[name])
+                    writers[name].write_table(table)
+        finally:
+            for writer in writers.values():
+                writer.close()
+
+        return paths
+
+    @staticmethod
+    def _game_id_from_path(path: str) -> str:
+        """从日志文件路径中解析游戏ID"""
+        return os.path.basename(path).replace("enhanced_poker_game_", "").replace(".json", "")
+
+    @staticmethod
+    def _decision_schema(include_text: bool):
+        fields = [
+            ("game_id", pa.string()),
+            ("hand_number", pa.int32()),
+            ("stage", pa.string()),
+            ("timestamp", pa.string()),
+            ("player_name", pa.string()),
+            ("model_name", pa.string()),
+            ("action", pa.string()),
+            ("amount", pa.int64()),
+            ("pot", pa.int64()),
+            ("current_bet", pa.int64()),
+            ("min_raise", pa.int64()),
+            ("position", pa.int16()),
+            ("dealer_position", pa.int16()),
+            ("player_chips", pa.int64()),
+            ("bet_in_round", pa.int64()),
+            ("hand", pa.list_(pa.string())),
+            ("community_cards", pa.list_(pa.string())),
+            ("response_time", pa.float64()),
+            ("error", pa.string()),
+            ("play_reason", pa.string()),
+            ("behavior", pa.string()),
+        ]
+        if include_text:
+            fields += [(name, pa.large_string()) for name in DECISION_TEXT_FIELDS]
+        return pa.schema(fields)
+
+    @staticmethod
+    def _reflection_schema(include_text: bool):
+        fields = [
+            ("game_id", pa.string()),
+            ("hand_number", pa.int32()),
+            ("timestamp", pa.string()),
+            ("player_name", pa.string()),
+            ("model_name", pa.string()),
+            ("updated_opinions", pa.string()),
+        ]
+        if include_text:
+            fields += [(name, pa.large_string()) for name in REFLECTION_TEXT_FIELDS]
+        return pa.schema(fields)
+
+    @staticmethod
+    def _event_schema():
+        return pa.schema([
+            ("game_id", pa.string()),
+            ("event_index", pa.int32()),
+            ("type", pa.int8()),
+            ("hand_number", pa.int32()),
+            ("stage", pa.string()),
+            ("player_name", pa.string()),
+            ("action", pa.string()),
+            ("amount", pa.int64()),
+            ("pot", pa.int64()),
+            ("player_chips", pa.int64()),
+            ("community_cards", pa.list_(pa.string())),
+            ("winners", pa.list_(pa.string())),
+            ("behavior", pa.string()),
+            ("detail", pa.string()),  # 玩家列表、边池等嵌套信息，以JSON字符串保存
+        ])
+
+    @staticmethod
+    def _decision_row(game_id: str, decision: Dict[str, Any], include_text: bool) -> Dict[str, Any]:
+        game_state = decision.get("game_state", {})
+        position = game_state.get("position")
+        players_info = game_state.get("players_info", [])
+        self_info = players_info[position] if position is not None and 0 <= position < len(players_info) else {}
+        row = {
+            "game_id": game_id,
+            "hand_number": decision.get("hand_number", 0),
+            "stage": decision.get("stage", ""),
+            "timestamp": decision.get("timestamp", ""),
+            "player_name": decision.get("player_name", ""),
+            "model_name": decision.get("model_name", ""),
+            "action": decision.get("parsed_action", ""),
+            "amount": decision.get("action_amount", 0),
+            "pot": game_state.get("pot", 0),
+            "current_bet": game_state.get("current_bet", 0),
+            "min_raise": game_state.get("min_raise", 0),
+            "position": position,
+            "dealer_position": game_state.get("dealer_position"),
+            "player_chips": self_info.get("chips"),
+            "bet_in_round": self_info.get("bet_in_round"),
+            "hand": game_state.get("hand", []),
+            "community_cards": game_state.get("community_cards", []),
+            "response_time": decision.get("response_time", 0.0),
+            "error": decision.get("error", ""),
+            "play_reason": decision.get("play_reason", ""),
+            "behavior": decision.get("behavior", ""),
+        }
+        if include_text:
+            for name in DECISION_TEXT_FIELDS:
+                row[name] = decision.get(name, "")
+        return row
+
+    @staticmethod
+    def _reflection_row(game_id: str, reflection: Dict[str, Any], include_text: bool) -> Dict[str, Any]:
+        row = {
+            "game_id": game_id,
+            "hand_number": reflection.get("hand_number", 0),
+            "timestamp": reflection.get("timestamp", ""),
+            "player_name": reflection.get("player_name", ""),
+            "model_name": reflection.get("model_name", ""),
+            "updated_opinions": json.dumps(reflection.get("updated_opinions", {}), ensure_ascii=False),
+        }
+        if include_text:
+            for name in REFLECTION_TEXT_FIELDS:
+                row[name] = reflection.get(name, "")
+        return row
+
+    @staticmethod
+    def _event_row(game_id: str, index: int, event: Dict[str, Any]) -> Dict[str, Any]:
+        winners = [w.get("name", w.get("player_name", "")) for w in event.get("winners", [])]
+        detail = {key: event[key] for key in ("players", "side_pots", "dealer") if key in event}
+        return {
+            "game_id": game_id,
+            "event_index": index,
+            "type": event.get("type", 0),
+            "hand_number": event.get("hand_number", 0),
+            "stage": event.get("stage", ""),
+            "player_name": event.get("player_name", ""),
+            "action": event.get("action", ""),
+            "amount": event.get("amount", 0),
+            "pot": event.get("pot", 0),
+            "player_chips": event.get("player_chips", 0),
+            "community_cards": event.get("community_cards", []),
+            "winners": winners,
+            "behavior": event.get("behavior", ""),
+            "detail": json.dumps(detail, ensure_ascii=False) if detail else "",
+        }
+
 
 def print_analysis_example():
     """打印分析示例"""
@@ -0,0 +1,2 @@
+# benchmarks
+# 引擎、控制器、日志与分析器的端到端基准测试，入口见 run_benchmarks.py
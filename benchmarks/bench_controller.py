@@ -0,0 +1,43 @@
+# benchmarks/bench_controller.py
+# 控制器 + LLM 客户端在固定延迟模拟服务下的端到端吞吐基准
+
+import time
+from typing import Any, Dict, Tuple
+
+from ai_player import OpenAiLLMUser
+from benchmarks.common import make_controller, quiet, result
+from mock_llm_server import MockLLMServer, MockServerConfig
+
+MOCK_LATENCY_MS = 20.0
+PIPELINE_WORKERS = 4
+
+
+def _run_mock_tournament(base_url: str, hands: int, work_dir: str, pipeline_workers: int = 0) -> Tuple[int, float]:
+    """返回 (实际进行的手数, 耗时秒数)"""
+    controller = make_controller(work_dir, initial_chips=5000, pipeline_workers=pipeline_workers)
+    for i in range(3):
+        controller.add_player(OpenAiLLMUser(name=f"P{i}", model_name="mock", api_key="mock",
+                                            base_url=f"{base_url}/v1"))
+    start = time.perf_counter()
+    with quiet():
+        controller.run_tournament(num_hands=hands, verbose=False, log_interval=0)
+    return controller.table.hand_number, time.perf_counter() - start
+
+
+def bench_mock_tournament(quick: bool, work_dir: str) -> Dict[str, Dict[str, Any]]:
+    """run_tournament 在模拟LLM服务（固定延迟）下的每秒手数与每秒决策数，以及开启决策流水线后的每秒手数"""
+    hands = 5 if quick else 30
+    server = MockLLMServer(MockServerConfig(port=0, latency_distribution="fixed", latency_ms=MOCK_LATENCY_MS))
+    base_url = server.start_in_thread()
+    try:
+        played, elapsed = _run_mock_tournament(base_url, hands, work_dir)
+        requests = server.stats["requests"]
+        pipeline_played, pipeline_elapsed = _run_mock_tournament(base_url, hands, work_dir, PIPELINE_WORKERS)
+    finally:
+        server.stop()
+    return {
+        "mock_tournament_hands_per_sec": result(played / elapsed, "hands/s", latency_ms=MOCK_LATENCY_MS),
+        "mock_tournament_requests_per_sec": result(requests / elapsed, "requests/s", latency_ms=MOCK_LATENCY_MS),
+        "mock_tournament_pipeline_hands_per_sec": result(pipeline_played / pipeline_elapsed, "hands/s",
+                                                         latency_ms=MOCK_LATENCY_MS, workers=PIPELINE_WORKERS),
+    }
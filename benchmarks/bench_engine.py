@@ -0,0 +1,89 @@
+# benchmarks/bench_engine.py
+# 牌力评估与牌桌引擎的吞吐基准
+
+import random
+import time
+from typing import Any, Dict
+
+from benchmarks.common import best_of, play_bot_hands, result
+from engine_info import Player
+from hand_evaluator import FULL_DECK, evaluate, evaluate_batch, int_to_card
+from poker_engine import PokerTable
+from showdown_scheduler import ShowdownScheduler
+
+
+def _random_hands(count: int, seed: int = 42):
+    rng = random.Random(seed)
+    return [rng.sample(FULL_DECK, 7) for _ in range(count)]
+
+
+def bench_hand_evaluation(quick: bool, work_dir: str) -> Dict[str, Dict[str, Any]]:
+    """find_best_hand 与整数评估器每秒可评估的7张牌组合数"""
+    count = 5000 if quick else 50000
+    int_hands = _random_hands(count)
+    card_hands = [[int_to_card(c) for c in hand] for hand in int_hands]
+    table = PokerTable()
+
+    def run_engine():
+        for hand in card_hands:
+            table.find_best_hand(hand)
+
+    def run_evaluator():
+        for hand in int_hands:
+            evaluate(hand)
+
+    return {
+        "find_best_hand_evals_per_sec": result(count / best_of(3, run_engine), "evals/s"),
+        "hand_evaluator_evals_per_sec": result(count / best_of(3, run_evaluator), "evals/s"),
+        "hand_evaluator_batch_evals_per_sec": result(count / best_of(3, lambda: evaluate_batch(int_hands)), "evals/s"),
+    }
+
+
+def _river_tables(count: int, players: int = 6):
+    """发到河牌、等待摊牌的牌桌"""
+    tables = []
+    for seed in range(count):
+        table = PokerTable(seed=seed)
+        for i in range(players):
+            table.add_player(Player(f"P{i}", 1000))
+        table.start_new_hand()
+        for _ in range(3):
+            table.move_to_next_stage()
+        tables.append(table)
+    return tables
+
+
+def bench_showdown_batching(quick: bool, work_dir: str) -> Dict[str, Dict[str, Any]]:
+    """大量牌桌同时摊牌时，逐桌评估与 ShowdownScheduler 批量评估的每秒摊牌数"""
+    count = 2000 if quick else 20000
+
+    def run_per_table():
+        tables = _river_tables(count)
+        start = time.perf_counter()
+        for table in tables:
+            table.move_to_next_stage()
+        return time.perf_counter() - start
+
+    def run_batched():
+        tables = _river_tables(count)
+        scheduler = ShowdownScheduler()
+        start = time.perf_counter()
+        for table in tables:
+            table.showdown_scheduler = scheduler
+            table.move_to_next_stage()
+        scheduler.flush()
+        return time.perf_counter() - start
+
+    return {
+        "showdowns_per_sec": result(count / min(run_per_table() for _ in range(3)), "showdowns/s"),
+        "batched_showdowns_per_sec": result(count / min(run_batched() for _ in range(3)), "showdowns/s"),
+    }
+
+
+def bench_bot_hands(quick: bool, work_dir: str) -> Dict[str, Dict[str, Any]]:
+    """脚本机器人在 GameController 下的每秒手数（不涉及网络与LLM）"""
+    hands = 300 if quick else 3000
+    start = time.perf_counter()
+    played = play_bot_hands(work_dir, hands)
+    elapsed = time.perf_counter() - start
+    return {"bot_hands_per_sec": result(played / elapsed, "hands/s", hands=played)}
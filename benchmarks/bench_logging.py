@@ -0,0 +1,57 @@
+# benchmarks/bench_logging.py
+# 日志写入与日志分析的基准
+
+import os
+import time
+from typing import Any, Dict
+
+from analyze_logs import LogAnalyzer
+from benchmarks.common import best_of, build_corpus, generate_enhanced_log, result
+from game_logger import GameLogger
+
+TEMPLATE_HANDS = 20
+
+
+def bench_logger_save(quick: bool, work_dir: str) -> Dict[str, Dict[str, Any]]:
+    """GameLogger.save 在 1000 手牌规模日志下的耗时"""
+    controller = generate_enhanced_log(work_dir, TEMPLATE_HANDS)
+    hands = max(1, controller.table.hand_number)
+    source = controller.game_logger.log_data
+    repeat = max(1, 1000 // hands)
+
+    logger = GameLogger(game_id="bench_save", log_dir=work_dir)
+    logger.log_data.events = source.events * repeat
+    logger.log_data.llm_decisions = source.llm_decisions * repeat
+    logger.log_data.llm_reflections = source.llm_reflections * repeat
+    elapsed = best_of(1 if quick else 3, logger.save)
+    size = os.path.getsize(os.path.join(work_dir, "enhanced_poker_game_bench_save.json"))
+    return {"logger_save_seconds_per_1k_hands": result(elapsed * 1000 / (hands * repeat), "s", False,
+                                                       file_mb=round(size / 1e6, 2))}
+
+
+def bench_analyzer(quick: bool, work_dir: str) -> Dict[str, Dict[str, Any]]:
+    """LogAnalyzer 单局查询延迟与 10/100/1000 局语料的整体分析耗时"""
+    template_dir = os.path.join(work_dir, "template")
+    controller = generate_enhanced_log(template_dir, TEMPLATE_HANDS)
+    template = os.path.join(template_dir, f"enhanced_poker_game_{controller.game_id}.json")
+
+    results = {}
+    single = LogAnalyzer(template_dir)
+    game_id = controller.game_id
+    player = controller.ai_players[0].name
+    queries = {
+        "game_summary": lambda: single.get_game_summary(game_id),
+        "decision_patterns": lambda: single.analyze_decision_patterns(game_id, player),
+        "compare_models": lambda: single.compare_models(game_id),
+    }
+    for name, query in queries.items():
+        results[f"analyzer_{name}_ms"] = result(best_of(5, query) * 1000, "ms", False)
+
+    for games in ((10, 100) if quick else (10, 100, 1000)):
+        corpus_dir = os.path.join(work_dir, f"corpus_{games}")
+        build_corpus(template, corpus_dir, games)
+        analyzer = LogAnalyzer(corpus_dir)
+        start = time.perf_counter()
+        analyzer.analyze_corpus()
+        results[f"analyzer_corpus_{games}_games_seconds"] = result(time.perf_counter() - start, "s", False)
+    return results
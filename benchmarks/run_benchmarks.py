@@ -0,0 +1,132 @@
+# benchmarks/run_benchmarks.py
+# 基准测试入口：运行全部或部分基准，输出JSON，并与保存的基线比较以发现性能回退
+#
+# 用法（在仓库根目录）：
+#   python -m benchmarks.run_benchmarks                       # 运行全部并与 baseline.json 比较
+#   python -m benchmarks.run_benchmarks --quick --only engine # 快速运行部分基准
+#   python -m benchmarks.run_benchmarks --save-baseline       # 把本次结果保存为新基线
+#   python -m benchmarks.run_benchmarks --only engine --save-baseline  # 只更新基线中 engine 的指标
+
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+from datetime import datetime
+from typing import Any, Dict, List
+
+if __package__ in (None, ""):
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.bench_controller import bench_mock_tournament  # noqa: E402
+from benchmarks.bench_engine import bench_bot_hands, bench_hand_evaluation, bench_showdown_batching  # noqa: E402
+from benchmarks.bench_logging import bench_analyzer, bench_logger_save  # noqa: E402
+from benchmarks.common import ROOT_DIR  # noqa: E402
+
+BENCHMARKS = {
+    "engine": bench_hand_evaluation,
+    "showdown": bench_showdown_batching,
+    "bots": bench_bot_hands,
+    "controller": bench_mock_tournament,
+    "logger": bench_logger_save,
+    "analyzer": bench_analyzer,
+}
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+
+def run(names: List[str], quick: bool = False) -> Dict[str, Any]:
+    """运行指定的基准，返回带环境信息的结果"""
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="poker_bench_") as work_dir:
+        for name in names:
+            print(f"运行基准: {name} ...", file=sys.stderr)
+            bench_dir = os.path.join(work_dir, name)
+            os.makedirs(bench_dir)
+            results.update(BENCHMARKS[name](quick, bench_dir))
+    return {
+        "timestamp": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "quick": quick,
+        "results": results,
+    }
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[Dict[str, Any]]:
+    """与基线逐项比较，返回比较结果列表（regression 为 True 表示超出容差的回退，基线中没有的指标标记为 new）"""
+    rows = []
+    for name, item in current["results"].items():
+        base = baseline.get("results", {}).get(name)
+        if not base or not base.get("value"):
+            rows.append({"name": name, "baseline": None, "current": item["value"], "unit": item["unit"],
+                         "ratio": None, "regression": False, "new": True})
+            continue
+        ratio = item["value"] / base["value"]
+        if item.get("higher_is_better", True):
+            regression = ratio < 1 - tolerance
+        else:
+            regression = ratio > 1 + tolerance
+        rows.append({"name": name, "baseline": base["value"], "current": item["value"],
+                     "unit": item["unit"], "ratio": ratio, "regression": regression})
+    return rows
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="德州扑克框架基准测试")
+    parser.add_argument("--only", nargs="+", choices=list(BENCHMARKS), help="只运行指定的基准")
+    parser.add_argument("--quick", action="store_true", help="缩小规模，快速检查")
+    parser.add_argument("--output", help="结果JSON输出路径，默认打印到标准输出")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="基线文件路径")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="允许的相对性能波动")
+    parser.add_argument("--save-baseline", action="store_true", help="把本次结果写入基线文件")
+    args = parser.parse_args()
+
+    # 提示词等资源按相对路径读取，需要在仓库根目录下运行
+    os.chdir(ROOT_DIR)
+    report = run(args.only or list(BENCHMARKS), args.quick)
+
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        if baseline.get("quick") != report["quick"]:
+            print("提示: 基线与本次运行的规模（--quick）不同，结果仅供参考", file=sys.stderr)
+        report["comparison"] = compare(report, baseline, args.tolerance)
+
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text)
+    else:
+        print(text)
+
+    if args.save_baseline:
+        # 只运行部分基准时，把本次结果合并进已有基线，其余指标保持不变
+        if args.only and os.path.exists(args.baseline):
+            with open(args.baseline, 'r', encoding='utf-8') as f:
+                baseline = json.load(f)
+            if baseline.get("quick") != report["quick"]:
+                print("基线与本次运行的规模（--quick）不同，不能合并", file=sys.stderr)
+                return 1
+            baseline.update({key: value for key, value in report.items() if key != "results"})
+            baseline.setdefault("results", {}).update(report["results"])
+            text = json.dumps(baseline, ensure_ascii=False, indent=2)
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            f.write(text)
+        print(f"基线已保存到: {args.baseline}", file=sys.stderr)
+        return 0
+
+    regressions = [row for row in report.get("comparison", []) if row["regression"]]
+    for row in report.get("comparison", []):
+        if row.get("new"):
+            print(f"[新增] {row['name']}: {row['current']:.4g} {row['unit']} (无基线)", file=sys.stderr)
+            continue
+        flag = "回退" if row["regression"] else "正常"
+        print(f"[{flag}] {row['name']}: {row['current']:.4g} {row['unit']} (基线 {row['baseline']:.4g}, "
+              f"比例 {row['ratio']:.2f})", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,173 @@
+# bot_player.py
+# 本地脚本机器人玩家：不调用任何网络接口，用于压测、补位以及作为衡量LLM表现的固定基线
+
+import random
+from typing import Any, Dict, Optional, Tuple
+from engine_info import Action, Player
+from ai_player import AIPlayer
+from game_info import GameInfoState, GamePlayerAction, GameResult, LegalActions
+from hand_evaluator import calculate_equity, card_to_int, evaluate, hand_category, ONE_PAIR, TWO_PAIR
+
+
+class ScriptedPlayer(AIPlayer):
+    """脚本机器人基类
+
+    所有随机性都来自每个机器人自己的 random.Random，默认以玩家名作为种子，保证结果可复现。
+    """
+
+    strategy = "scripted"
+
+    def __init__(self, name: str, seed: Optional[Any] = None):
+        super().__init__(Player(name=name))
+        self.model_name = f"bot:{self.strategy}"
+        self.seed = name if seed is None else seed
+        self.rng = random.Random(self.seed)
+        self.game_logger = None
+        self.metrics = None
+        self.profiler = None
+
+    def make_decision(self, game_state: GameInfoState) -> GamePlayerAction:
+        legal = game_state.legal_actions
+        if legal is None or not legal.actions:
+            return GamePlayerAction(action=Action.FOLD, amount=0, play_reason=self.strategy)
+        action, amount = self.choose_action(game_state, legal)
+        action, amount = legal.coerce(action, amount)
+        return GamePlayerAction(action=action, amount=amount, play_reason=self.strategy)
+
+    def choose_action(self, game_state: GameInfoState, legal: LegalActions) -> Tuple[Action, int]:
+        """根据合法行动选择本次行动，返回 (行动, 投入筹码)"""
+        raise NotImplementedError("子类必须实现此方法")
+
+    def reflect_on_game(self, game_state: GameInfoState, game_result: GameResult):
+        """机器人不做反思"""
+        pass
+
+    def reset_memory(self):
+        """重置随机数状态，保证复式赛各轮换中的决策序列一致"""
+        self.rng = random.Random(self.seed)
+
+    def export_memory(self) -> Dict[str, Any]:
+        return {"rng_state": self.rng.getstate()}
+
+    def restore_memory(self, memory: Dict[str, Any]):
+        if "rng_state" in memory:
+            self.rng.setstate(memory["rng_state"])
+
+    @staticmethod
+    def passive_action(legal: LegalActions) -> Tuple[Action, int]:
+        """能过牌就过牌，否则弃牌"""
+        if Action.CHECK in legal.actions:
+            return Action.CHECK, 0
+        return Action.FOLD, 0
+
+    @staticmethod
+    def continue_action(legal: LegalActions) -> Tuple[Action, int]:
+        """能过牌就过牌，否则跟注"""
+        if Action.CHECK in legal.actions:
+            return Action.CHECK, 0
+        return Action.CALL, legal.call_amount
+
+    @staticmethod
+    def raise_action(legal: LegalActions, amount: int) -> Tuple[Action, int]:
+        """加注到指定金额（由 LegalActions.coerce 处理上下限）"""
+        return Action.RAISE, max(amount, legal.min_raise)
+
+
+class RandomBot(ScriptedPlayer):
+    """在合法行动中均匀随机选择"""
+
+    strategy = "random"
+
+    def choose_action(self, game_state: GameInfoState, legal: LegalActions) -> Tuple[Action, int]:
+        action = self.rng.choice(legal.actions)
+        if action == Action.RAISE:
+            upper = min(legal.max_raise, legal.min_raise * 3)
+            return action, self.rng.randint(legal.min_raise, max(legal.min_raise, upper))
+        if action == Action.CALL:
+            return action, legal.call_amount
+        return action, 0
+
+
+class CallingStationBot(ScriptedPlayer):
+    """从不弃牌也从不加注，永远过牌或跟注"""
+
+    strategy = "calling_station"
+
+    def choose_action(self, game_state: GameInfoState, legal: LegalActions) -> Tuple[Action, int]:
+        return self.continue_action(legal)
+
+
+# 翻牌前起手牌表（点数从大到小，s 表示同花）
+PREMIUM_HANDS = {"AA", "KK", "QQ", "JJ", "AKs", "AK"}
+STRONG_HANDS = {"TT", "99", "88", "AQs", "AQ", "AJs", "KQs", "ATs", "KJs"}
+PLAYABLE_HANDS = {"77", "66", "55", "44", "33", "22", "AJ", "KQ", "QJs", "JTs", "T9s", "98s", "87s",
+                  "A9s", "A8s", "A7s", "A6s", "A5s", "A4s", "A3s", "A2s", "KTs", "QTs"}
+_RANK_CHARS = {14: "A", 13: "K", 12: "Q", 11: "J", 10: "T"}
+
+
+def starting_hand_key(hand) -> str:
+    """把两张底牌转换为起手牌表中的写法，如 "AKs"、"QQ"、"T9" """
+    high, low = sorted(hand, key=lambda c: c.value, reverse=True)
+    key = _RANK_CHARS.get(high.value, str(high.value)) + _RANK_CHARS.get(low.value, str(low.value))
+    if high.value != low.value and high.suit == low.suit:
+        key += "s"
+    return key
+
+
+class TightAggressiveBot(ScriptedPlayer):
+    """紧凶型：翻牌前按起手牌表入池，翻牌后按成牌强度下注"""
+
+    strategy = "tight_aggressive"
+
+    def choose_action(self, game_state: GameInfoState, legal: LegalActions) -> Tuple[Action, int]:
+        big_blind = game_state.big_blind or 1
+        if not game_state.community_cards:
+            key = starting_hand_key(game_state.hand)
+            if key in PREMIUM_HANDS:
+                return self.raise_action(legal, max(3 * big_blind, 3 * game_state.current_bet))
+            if key in STRONG_HANDS:
+                if legal.call_amount <= 3 * big_blind:
+                    return self.raise_action(legal, 3 * big_blind) if legal.call_amount == 0 else \
+                        self.continue_action(legal)
+                return self.passive_action(legal)
+            if key in PLAYABLE_HANDS and legal.call_amount <= big_blind:
+                return self.continue_action(legal)
+            return self.passive_action(legal)
+
+        cards = [card_to_int(c) for c in list(game_state.hand) + list(game_state.community_cards)]
+        category = hand_category(evaluate(cards))
+        if category >= TWO_PAIR:
+            return self.raise_action(legal, max(game_state.pot // 2, legal.min_raise))
+        if category == ONE_PAIR and legal.call_amount <= game_state.pot // 2:
+            return self.continue_action(legal)
+        return self.passive_action(legal)
+
+
+class EquityBot(ScriptedPlayer):
+    """按胜率与底池赔率决策：胜率高于赔率就继续，明显占优时加注"""
+
+    strategy = "equity"
+
+    def __init__(self, name: str, seed: Optional[Any] = None, iterations: int = 100,
+                 raise_threshold: float = 0.65, margin: float = 0.05):
+        super().__init__(name, seed)
+        self.iterations = iterations
+        self.raise_threshold = raise_threshold
+        self.margin = margin
+
+    def choose_action(self, game_state: GameInfoState, legal: LegalActions) -> Tuple[Action, int]:
+        opponents = sum(1 for p in game_state.players_info
+                        if p.name != self.name and p.is_active and not p.folded)
+        if opponents == 0:
+            return self.continue_action(legal)
+        equity = calculate_equity([card_to_int(c) for c in game_state.hand],
+                                  [card_to_int(c) for c in game_state.community_cards],
+                                  random_opponents=opponents, iterations=self.iterations)
+        to_call = legal.call_amount
+        pot_odds = to_call / (game_state.pot + to_call) if to_call > 0 else 0.0
+
+        if equity >= self.raise_threshold and Action.RAISE in legal.actions:
+            return self.raise_action(legal, max(game_state.pot, legal.min_raise))
+        if equity >= pot_odds + self.margin:
+            return self.continue_action(legal)
+        return self.passive_action(legal)
@@ -0,0 +1,117 @@
+# checkpoint.py
+# 长时间锦标赛的检查点：每手结束后追加一帧紧凑的二进制快照，进程中断后可从最后一手完整结束的位置继续
+
+import os
+import pickle
+import struct
+import zlib
+from typing import Any, BinaryIO, Dict, Iterator, Optional, Tuple
+
+# 文件格式：MAGIC 之后是连续的帧，每帧为 [长度 uint32][crc32 uint32][zlib(pickle(payload))]
+# 只追加写入，每帧只包含自上一帧以来新增的日志记录，因此每手写一次的开销与对局长度无关
+MAGIC = b"PKCKPT01"
+_FRAME_HEADER = struct.Struct("<II")
+
+# 需要增量保存的日志列表：旧版 game_log 以及增强日志的三个数组
+LOG_STREAMS = ("game_log", "events", "llm_decisions", "llm_reflections")
+
+
+class CheckpointWriter:
+    """检查点写入器
+
+    append 为 False 时新建文件（覆盖同名的旧检查点）；为 True 时在已有文件之后继续追加，
+    先截掉进程中断时写了一半的尾帧，否则之后追加的帧都排在损坏帧后面而无法读取。
+    """
+
+    def __init__(self, path: str, fsync: bool = False, compress_level: int = 1, append: bool = False):
+        self.path = path
+        self.fsync = fsync
+        self.compress_level = compress_level
+        self.append = append
+        self._file: Optional[BinaryIO] = None
+
+    def _open(self) -> BinaryIO:
+        if self._file is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            if self.append and os.path.exists(self.path) and os.path.getsize(self.path) > 0:
+                self._file = open(self.path, "r+b")
+                self._file.truncate(valid_length(self.path))
+                self._file.seek(0, os.SEEK_END)
+            else:
+                self._file = open(self.path, "wb")
+                self._file.write(MAGIC)
+        return self._file
+
+    def write(self, payload: Dict[str, Any]) -> int:
+        """追加一帧，返回写入的字节数"""
+        data = zlib.compress(pickle.dumps(payload, protocol=pickle.HIGHEST_PROTOCOL), self.compress_level)
+        f = self._open()
+        f.write(_FRAME_HEADER.pack(len(data), zlib.crc32(data)) + data)
+        f.flush()
+        if self.fsync:
+            os.fsync(f.fileno())
+        return _FRAME_HEADER.size + len(data)
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def _iter_raw_frames(path: str) -> Iterator[Tuple[bytes, int]]:
+    """按顺序读取完整帧的压缩数据及该帧结束的文件偏移；遇到写到一半或损坏的帧时停止"""
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"不是有效的检查点文件: {path}")
+        while True:
+            header = f.read(_FRAME_HEADER.size)
+            if len(header) < _FRAME_HEADER.size:
+                return
+            length, crc = _FRAME_HEADER.unpack(header)
+            data = f.read(length)
+            if len(data) < length or zlib.crc32(data) != crc:
+                return
+            yield data, f.tell()
+
+
+def iter_frames(path: str) -> Iterator[Dict[str, Any]]:
+    """按顺序读取检查点中的完整帧；遇到写到一半或损坏的帧时停止"""
+    for data, _ in _iter_raw_frames(path):
+        yield pickle.loads(zlib.decompress(data))
+
+
+def valid_length(path: str) -> int:
+    """最后一个完整帧结束的位置（其后的字节是中断时残留的损坏数据）"""
+    end = len(MAGIC)
+    for _, end in _iter_raw_frames(path):
+        pass
+    return end
+
+
+def load_checkpoint(path: str) -> Optional[Dict[str, Any]]:
+    """合并检查点中的全部帧：返回最后一帧的状态，以及拼接后的完整日志记录
+
+    元信息帧标志一场锦标赛的开始，只合并最后一个元信息帧及其之后的帧（旧版本可能把同一 game_id 的多场锦标赛写进同一文件）。
+    返回结构：{"meta": 首帧元信息, "state": 最后一帧状态, "logs": {日志名: 记录列表}, "frames": 帧数}
+    """
+    meta = None
+    state = None
+    logs = {name: [] for name in LOG_STREAMS}
+    game_results = {}
+    frames = 0
+    for frame in iter_frames(path):
+        if frame.get("meta"):
+            meta = frame["meta"]
+            logs = {name: [] for name in LOG_STREAMS}
+            game_results = {}
+            frames = 0
+        frames += 1
+        state = frame["state"]
+        for name in LOG_STREAMS:
+            logs[name].extend(frame["logs"].get(name, ()))
+        game_results.update(frame.get("game_results", {}))
+    if state is None:
+        return None
+    return {"meta": meta, "state": state, "logs": logs, "game_results": game_results, "frames": frames}
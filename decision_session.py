@@ -0,0 +1,46 @@
+# decision_session.py
+# 多轮会话模式：同一手牌内，玩家第一次决策发送完整局面，之后只发送自上次行动以来的新行动与当前局面；
+# 会话超出 token 预算时丢弃最早的增量轮次，并改为重新发送完整局面
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+# 单手牌会话（含静态指令）的默认 token 预算
+DEFAULT_TOKEN_BUDGET = 6000
+
+
+def estimate_tokens(text: str) -> int:
+    """粗略估计 token 数（中英文混排按每两个字符一个 token），只用于预算裁剪"""
+    return max(1, len(text) // 2)
+
+
+@dataclass
+class DecisionSession:
+    """一名玩家在一手牌内的对话
+
+    turns 为已经完成的轮次（user/assistant 交替），第一条 user 消息包含对手印象与完整局面。
+    只有解析成功的决策才会追加到会话中，重试不会改变会话。
+    """
+    hand_key: Tuple
+    turns: List[Dict[str, Any]] = field(default_factory=list)
+    seen_actions: int = 0  # 上次决策时已经发给模型的本手行动条数
+
+    def tokens(self, turns: Optional[List[Dict[str, Any]]] = None) -> int:
+        return sum(estimate_tokens(turn["content"]) for turn in (self.turns if turns is None else turns))
+
+    def fit(self, budget: int, reserve: int) -> Tuple[List[Dict[str, Any]], bool]:
+        """在预留 reserve 个 token（静态指令与本次消息）后，返回不超过预算的历史轮次及是否丢弃过轮次
+
+        保留第一轮（完整局面），从第二轮开始成对丢弃最早的增量轮次；只剩第一轮仍超出预算时返回空历史。
+        """
+        turns = list(self.turns)
+        trimmed = False
+        while turns and self.tokens(turns) + reserve > budget:
+            trimmed = True
+            turns = turns[:2] + turns[4:] if len(turns) > 2 else []
+        return turns, trimmed
+
+    def record(self, history: List[Dict[str, Any]], user_turn: Dict[str, Any], assistant: str, seen_actions: int):
+        """决策成功后记录这一轮（history 为本次请求实际发送的历史）"""
+        self.turns = history + [user_turn, {"role": "assistant", "content": assistant}]
+        self.seen_actions = seen_actions
@@ -0,0 +1,205 @@
+# event_bus.py
+# 进程内的事件发布/订阅总线，以及向观战者推送事件的本地 SSE 端点；每个订阅者有独立的有界缓冲，慢客户端不会阻塞对局
+
+import json
+import threading
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Deque, Dict, List, Optional
+
+# 事件类型
+HAND_START = "hand_start"
+COMMUNITY_CARDS = "community_cards"
+ACTION = "action"
+DECISION = "decision"
+REFLECTION = "reflection"
+SHOWDOWN = "showdown"
+HAND_RESULT = "hand_result"
+TOURNAMENT_START = "tournament_start"
+TOURNAMENT_END = "tournament_end"
+
+# 没有事件时发送注释行保持连接（秒）
+HEARTBEAT_SECONDS = 15.0
+
+
+class BusEvent:
+    """一条已发布的事件；SSE 文本在第一次发送时生成，之后所有订阅者共用"""
+
+    __slots__ = ("seq", "type", "data", "_encoded")
+
+    def __init__(self, seq: int, event_type: str, data: Dict[str, Any]):
+        self.seq = seq
+        self.type = event_type
+        self.data = data
+        self._encoded: Optional[bytes] = None
+
+    def encode(self) -> bytes:
+        if self._encoded is None:
+            payload = json.dumps(self.data, ensure_ascii=False, default=str)
+            self._encoded = f"id: {self.seq}\nevent: {self.type}\ndata: {payload}\n\n".encode("utf-8")
+        return self._encoded
+
+
+class Subscription:
+    """单个订阅者的有界缓冲；缓冲满时丢弃最旧的事件并计数，发布方永不等待"""
+
+    def __init__(self, buffer_size: int):
+        self._events: Deque[BusEvent] = deque(maxlen=buffer_size)
+        self._cond = threading.Condition()
+        self.dropped = 0
+        self.closed = False
+
+    def push(self, event: BusEvent):
+        with self._cond:
+            if len(self._events) == self._events.maxlen:
+                self.dropped += 1
+            self._events.append(event)
+            self._cond.notify()
+
+    def get(self, timeout: Optional[float] = None) -> Optional[BusEvent]:
+        """取出下一条事件；超时或总线已关闭且缓冲为空时返回 None"""
+        with self._cond:
+            if not self._events and not self.closed:
+                self._cond.wait(timeout)
+            return self._events.popleft() if self._events else None
+
+    def close(self):
+        with self._cond:
+            self.closed = True
+            self._cond.notify()
+
+    @property
+    def finished(self) -> bool:
+        """已关闭且缓冲中的事件已全部取出"""
+        return self.closed and not self._events
+
+
+class EventBus:
+    """进程内发布/订阅总线
+
+    Args:
+        history: 保留最近多少条事件，新订阅者可以先收到这些事件（或从 Last-Event-ID 之后续传）
+        buffer_size: 每个订阅者缓冲的最大事件数
+    """
+
+    def __init__(self, history: int = 500, buffer_size: int = 1000):
+        self.buffer_size = buffer_size
+        self._lock = threading.Lock()
+        self._seq = 0
+        self._history: Deque[BusEvent] = deque(maxlen=history)
+        self._subscribers: List[Subscription] = []
+        self.closed = False
+
+    def publish(self, event_type: str, data: Dict[str, Any]) -> int:
+        """发布事件，返回事件序号"""
+        with self._lock:
+            self._seq += 1
+            event = BusEvent(self._seq, event_type, data)
+            self._history.append(event)
+            subscribers = list(self._subscribers)
+        for subscription in subscribers:
+            subscription.push(event)
+        return event.seq
+
+    def subscribe(self, last_event_id: Optional[int] = None, replay_history: bool = True) -> Subscription:
+        """订阅事件；replay_history 为 True 时先补发历史中序号大于 last_event_id 的事件"""
+        subscription = Subscription(self.buffer_size)
+        with self._lock:
+            if replay_history:
+                for event in self._history:
+                    if last_event_id is None or event.seq > last_event_id:
+                        subscription.push(event)
+            if self.closed:
+                subscription.close()
+            else:
+                self._subscribers.append(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            if subscription in self._subscribers:
+                self._subscribers.remove(subscription)
+        subscription.close()
+
+    def close(self):
+        """不再发布事件；订阅者取完缓冲中的事件后结束"""
+        with self._lock:
+            self.closed = True
+            subscribers, self._subscribers = self._subscribers, []
+        for subscription in subscribers:
+            subscription.close()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            subscribers = list(self._subscribers)
+            last_seq = self._seq
+        return {
+            "last_event_id": last_seq,
+            "subscribers": len(subscribers),
+            "dropped": sum(s.dropped for s in subscribers),
+        }
+
+
+class LiveServer:
+    """在后台线程中提供 /events（SSE 事件流）和 /status（JSON）的本地HTTP端点"""
+
+    def __init__(self, bus: EventBus, port: int = 8091, host: str = "127.0.0.1"):
+        self.bus = bus
+        self.host = host
+        self.port = port
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> int:
+        """启动服务，返回实际监听的端口（port 为 0 时由系统分配）"""
+        bus = self.bus
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                path = self.path.split("?", 1)[0]
+                if path == "/status":
+                    body = json.dumps(bus.stats()).encode("utf-8")
+                    self.send_response(200)
+                    self.send_header("Content-Type", "application/json; charset=utf-8")
+                    self.send_header("Content-Length", str(len(body)))
+                    self.send_header("Access-Control-Allow-Origin", "*")
+                    self.end_headers()
+                    self.wfile.write(body)
+                elif path == "/events":
+                    self._stream()
+                else:
+                    self.send_error(404)
+
+            def _stream(self):
+                last_event_id = self.headers.get("Last-Event-ID")
+                subscription = bus.subscribe(int(last_event_id) if last_event_id and last_event_id.isdigit() else None)
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream; charset=utf-8")
+                self.send_header("Cache-Control", "no-cache")
+                self.send_header("Access-Control-Allow-Origin", "*")
+                self.end_headers()
+                try:
+                    while not subscription.finished:
+                        event = subscription.get(HEARTBEAT_SECONDS)
+                        self.wfile.write(event.encode() if event else b": keep-alive\n\n")
+                        self.wfile.flush()
+                except (BrokenPipeError, ConnectionResetError):
+                    pass  # 观战者断开连接
+                finally:
+                    bus.unsubscribe(subscription)
+
+            def log_message(self, format, *args):
+                pass  # 不在对局输出中打印访问日志
+
+        self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, name="live-server", daemon=True)
+        self._thread.start()
+        return self.port
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
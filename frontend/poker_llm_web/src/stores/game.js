@@ -1,5 +1,20 @@
 import { defineStore } from 'pinia'
-import { ref, computed } from 'vue'
+import { ref, computed, watch } from 'vue'
+
+// 日志服务（log_server.py）地址，开发时由 vite 代理到本地服务
+const API_BASE = import.meta.env.VITE_LOG_API || '/api'
+// 每次从日志服务加载的手数
+const PAGE_HANDS = 20
+// 距离已加载决策末尾不足该数量时预取下一页
+const PREFETCH_DECISIONS = 10
+
+async function fetchJson(path) {
+  const response = await fetch(`${API_BASE}${path}`)
+  if (!response.ok) {
+    throw new Error(`请求 ${path} 失败: ${response.status}`)
+  }
+  return response.json()
+}
 
 export const useGameStore = defineStore('game', () => {
   // 完整的游戏日志数据（新格式）
@@ -26,14 +41,85 @@ export const useGameStore = defineStore('game', () => {
   const selectedPlayer = ref(null)
   // 手牌结束结算数据
   const handResultData = ref(null)
+  // 从日志服务分页加载时的状态：{ gameId, summary, loadedHands }，本地上传文件时为 null
+  const remoteSource = ref(null)
+  let pendingPage = null
 
   // 设置游戏数据
   function setGameData(data) {
+    remoteSource.value = null
     fullGameLog.value = data
     currentDecisionIndex.value = 0
     currentEventIndex.value = 0
   }
 
+  // 从日志服务加载对局：先取元信息和每手索引，事件与决策按页加载，提示词等大文本在显示时加载
+  async function loadRemoteGame(gameId) {
+    const summary = await fetchJson(`/games/${gameId}`)
+    const metadata = { ...summary }
+    delete metadata.hands
+    remoteSource.value = { gameId, summary, loadedHands: 0 }
+    pendingPage = null
+    fullGameLog.value = { ...metadata, events: [], llm_decisions: [], llm_reflections: [] }
+    currentDecisionIndex.value = 0
+    currentEventIndex.value = 0
+    await loadNextPage()
+  }
+
+  // 加载下一页手牌并追加到已加载的数据末尾（同一时间只有一个请求）
+  function loadNextPage() {
+    const source = remoteSource.value
+    if (!source || source.loadedHands >= source.summary.hands.length) {
+      return Promise.resolve(false)
+    }
+    if (!pendingPage) {
+      pendingPage = fetchJson(`/games/${source.gameId}/hands?offset=${source.loadedHands}&limit=${PAGE_HANDS}`)
+        .then(page => {
+          if (remoteSource.value !== source) return false
+          fullGameLog.value.events.push(...page.events)
+          fullGameLog.value.llm_decisions.push(...page.llm_decisions)
+          fullGameLog.value.llm_reflections.push(...page.llm_reflections)
+          source.loadedHands += page.hands.length
+          return page.hands.length > 0
+        })
+        .finally(() => {
+          pendingPage = null
+        })
+    }
+    return pendingPage
+  }
+
+  // 确保第 index 条决策已加载
+  async function ensureDecisionLoaded(index) {
+    while (index >= llmDecisions.value.length && await loadNextPage()) {
+      // 逐页加载直到覆盖目标决策
+    }
+  }
+
+  // 确保指定手牌已加载
+  async function ensureHandLoaded(handNumber) {
+    const source = remoteSource.value
+    if (!source) return
+    const hand = source.summary.hands.find(h => h.hand_number === handNumber)
+    if (hand) {
+      await ensureDecisionLoaded(hand.first_decision + Math.max(hand.decisions - 1, 0))
+    }
+  }
+
+  // 补全决策的提示词、原始响应和推理内容
+  async function loadDecisionDetail(decision) {
+    if (!remoteSource.value || !decision || decision.prompt !== undefined) return
+    const detail = await fetchJson(`/games/${remoteSource.value.gameId}/decisions/${decision.index}`)
+    Object.assign(decision, detail)
+  }
+
+  // 补全反思的提示词和原始响应
+  async function loadReflectionDetail(reflection) {
+    if (!remoteSource.value || !reflection || reflection.prompt !== undefined) return
+    const detail = await fetchJson(`/games/${remoteSource.value.gameId}/reflections/${reflection.index}`)
+    Object.assign(reflection, detail)
+  }
+
   // 游戏元信息
   const gameMetadata = computed(() => {
     if (!fullGameLog.value) return null
@@ -137,6 +223,20 @@ export const useGameStore = defineStore('game', () => {
     return currentDecision.value.hand_number || 1
   })
 
+  // 决策总数（分页加载时以服务端索引为准）
+  const totalDecisions = computed(() => {
+    if (remoteSource.value) return remoteSource.value.summary.total_decisions
+    return llmDecisions.value.length
+  })
+
+  // 所有手牌编号
+  const handNumbers = computed(() => {
+    if (remoteSource.value) {
+      return remoteSource.value.summary.hands.filter(h => h.decisions > 0).map(h => h.hand_number)
+    }
+    return Object.keys(decisionsByHand.value).map(Number).sort((a, b) => a - b)
+  })
+
   // 玩家统计信息
   const playerStats = computed(() => {
     if (!fullGameLog.value || !fullGameLog.value.players) return []
@@ -217,6 +317,11 @@ export const useGameStore = defineStore('game', () => {
       syncEventIndex()
       return true
     }
+    // 分页加载时下一页尚未到达，保持当前位置等待加载
+    if (remoteSource.value && currentDecisionIndex.value < totalDecisions.value - 1) {
+      loadNextPage().catch(error => console.error('加载手牌失败:', error))
+      return true
+    }
     return false
   }
 
@@ -252,7 +357,8 @@ export const useGameStore = defineStore('game', () => {
   }
 
   // 跳转到指定决策
-  function jumpToDecision(index) {
+  async function jumpToDecision(index) {
+    await ensureDecisionLoaded(index)
     if (index >= 0 && index < llmDecisions.value.length) {
       currentDecisionIndex.value = index
       syncEventIndex()
@@ -260,7 +366,8 @@ export const useGameStore = defineStore('game', () => {
   }
 
   // 跳转到指定手牌
-  function jumpToHand(handNumber) {
+  async function jumpToHand(handNumber) {
+    await ensureHandLoaded(handNumber)
     const decisionIndex = llmDecisions.value.findIndex(d => d.hand_number === handNumber)
     if (decisionIndex !== -1) {
       jumpToDecision(decisionIndex)
@@ -306,12 +413,26 @@ export const useGameStore = defineStore('game', () => {
   }
 
   // 跳到结束
-  function jumpToEnd() {
+  async function jumpToEnd() {
     stopAutoPlay()
+    await ensureDecisionLoaded(totalDecisions.value - 1)
     currentDecisionIndex.value = llmDecisions.value.length - 1
     syncEventIndex()
   }
 
+  // 分页加载：位置接近已加载末尾时预取下一页，进度条拖到未加载位置时补齐；当前决策显示时加载其完整文本
+  watch(currentDecisionIndex, (index) => {
+    if (!remoteSource.value) return
+    if (index >= llmDecisions.value.length) {
+      ensureDecisionLoaded(index).then(syncEventIndex).catch(error => console.error('加载手牌失败:', error))
+    } else if (index >= llmDecisions.value.length - PREFETCH_DECISIONS) {
+      loadNextPage().catch(error => console.error('加载手牌失败:', error))
+    }
+  })
+  watch(currentDecision, (decision) => {
+    loadDecisionDetail(decision).catch(error => console.error('加载决策详情失败:', error))
+  })
+
   // 切换 LLM 详情面板
   function toggleLLMDetails() {
     showLLMDetails.value = !showLLMDetails.value
@@ -384,6 +505,7 @@ export const useGameStore = defineStore('game', () => {
 
   return {
     fullGameLog,
+    remoteSource,
     currentDecisionIndex,
     currentEventIndex,
     replaySpeed,
@@ -408,6 +530,10 @@ export const useGameStore = defineStore('game', () => {
     eventsByHand,
     getHandResult,
     setGameData,
+    loadRemoteGame,
+    loadReflectionDetail,
+    totalDecisions,
+    handNumbers,
     nextDecision,
     prevDecision,
     jumpToDecision,
@@ -12,5 +12,9 @@ export default defineConfig({
   },
   server: {
     host: true,
+    // 分页日志接口由 python log_server.py 提供
+    proxy: {
+      '/api': 'http://127.0.0.1:8090',
+    },
   },
 })
@@ -1,25 +1,50 @@
 # game_controller.py
 # 德州扑克游戏控制器，用于管理多个AI玩家之间的对战
 
+import json
 import os
 import time
 import uuid
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 from poker_engine import PokerTable, Player, GameStage, Action
 from ai_player import AIPlayer, LLMPlayer
 from game_info import GameInfoState
+from hand_features import HandFeatureCache
+from player_stats import PlayerStatsTracker
 from game_logger import GameLogger, PlayerActionLog
+from metrics import MetricsRegistry, MetricsServer
+from event_bus import EventBus, LiveServer, ACTION, HAND_START, TOURNAMENT_END, TOURNAMENT_START
+from profiling import PhaseProfiler, phase
+from pipeline import DecisionPipeline
+from llm_scheduler import LLMScheduler
+from showdown_scheduler import ShowdownScheduler
+from sequential_stats import SequentialComparator
+from checkpoint import CheckpointWriter, LOG_STREAMS, load_checkpoint
+from hand_history import HandHistoryReader, select_hand
+from replay_engine import order_hand_records
 
 
 class GameController:
     """德州扑克游戏控制器，管理多个AI玩家之间的对战"""
 
-    def __init__(self, small_blind: int = 5, big_blind: int = 10, initial_chips: int = 1000):
-        self.table = PokerTable(small_blind=small_blind, big_blind=big_blind)
+    def __init__(self, small_blind: int = 5, big_blind: int = 10, initial_chips: int = 1000,
+                 metrics_port: Optional[int] = None, profile: bool = False,
+                 profile_hands: Optional[Tuple[int, int]] = None, profile_backend: str = "cprofile",
+                 seed: Optional[int] = None, checkpoint_interval: int = 0, log_format: str = "json",
+                 live_port: Optional[int] = None, hand_features: bool = True,
+                 stats_file: Optional[str] = None, pipeline_workers: int = 0,
+                 llm_scheduler: Optional[LLMScheduler] = None,
+                 showdown_scheduler: Optional[ShowdownScheduler] = None):
+        # seed 决定整场锦标赛的发牌，相同种子与相同玩家决策会得到完全相同的牌局
+        self.table = PokerTable(small_blind=small_blind, big_blind=big_blind, seed=seed)
         self.ai_players: List[AIPlayer] = []
         self.initial_chips = initial_chips
         self.game_id = str(uuid.uuid4())[:8]  # 生成一个唯一的游戏ID
         self.log_dir = "game_logs"
+        # 旧版游戏日志的保存格式："json"、"binary"（二进制手牌历史，可按手随机访问）或 "both"
+        if log_format not in ("json", "binary", "both"):
+            raise ValueError(f"不支持的日志格式: {log_format}")
+        self.log_format = log_format
 
         # 创建日志目录
         if not os.path.exists(self.log_dir):
@@ -27,7 +52,52 @@ class GameController:
 
         # 初始化增强的日志记录器
         self.game_logger = GameLogger(game_id=self.game_id, log_dir=self.log_dir)
-        self.game_logger.set_game_config(initial_chips, small_blind, big_blind)
+        self.game_logger.set_game_config(initial_chips, small_blind, big_blind, self.table.seed)
+
+        # 运行指标；指定 metrics_port 时在锦标赛期间开放本地HTTP端点
+        self.metrics = MetricsRegistry()
+        self.metrics_port = metrics_port
+        self.metrics_server: Optional[MetricsServer] = None
+        self._hand_start_time = 0.0
+        self._tournament_start_time = time.time()
+
+        # 观战事件流；指定 live_port 时开放本地 SSE 端点 /events，每个事件实时推送给观战者
+        self.live_port = live_port
+        self.event_bus: Optional[EventBus] = EventBus() if live_port is not None else None
+        self.live_server: Optional[LiveServer] = None
+
+        # 提示词中的牌力特征（成手、听牌、牌面结构、胜率区间），每街计算一次、所有玩家共用
+        self.hand_features: Optional[HandFeatureCache] = HandFeatureCache() if hand_features else None
+
+        # 对手统计（VPIP/PFR/3-bet/AF/WTSD/c-bet）；指定 stats_file 时从该文件继续累积，并在每场锦标赛结束时写回
+        self.stats_file = stats_file
+        self.player_stats = PlayerStatsTracker.load(stats_file) if stats_file else PlayerStatsTracker()
+
+        # 分阶段耗时分析（默认关闭）；profile_hands 指定对哪些手牌做函数级采样
+        self.profiler: Optional[PhaseProfiler] = None
+        if profile or profile_hands:
+            self.profiler = PhaseProfiler(profile_hands=profile_hands, backend=profile_backend)
+
+        # 摊牌调度器：多个控制器共用时，各牌桌的摊牌先登记再合并批量评估；控制器摊牌后等待本桌结算完成
+        self.showdown_scheduler = showdown_scheduler
+
+        # 多张牌桌（多个控制器）共用模型端点时传入同一个调度器，限制并发并在牌桌之间公平分配请求；
+        # 调度器没有指标注册表时使用本控制器的，排队指标随 /metrics 输出（共享时即第一个控制器的注册表）
+        self.llm_scheduler = llm_scheduler
+        if llm_scheduler is not None and llm_scheduler.metrics is None:
+            llm_scheduler.metrics = self.metrics
+
+        # 决策流水线（pipeline_workers 为 0 时关闭）：反思在后台进行，每街开始时预先计算牌力特征
+        self.pipeline: Optional[DecisionPipeline] = None
+        if pipeline_workers:
+            self.pipeline = DecisionPipeline(pipeline_workers, metrics=self.metrics, profiler=self.profiler)
+
+        # 检查点：每隔 checkpoint_interval 手追加一帧快照（0 表示关闭），可用 resume_from_checkpoint 续跑
+        self.checkpoint_interval = checkpoint_interval
+        self._checkpoint_writer: Optional[CheckpointWriter] = None
+        self._checkpoint_cursor = {name: 0 for name in LOG_STREAMS}
+        self._completed_hands = 0
+        self._resumed = False
 
     def add_player(self, ai_player: AIPlayer) -> bool:
         """添加AI玩家到游戏"""
@@ -61,8 +131,7 @@ class GameController:
         # players_info.append(player_info)
 
         # 获取当前对局的行动历史
-        recent_actions = [action for action in self.table.action_history if
-                          action.hand_number == self.table.hand_number]
+        recent_actions = self.table.current_hand_actions()
         # 计算最小加注额
         min_raise = max(self.table.big_blind, self.table.current_bet * 2)
         game_state = GameInfoState(
@@ -78,15 +147,22 @@ class GameController:
             action_history=recent_actions,
             small_blind=self.table.small_blind,
             big_blind=self.table.big_blind,
-            hand_num=self.table.hand_number
+            hand_num=self.table.hand_number,
+            legal_actions=self.table.legal_actions(current_player),
+            features=self.hand_features,
+            player_stats=self.player_stats
         )
 
         return game_state
 
     def run_hand(self, verbose: bool = True):
         """运行一手牌"""
+        self._hand_start_time = time.time()
         # 开始新的一手牌
-        self.table.start_new_hand()
+        log_start = len(self.table.game_log)
+        with phase(self.profiler, "deal"):
+            self.table.start_new_hand()
+        self._publish_table_records(log_start)
 
         if verbose:
             print(f"\n开始第 {self.table.hand_number} 手牌")
@@ -107,13 +183,15 @@ class GameController:
             return
 
         # 进行翻牌
-        self.table.move_to_next_stage()  # 进入翻牌阶段
+        with phase(self.profiler, "deal"):
+            self.table.move_to_next_stage()  # 进入翻牌阶段
         # 记录翻牌事件
-        self.game_logger.log_community_cards(
-            self.table.hand_number,
-            "flop",
-            self.table.community_cards
-        )
+        with phase(self.profiler, "logging"):
+            self.game_logger.log_community_cards(
+                self.table.hand_number,
+                "flop",
+                self.table.community_cards
+            )
         if verbose:
             print(f"在场玩家：{', '.join(f'{p.name}, 筹码:{p.chips}' for p in active_players)}")
             print(f"\n翻牌: {', '.join(str(card) for card in self.table.community_cards)}")
@@ -128,13 +206,15 @@ class GameController:
             return
 
         # 进行转牌
-        self.table.move_to_next_stage()  # 进入转牌阶段
+        with phase(self.profiler, "deal"):
+            self.table.move_to_next_stage()  # 进入转牌阶段
         # 记录转牌事件
-        self.game_logger.log_community_cards(
-            self.table.hand_number,
-            "turn",
-            self.table.community_cards
-        )
+        with phase(self.profiler, "logging"):
+            self.game_logger.log_community_cards(
+                self.table.hand_number,
+                "turn",
+                self.table.community_cards
+            )
         if verbose:
             print(f"在场玩家：{', '.join(f'{p.name}, 筹码:{p.chips}' for p in active_players)}")
             print(f"\n转牌: {', '.join(str(card) for card in self.table.community_cards)}")
@@ -149,27 +229,34 @@ class GameController:
             return
 
         # 进行河牌
-        self.table.move_to_next_stage()  # 进入河牌阶段
+        with phase(self.profiler, "deal"):
+            self.table.move_to_next_stage()  # 进入河牌阶段
         # 记录河牌事件
-        self.game_logger.log_community_cards(
-            self.table.hand_number,
-            "river",
-            self.table.community_cards
-        )
+        with phase(self.profiler, "logging"):
+            self.game_logger.log_community_cards(
+                self.table.hand_number,
+                "river",
+                self.table.community_cards
+            )
         if verbose:
             print(f"在场玩家：{', '.join(f'{p.name}, 筹码:{p.chips}' for p in active_players)}")
             print(f"\n河牌: {', '.join(str(card) for card in self.table.community_cards)}")
         self.run_betting_round(verbose)
 
         # 进行摊牌
-        self.table.move_to_next_stage()  # 进入摊牌阶段
+        with phase(self.profiler, "showdown"):
+            self.table.move_to_next_stage()  # 进入摊牌阶段
+            # 设置了摊牌调度器时摊牌只是登记，需等本桌结算完成（可能与其他牌桌合并为一批）才能记录结果和反思
+            if self.table.showdown_scheduler is not None:
+                self.table.showdown_scheduler.wait(self.table)
 
         # 记录摊牌事件
-        self.game_logger.log_showdown(
-            self.table.hand_number,
-            self.table.community_cards,
-            self.table.players
-        )
+        with phase(self.profiler, "logging"):
+            self.game_logger.log_showdown(
+                self.table.hand_number,
+                self.table.community_cards,
+                self.table.players
+            )
 
         # 显示摊牌结果
         if verbose:
@@ -193,14 +280,36 @@ class GameController:
             winners = [p for p in self.table.players if p.name in winner_names]
 
             # 记录结算结果
-            self.game_logger.log_hand_result(
-                hand_number=self.table.hand_number,
-                pot=game_result.pot,
-                stage=game_result.stage.value,
-                community_cards=game_result.community_cards,
-                all_players=self.table.players,
-                winners=winners
-            )
+            with phase(self.profiler, "logging"):
+                self.game_logger.log_hand_result(
+                    hand_number=self.table.hand_number,
+                    pot=game_result.pot,
+                    stage=game_result.stage.value,
+                    community_cards=game_result.community_cards,
+                    all_players=self.table.players,
+                    winners=winners
+                )
+            self._record_hand_metrics(game_result.pot)
+
+    def _record_hand_metrics(self, pot: int):
+        """一手牌结束时更新指标"""
+        self.metrics.inc("hands_total")
+        self.metrics.observe("hand_seconds", time.time() - self._hand_start_time)
+        self.metrics.observe("pot_size", pot)
+
+    def _publish_table_records(self, since: int):
+        """把牌桌日志中新增的开局与行动记录推送给观战者（开局记录排在盲注之前）"""
+        if not self.event_bus:
+            return
+        for record in sorted(self.table.game_log[since:], key=lambda r: r.get("type") != 1):
+            if record.get("type") == 1:
+                self.event_bus.publish(HAND_START, record)
+            elif record.get("type") == 3:
+                self.event_bus.publish(ACTION, record)
+
+    def _hands_per_hour(self) -> float:
+        elapsed = time.time() - self._tournament_start_time
+        return self.metrics.get_counter("hands_total") * 3600 / elapsed if elapsed > 0 else 0.0
 
     def run_betting_round(self, verbose: bool = True):
         """运行一轮下注"""
@@ -212,6 +321,10 @@ class GameController:
         # 记录当前阶段开始
         if verbose:
             print(f"\n开始 {self.table.stage.value} 阶段下注")
+        round_start = time.time()
+        stage_label = {"stage": self.table.stage.value}
+        if self.pipeline and self.hand_features:
+            self.pipeline.prefetch_features(self.hand_features, self.table)
 
         # 玩家轮流行动，直到回合结束
         first_action = True
@@ -222,7 +335,8 @@ class GameController:
                     # 翻牌前从大盲注后的玩家开始
                     bb_pos = (self.table.dealer_position + 2) % len(self.table.players)
                     self.table.current_player_idx = bb_pos  # 修改：不要+1，因为next_player会+1
-                    print(f'翻牌前下注,从{(bb_pos + 1) % len(self.table.players)}开始')
+                    if verbose:
+                        print(f'翻牌前下注,从{(bb_pos + 1) % len(self.table.players)}开始')
                 else:
                     # 翻牌后从庄家后第一个玩家开始
                     self.table.current_player_idx = self.table.dealer_position  # 修改：不要+1，因为next_player会+1
@@ -237,15 +351,37 @@ class GameController:
             if not ai_player:
                 continue  # 找不到对应的AI玩家，跳过
 
+            # 后台反思更新的是该玩家的记忆，决策前需要等它完成
+            if self.pipeline:
+                self.pipeline.wait_for(ai_player.name)
+
             # 准备游戏状态
             game_state = self.prepare_game_state(current_player)
 
-            # 获取AI决策
-            playerAction = ai_player.make_decision(game_state)
+            # 获取AI决策（LLM玩家内部还会细分为构建提示词、网络请求和解析）
+            with phase(self.profiler, "decision"):
+                playerAction = ai_player.make_decision(game_state)
+
+            # 在本地把不合法的行动修正为合法行动，避免行动被丢弃后再多花一次LLM调用
+            action, amount = self.table.coerce_action(current_player, playerAction.action, playerAction.amount)
+            if (action, amount) != (playerAction.action, playerAction.amount):
+                self.metrics.inc("repaired_actions_total", labels=stage_label)
+                if verbose:
+                    print(f"  {current_player.name} 的行动 {playerAction.action.value} {playerAction.amount} 不合法，"
+                          f"已修正为 {action.value} {amount}")
+                playerAction.action, playerAction.amount = action, amount
 
             # 处理玩家行动
-            success = self.table.process_action(current_player, playerAction.action, playerAction.amount,
-                                                playerAction.behavior)
+            log_start = len(self.table.game_log)
+            with phase(self.profiler, "process_action"):
+                success = self.table.process_action(current_player, playerAction.action, playerAction.amount,
+                                                    playerAction.behavior)
+            self.metrics.inc("actions_total", labels={**stage_label, "action": playerAction.action.value})
+            if not success:
+                self.metrics.inc("invalid_actions_total", labels=stage_label)
+                # 修正后仍失败时按弃牌处理，保证回合能够推进
+                self.table.process_action(current_player, Action.FOLD, 0, playerAction.behavior)
+            self._publish_table_records(log_start)
 
             if verbose:
                 action_str = f"{current_player.name} 选择 {playerAction.action.value}"
@@ -257,16 +393,61 @@ class GameController:
                 print(f'理由是：{playerAction.play_reason}')
                 print(f"  底池: {self.table.pot}")
 
-    def run_tournament(self, num_hands: int = 100, verbose: bool = True):
-        """运行一场锦标赛"""
+        self.metrics.observe("betting_round_seconds", time.time() - round_start, stage_label)
+
+    def run_tournament(self, num_hands: int = 100, verbose: bool = True, log_interval: int = 10,
+                       comparator: Optional[SequentialComparator] = None):
+        """运行一场锦标赛
+
+        Args:
+            num_hands: 计划进行的手数（使用 comparator 时即为手数预算）
+            verbose: 是否打印详细信息
+            log_interval: 每隔多少手保存一次日志，0 表示只在结束时保存（机器人压测时可减少IO）
+            comparator: 序贯比较器；每手结束后更新各玩家 bb/100，排名在统计上确定后提前结束
+        """
         if len(self.ai_players) < 2:
             print("至少需要2名玩家才能开始游戏")
             return
+        # 新的锦标赛（如复式赛的下一轮换）使用新的牌桌与日志，检查点从头写起
+        if not self._resumed:
+            self._reset_checkpoint_state()
 
-        # 为玩家设置相同的初始筹码，并注入game_logger
+        # 为玩家设置相同的初始筹码（从检查点恢复时保留恢复的筹码），并注入game_logger
         for p in self.ai_players:
-            p.player.chips = self.initial_chips
+            if not self._resumed:
+                p.player.chips = self.initial_chips
             p.game_logger = self.game_logger  # 注入日志记录器
+            p.metrics = self.metrics  # 注入指标注册表
+            p.profiler = self.profiler  # 注入分阶段耗时分析器（未开启时为 None）
+            p.llm_scheduler = self.llm_scheduler  # 注入LLM请求调度器（未设置时为 None）
+            p.table_id = self.game_id
+
+        self.game_logger.metrics = self.metrics
+        self.game_logger.event_bus = self.event_bus
+        self.table.player_stats = self.player_stats
+        self.table.showdown_scheduler = self.showdown_scheduler
+        self._tournament_start_time = time.time()
+        self.metrics.register_gauge("hands_per_hour", self._hands_per_hour)
+        self.metrics.register_gauge("log_pending_records", self.game_logger.pending_records)
+        if self.metrics_port is not None and self.metrics_server is None:
+            self.metrics_server = MetricsServer(self.metrics, port=self.metrics_port)
+            port = self.metrics_server.start()
+            if verbose:
+                print(f"指标端点: http://127.0.0.1:{port}/metrics (JSON: /metrics.json)")
+        if self.event_bus and self.live_server is None:
+            self.live_server = LiveServer(self.event_bus, port=self.live_port)
+            port = self.live_server.start()
+            if verbose:
+                print(f"观战事件流: http://127.0.0.1:{port}/events")
+        if self.event_bus:
+            self.event_bus.publish(TOURNAMENT_START, {
+                "game_id": self.game_id,
+                "small_blind": self.table.small_blind,
+                "big_blind": self.table.big_blind,
+                "seed": self.table.seed,
+                "players": self.game_logger.log_data.players,
+                "num_hands": num_hands
+            })
 
         start_time = time.time()
 
@@ -274,11 +455,15 @@ class GameController:
             print(f"开始德州扑克锦标赛 (游戏ID: {self.game_id})")
             print(f"参赛玩家: {', '.join(ai.name for ai in self.ai_players)}")
             print(f"初始筹码: {self.initial_chips}")
+            print(f"随机种子: {self.table.seed}")
             print(f"盲注结构: 小盲 {self.table.small_blind}, 大盲 {self.table.big_blind}")
             print(f"计划进行 {num_hands} 手牌\n")
+            if self._resumed:
+                print(f"从检查点恢复，已完成 {self._completed_hands} 手牌\n")
 
-        # 运行指定数量的牌局
-        for i in range(num_hands):
+        # 运行指定数量的牌局（从检查点恢复时跳过已完成的手牌）
+        tournament_start = time.perf_counter()
+        for i in range(self._completed_hands if self._resumed else 0, num_hands):
             # 检查是否只剩一名玩家
             active_players = [p for p in self.table.players if p.is_active]
             if len(active_players) <= 1:
@@ -290,7 +475,12 @@ class GameController:
                 break
 
             # 运行一手牌
+            chips_before = {p.name: p.chips for p in active_players}
+            if self.profiler:
+                self.profiler.begin_hand(self.table.hand_number + 1)
             self.run_hand(verbose)
+            if self.profiler:
+                self.profiler.end_hand(self.table.hand_number)
             # 添加当局游戏结果汇报
             if verbose:
                 print(f"\n第 {i + 1} 手牌结束")
@@ -299,12 +489,28 @@ class GameController:
 
             # 按照上一局的运行结果各个active_players进行反思
             self.handle_reflection()
-            # 每10手牌保存一次日志
-            if i % 10 == 0:
-                self.save_game_log()
+            # 每 log_interval 手牌保存一次日志
+            if log_interval and i % log_interval == 0:
+                with phase(self.profiler, "logging"):
+                    self.save_game_log()
+
+            if self.checkpoint_interval and (i + 1) % self.checkpoint_interval == 0:
+                with phase(self.profiler, "checkpoint"):
+                    self.save_checkpoint(i + 1)
+
+            if comparator and self._update_comparator(comparator, chips_before):
+                if verbose:
+                    print(f"\n第 {i + 1} 手后排名已在统计上确定，提前结束")
+                break
+
+        # 保存最终游戏日志（会先等待并记录全部后台反思），之后关闭流水线的线程池
+        with phase(self.profiler, "logging"):
+            self.save_game_log()
+        if self.pipeline:
+            self.pipeline.shutdown()
 
-        # 保存最终游戏日志
-        self.save_game_log()
+        if self.stats_file:
+            self.player_stats.save(self.stats_file)
 
         # 显示最终结果
         if verbose:
@@ -315,16 +521,272 @@ class GameController:
                 print(f"{i + 1}. {player.name}: {player.chips} 筹码")
 
             print(f"\n游戏用时: {time.time() - start_time:.2f} 秒")
-            print(f"游戏日志已保存到: {self.get_log_filename()}")
+            if self.log_format != "binary":
+                print(f"游戏日志已保存到: {self.get_log_filename()}")
+            if self.log_format != "json":
+                print(f"手牌历史已保存到: {self.get_hand_history_filename()}")
             print(f"增强日志已保存到: {self.save_enhanced_log()}")
 
+        if comparator:
+            with open(os.path.join(self.log_dir, f"sequential_{self.game_id}.json"), 'w', encoding='utf-8') as f:
+                json.dump(comparator.report(), f, ensure_ascii=False, indent=2)
+            if verbose:
+                print("\n序贯比较结果:")
+                print(comparator.format_report())
+
+        if self.profiler:
+            self.profiler.record("tournament", time.perf_counter() - tournament_start)
+            files = self.profiler.write_report(os.path.join(self.log_dir, f"profile_{self.game_id}.json"))
+            if verbose:
+                print("\n各阶段耗时:")
+                print(self.profiler.format_summary())
+                print(f"耗时分析已保存到: {', '.join(files)}")
+
+        if self._checkpoint_writer:
+            self._checkpoint_writer.close()
+            self._checkpoint_writer = None
+        self._resumed = False
+        self.stop_metrics_server()
+        # 观战端点在锦标赛之间保持开放（复式赛的多轮共用同一个事件流），需要时调用 stop_live_server 关闭
+        if self.event_bus:
+            self.event_bus.publish(TOURNAMENT_END, {
+                "game_id": self.game_id,
+                "hands": self.table.hand_number,
+                "chips": {p.name: p.chips for p in self.table.players}
+            })
+
+    def get_checkpoint_filename(self) -> str:
+        return os.path.join(self.log_dir, f"checkpoint_{self.game_id}.ckpt")
+
+    def _log_streams(self) -> Dict[str, List[Dict[str, Any]]]:
+        log_data = self.game_logger.log_data
+        return {
+            "game_log": self.table.game_log,
+            "events": log_data.events,
+            "llm_decisions": log_data.llm_decisions,
+            "llm_reflections": log_data.llm_reflections,
+        }
+
+    def _reset_checkpoint_state(self):
+        """丢弃上一场锦标赛的检查点进度：关闭写入器，游标与已完成手数归零（下一帧会重新写入元信息）"""
+        if self._checkpoint_writer:
+            self._checkpoint_writer.close()
+            self._checkpoint_writer = None
+        self._checkpoint_cursor = {name: 0 for name in LOG_STREAMS}
+        self._completed_hands = 0
+
+    def save_checkpoint(self, completed_hands: int):
+        """追加一帧检查点：牌桌与玩家状态、玩家记忆，以及自上一帧以来新增的日志记录"""
+        if self.pipeline:
+            self.pipeline.drain()
+        if self._checkpoint_writer is None:
+            # 从检查点恢复时接着原文件写（截掉中断时残留的半帧），否则新建文件
+            self._checkpoint_writer = CheckpointWriter(self.get_checkpoint_filename(), append=self._resumed)
+        payload = {
+            "state": {
+                "completed_hands": completed_hands,
+                "hand_number": self.table.hand_number,
+                "dealer_position": self.table.dealer_position,
+                "seed": self.table.seed,
+                "seats": [{"name": p.name, "chips": p.chips, "is_active": p.is_active} for p in self.table.players],
+                "memories": {ai.name: ai.export_memory() for ai in self.ai_players},
+                "player_stats": self.player_stats.to_dict(),
+            },
+            "logs": {},
+            "game_results": {},
+        }
+        if not any(self._checkpoint_cursor.values()):
+            log_data = self.game_logger.log_data
+            payload["meta"] = {
+                "game_id": self.game_id,
+                "start_time": log_data.start_time,
+                "initial_chips": self.initial_chips,
+                "small_blind": self.table.small_blind,
+                "big_blind": self.table.big_blind,
+                "players": log_data.players,
+            }
+        for name, records in self._log_streams().items():
+            payload["logs"][name] = records[self._checkpoint_cursor[name]:]
+            self._checkpoint_cursor[name] = len(records)
+        for hand_number in range(self._completed_hands + 1, self.table.hand_number + 1):
+            if hand_number in self.table.game_result_log:
+                payload["game_results"][hand_number] = self.table.game_result_log[hand_number]
+        self._completed_hands = completed_hands
+        size = self._checkpoint_writer.write(payload)
+        self.game_logger.mark_persisted()
+        self.metrics.observe("checkpoint_bytes", size)
+
+    def resume_from_checkpoint(self, path: str) -> bool:
+        """从检查点恢复到最后一手完整结束时的状态
+
+        需要先用与原对局相同名字的玩家调用 add_player，恢复后再调用 run_tournament 继续（num_hands 为总手数）。
+        """
+        data = load_checkpoint(path)
+        if data is None:
+            print(f"检查点中没有完整的快照: {path}")
+            return False
+        meta, state = data["meta"], data["state"]
+        if meta is None:
+            print(f"检查点缺少元信息帧，无法恢复: {path}")
+            return False
+        by_name = {ai.name: ai for ai in self.ai_players}
+        missing = [seat["name"] for seat in state["seats"] if seat["name"] not in by_name]
+        if missing:
+            raise ValueError(f"检查点中的玩家未加入对局: {', '.join(missing)}")
+
+        self.game_id = meta["game_id"]
+        self.initial_chips = meta["initial_chips"]
+        self.table = PokerTable(small_blind=meta["small_blind"], big_blind=meta["big_blind"], seed=state["seed"])
+        self.table.hand_number = state["hand_number"]
+        self.table.dealer_position = state["dealer_position"]
+        self.table.game_log = data["logs"]["game_log"]
+        self.table.game_result_log = data["game_results"]
+
+        self.ai_players = []
+        for seat in state["seats"]:
+            ai = by_name[seat["name"]]
+            ai.player.reset_for_new_hand()
+            ai.player.chips = seat["chips"]
+            ai.player.is_active = seat["is_active"]
+            ai.restore_memory(state["memories"].get(ai.name, {}))
+            self.ai_players.append(ai)
+            self.table.add_player(ai.player)
+        if "player_stats" in state:
+            self.player_stats = PlayerStatsTracker.from_dict(state["player_stats"])
+
+        self.game_logger = GameLogger(game_id=self.game_id, log_dir=self.log_dir)
+        self.game_logger.set_game_config(self.initial_chips, meta["small_blind"], meta["big_blind"], state["seed"])
+        log_data = self.game_logger.log_data
+        log_data.start_time = meta["start_time"]
+        log_data.players = meta["players"]
+        log_data.events = data["logs"]["events"]
+        log_data.llm_decisions = data["logs"]["llm_decisions"]
+        log_data.llm_reflections = data["logs"]["llm_reflections"]
+        self.game_logger.mark_persisted()
+
+        self._checkpoint_cursor = {name: len(records) for name, records in self._log_streams().items()}
+        self._completed_hands = state["completed_hands"]
+        self._resumed = True
+        return True
+
+    def _update_comparator(self, comparator: SequentialComparator, chips_before: Dict[str, int]) -> bool:
+        """用这手牌的筹码变化更新序贯比较器，返回排名是否已确定"""
+        players = {p.name: p for p in self.table.players}
+        comparator.update({name: players[name].chips - chips for name, chips in chips_before.items()})
+        for name in chips_before:
+            if players[name].chips == 0:
+                comparator.eliminate(name)
+            mean, low, high = comparator.interval(name)
+            if comparator.stats.get(name) and comparator.stats[name].count > 1:
+                self.metrics.set_gauge("bb_per_100", mean, {"player": name})
+                self.metrics.set_gauge("bb_per_100_ci_half_width", (high - low) / 2, {"player": name})
+        return comparator.is_settled()
+
+    def run_duplicate(self, num_hands: int = 100, verbose: bool = True, log_interval: int = 10,
+                      reset_memory: bool = True) -> Dict[str, Any]:
+        """复式赛：用同一随机种子重放相同的发牌序列，并轮换座位，让每名玩家在每个位置拿到同样的牌
+
+        共进行与玩家数相同次数的轮换，每次轮换都是一场独立的锦标赛（日志ID为 <游戏ID>_r<轮次>），
+        最后按玩家汇总各轮的筹码盈亏和 bb/100，以抵消牌运带来的方差。
+
+        Args:
+            num_hands: 每次轮换进行的手数
+            verbose: 是否打印详细信息
+            log_interval: 每隔多少手保存一次日志
+            reset_memory: 每次轮换前是否清空玩家积累的记忆（避免在已见过的牌局上占便宜）
+        """
+        if len(self.ai_players) < 2:
+            print("至少需要2名玩家才能开始游戏")
+            return {}
+
+        duplicate_id = self.game_id
+        seed = self.table.seed
+        small_blind, big_blind = self.table.small_blind, self.table.big_blind
+        players = list(self.ai_players)
+        rotations = []
+        totals = {ai.name: {"chip_delta": 0, "hands": 0, "per_rotation": []} for ai in players}
+
+        for rotation in range(len(players)):
+            order = players[rotation:] + players[:rotation]
+            self.game_id = f"{duplicate_id}_r{rotation}"
+            self.table = PokerTable(small_blind=small_blind, big_blind=big_blind, seed=seed)
+            self.game_logger = GameLogger(game_id=self.game_id, log_dir=self.log_dir)
+            self.game_logger.set_game_config(self.initial_chips, small_blind, big_blind, seed)
+            self.ai_players = []
+            for ai in order:
+                ai.player.reset_for_new_hand()
+                ai.player.is_active = True
+                if reset_memory:
+                    ai.reset_memory()
+                self.add_player(ai)
+
+            if verbose:
+                print(f"\n===== 复式赛轮换 {rotation + 1}/{len(players)}: 座位 {', '.join(ai.name for ai in order)} =====")
+            self.run_tournament(num_hands=num_hands, verbose=verbose, log_interval=log_interval)
+
+            hands = self.table.hand_number
+            deltas = {ai.name: ai.player.chips - self.initial_chips for ai in order}
+            rotations.append({"rotation": rotation, "game_id": self.game_id,
+                              "seating": [ai.name for ai in order], "hands": hands, "chip_delta": deltas})
+            for name, delta in deltas.items():
+                totals[name]["chip_delta"] += delta
+                totals[name]["hands"] += hands
+                totals[name]["per_rotation"].append(delta)
+
+        for stats in totals.values():
+            hands = stats["hands"]
+            stats["bb_per_100"] = stats["chip_delta"] / big_blind / hands * 100 if hands else 0.0
+
+        summary = {
+            "duplicate_id": duplicate_id,
+            "seed": seed,
+            "hands_per_rotation": num_hands,
+            "rotations": rotations,
+            "players": totals,
+        }
+        filename = os.path.join(self.log_dir, f"duplicate_{duplicate_id}.json")
+        with open(filename, 'w', encoding='utf-8') as f:
+            json.dump(summary, f, ensure_ascii=False, indent=2)
+
+        if verbose:
+            print("\n复式赛汇总:")
+            ranked = sorted(totals.items(), key=lambda kv: kv[1]["bb_per_100"], reverse=True)
+            for i, (name, stats) in enumerate(ranked):
+                print(f"{i + 1}. {name}: 总盈亏 {stats['chip_delta']:+d} 筹码, {stats['bb_per_100']:+.2f} bb/100 "
+                      f"(各轮: {', '.join(f'{d:+d}' for d in stats['per_rotation'])})")
+            print(f"复式赛结果已保存到: {filename}")
+        return summary
+
+    def stop_live_server(self):
+        """关闭观战端点：已连接的观战者收完缓冲中的事件后断开"""
+        if self.event_bus:
+            self.event_bus.close()
+        if self.live_server:
+            self.live_server.stop()
+            self.live_server = None
+
+    def stop_metrics_server(self):
+        """关闭指标端点"""
+        if self.metrics_server:
+            self.metrics_server.stop()
+            self.metrics_server = None
+
     def get_log_filename(self) -> str:
         """获取日志文件名"""
         return os.path.join(self.log_dir, f"poker_game_{self.game_id}.json")
 
+    def get_hand_history_filename(self) -> str:
+        """获取二进制手牌历史文件名"""
+        return os.path.join(self.log_dir, f"poker_game_{self.game_id}.pkh")
+
     def save_game_log(self):
         """保存游戏日志"""
-        self.table.save_game_log(self.get_log_filename())
+        if self.pipeline:
+            self.pipeline.drain()
+        if self.log_format != "binary":
+            self.table.save_game_log(self.get_log_filename())
+        if self.log_format != "json":
+            self.table.save_hand_history(self.get_hand_history_filename())
 
     def save_enhanced_log(self) -> str:
         """保存增强的游戏日志"""
@@ -335,25 +797,43 @@ class GameController:
         # 保存日志
         return self.game_logger.save()
 
-    def replay_game(self, game_id: Optional[str] = None):
-        """重放游戏"""
-        if game_id:
-            filename = os.path.join(self.log_dir, f"poker_game_{game_id}.json")
-        else:
-            filename = self.get_log_filename()
+    def replay_game(self, game_id: Optional[str] = None, hand_number: Optional[int] = None,
+                    interactive: bool = True):
+        """重放游戏
+
+        Args:
+            game_id: 游戏ID，默认为当前游戏
+            hand_number: 只重放指定的一手；存在二进制手牌历史时直接按索引跳转
+            interactive: 每条记录后等待回车
+        """
+        base = os.path.join(self.log_dir, f"poker_game_{game_id or self.game_id}")
+        if os.path.exists(f"{base}.pkh"):
+            reader = HandHistoryReader(f"{base}.pkh")
+            if hand_number is None:
+                self.table.replay_game(reader.iter_records(), interactive)
+            elif hand_number in reader.hand_numbers():
+                self.table.replay_game(order_hand_records(reader.read_hand(hand_number)), interactive)
+            else:
+                print(f"日志中没有第 {hand_number} 手")
+            return
 
+        filename = f"{base}.json"
         if not os.path.exists(filename):
             print(f"找不到游戏日志文件: {filename}")
             return
 
-        # 加载游戏日志
-        self.table.load_game_log(filename)
-
-        # 重放游戏
-        self.table.replay_game()
+        # 流式读取并重放游戏日志，避免将大日志整体载入内存
+        records = self.table.iter_game_log(filename)
+        if hand_number is not None:
+            records = order_hand_records(list(select_hand(records, hand_number)))
+        self.table.replay_game(records, interactive)
 
     def handle_reflection(self):
         game_result = self.table.game_result_log[self.table.hand_number]
         for p in self.ai_players:
             if p.player.is_active:
-                p.reflect_on_game(self.prepare_game_state(p.player), game_result)
+                if self.pipeline:
+                    self.pipeline.submit_reflection(p, self.prepare_game_state(p.player), game_result)
+                    continue
+                with phase(self.profiler, "reflection"):
+                    p.reflect_on_game(self.prepare_game_state(p.player), game_result)
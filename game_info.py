@@ -1,8 +1,10 @@
 from dataclasses import dataclass, field
 from engine_info import Card, Action, GameStage, Player
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple, Any
 
 import prompts
+from hand_features import HandFeatureCache
+from player_stats import PlayerStatsTracker
 
 
 @dataclass
@@ -18,6 +20,83 @@ class GameAction:
     behavior: str = ''
 
 
+@dataclass
+class LegalActions:
+    """某个玩家当前可执行的合法行动（由 PokerTable.legal_actions 根据牌桌状态生成）
+
+    RAISE 的金额与 PokerTable.process_action 一致，表示本次需要投入的筹码数；min_raise 额外以大盲为下限，
+    只用于提示词与 coerce 修正，process_action 仍按当前注的两倍校验。
+    """
+    actions: List[Action] = field(default_factory=list)
+    call_amount: int = 0  # 跟注需要投入的筹码
+    min_raise: int = 0  # 加注最少需要投入的筹码
+    max_raise: int = 0  # 加注最多可以投入的筹码（剩余筹码）
+
+    def is_legal(self, action: Action, amount: int = 0) -> bool:
+        if action not in self.actions:
+            return False
+        if action == Action.RAISE:
+            return self.min_raise <= amount <= self.max_raise
+        return True
+
+    def coerce(self, action: Action, amount: int = 0) -> Tuple[Action, int]:
+        """把不合法的行动就地修正为最接近的合法行动，避免浪费一次LLM调用
+
+        - 面对下注时 CHECK 视为 check/fold，修正为 FOLD
+        - 无需跟注时 CALL 修正为 CHECK
+        - 加注额低于下限时提高到下限；筹码不足以最小加注或超过剩余筹码时改为 ALL_IN
+        """
+        if not self.actions:
+            return action, amount
+        if action == Action.CHECK and action not in self.actions:
+            return Action.FOLD, 0
+        if action == Action.CALL and action not in self.actions:
+            return (Action.CHECK, 0) if Action.CHECK in self.actions else (Action.FOLD, 0)
+        if action == Action.RAISE:
+            if Action.RAISE in self.actions and amount < self.max_raise:
+                return Action.RAISE, max(amount, self.min_raise)
+            if Action.ALL_IN in self.actions:
+                return Action.ALL_IN, self.max_raise
+            return (Action.CALL, self.call_amount) if Action.CALL in self.actions else (Action.CHECK, 0)
+        if action == Action.ALL_IN and action in self.actions:
+            return Action.ALL_IN, self.max_raise
+        if action in self.actions:
+            amount = self.call_amount if action == Action.CALL else 0
+            return action, amount
+        return Action.FOLD, 0
+
+    def describe(self) -> str:
+        """用于提示词的合法行动描述"""
+        parts = []
+        for action in self.actions:
+            if action == Action.CALL:
+                parts.append(f"CALL(需投入{self.call_amount})")
+            elif action == Action.RAISE:
+                parts.append(f"RAISE(投入{self.min_raise}-{self.max_raise})")
+            elif action == Action.ALL_IN:
+                parts.append(f"ALL_IN(投入{self.max_raise})")
+            else:
+                parts.append(action.name)
+        return ", ".join(parts)
+
+    def to_json_schema(self) -> Dict[str, Any]:
+        """生成决策输出的JSON Schema，供支持结构化输出的模型做约束解码
+
+        OpenAI 的 strict 模式不保证支持 minimum/maximum，金额范围不写入 schema，由 coerce 修正。
+        """
+        return {
+            "type": "object",
+            "properties": {
+                "action": {"type": "string", "enum": [action.name for action in self.actions]},
+                "amount": {"type": "integer"},
+                "play_reason": {"type": "string"},
+                "behavior": {"type": "string"},
+            },
+            "required": ["action", "amount", "play_reason", "behavior"],
+            "additionalProperties": False,
+        }
+
+
 @dataclass
 class GameInfoState:
     """游戏状态信息 用于给ai进行决策用的基础信息"""
@@ -34,12 +113,15 @@ class GameInfoState:
     small_blind: int = 0
     big_blind: int = 0
     hand_num: int = 0
+    legal_actions: Optional[LegalActions] = None
+    features: Optional[HandFeatureCache] = None  # 牌力特征缓存，由GameController注入；为空时提示词中不给出特征
+    player_stats: Optional[PlayerStatsTracker] = None  # 对手统计，由GameController注入
 
     def get_common_game_info(self):
         return f"""
         - 当前是第{self.hand_num}轮
         - 小盲/大盲:{self.small_blind}/{self.big_blind}
-        - 公共牌：{', '.join(str(card) for card in self.community_cards) if self.community_cards else '暂无'}
+        - 公共牌：{', '.join(str(card) for card in self.community_cards) if self.community_cards else '暂无'}{self.get_board_texture_info()}
         - 当前阶段：{self.stage.value}
         - 底池：{self.pot}
         - 当前最高下注：{self.current_bet}
@@ -47,6 +129,22 @@ class GameInfoState:
         - 庄家位置：{self.dealer_position}
         """
 
+    def get_board_texture_info(self) -> str:
+        """公共牌结构（同一街所有玩家共用一次计算）"""
+        if self.features is None or not self.community_cards:
+            return ""
+        return f"（牌面：{self.features.board(self.hand_num, self.community_cards).describe()}）"
+
+    def get_hand_features_info(self, player: Player) -> str:
+        """玩家的成手、听牌与胜率区间"""
+        if self.features is None:
+            return ""
+        opponents = sum(1 for p in self.players_info
+                        if p.name != player.name and p.is_active and not p.folded)
+        features = self.features.player(self.hand_num, self.stage, player.name, player.hand,
+                                        self.community_cards, opponents)
+        return features.describe()
+
     def get_simple_game_info(self):
         return f"""
         - 当前是第{self.hand_num}轮
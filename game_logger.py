@@ -3,10 +3,12 @@
 
 import json
 import os
+import time
 from datetime import datetime
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 from dataclasses import dataclass, field, asdict
 from engine_info import Card, Action, GameStage
+from event_bus import COMMUNITY_CARDS, DECISION, HAND_RESULT, REFLECTION, SHOWDOWN
 
 
 @dataclass
@@ -47,6 +49,8 @@ class LLMDecisionLog:
     # 元信息
     response_time: float = 0.0  # 响应时间（秒）
     error: str = ""  # 错误信息（如果有）
+    timings: Dict[str, float] = field(default_factory=dict)  # 分阶段耗时（prompt_build/llm_network/parse，含重试）及尝试次数
+    usage: Dict[str, int] = field(default_factory=dict)  # 服务端返回的token用量，cached_tokens 为命中提示词缓存的输入token
 
 
 @dataclass
@@ -88,6 +92,8 @@ class HandStartLog:
     dealer: int = 0
     small_blind: int = 0
     big_blind: int = 0
+    seed: int = 0
+    deck_seed: int = 0
     players: List[Dict[str, Any]] = field(default_factory=list)
 
 
@@ -166,6 +172,7 @@ class EnhancedGameLog:
     initial_chips: int = 0
     small_blind: int = 0
     big_blind: int = 0
+    seed: Optional[int] = None  # 牌桌随机种子，配合手数可以复现任意一手的发牌
 
     # 玩家信息
     players: List[Dict[str, Any]] = field(default_factory=list)
@@ -193,16 +200,42 @@ class GameLogger:
             game_id=game_id,
             start_time=datetime.now().isoformat()
         )
+        self.metrics = None  # 运行指标注册表，由GameController注入
+        self.event_bus = None  # 观战事件总线，由GameController注入（未开启时为 None）
+        self._saved_records = 0  # 上次保存日志文件或写入检查点帧时已持久化的记录数
 
         # 创建日志目录
         if not os.path.exists(log_dir):
             os.makedirs(log_dir)
 
-    def set_game_config(self, initial_chips: int, small_blind: int, big_blind: int):
+    def _total_records(self) -> int:
+        return len(self.log_data.events) + len(self.log_data.llm_decisions) + len(self.log_data.llm_reflections)
+
+    def pending_records(self) -> int:
+        """尚未持久化的记录数（日志写入队列深度）：自上次 save() 或检查点帧以来新增的记录"""
+        return self._total_records() - self._saved_records
+
+    def mark_persisted(self):
+        """当前全部记录已由其他途径（检查点帧）持久化"""
+        self._saved_records = self._total_records()
+
+    def _record_metric(self, kind: str):
+        if self.metrics:
+            self.metrics.inc("log_records_total", labels={"kind": kind})
+
+    def _publish(self, event_type: str, record: Dict[str, Any], exclude: Tuple[str, ...] = ()):
+        """把刚记录的日志推送给观战者；exclude 中的大文本字段不推送"""
+        if self.event_bus:
+            if exclude:
+                record = {key: value for key, value in record.items() if key not in exclude}
+            self.event_bus.publish(event_type, record)
+
+    def set_game_config(self, initial_chips: int, small_blind: int, big_blind: int, seed: Optional[int] = None):
         """设置游戏配置"""
         self.log_data.initial_chips = initial_chips
         self.log_data.small_blind = small_blind
         self.log_data.big_blind = big_blind
+        self.log_data.seed = seed
 
     def set_players(self, players: List[Any]):
         """设置玩家信息"""
@@ -221,6 +254,7 @@ class GameLogger:
             self.log_data.events.append(asdict(event))
         else:
             self.log_data.events.append(event)
+        self._record_metric("event")
 
     def log_llm_decision(
         self,
@@ -237,7 +271,9 @@ class GameLogger:
         behavior: str,
         reasoning_content: str = "",
         response_time: float = 0.0,
-        error: str = ""
+        error: str = "",
+        timings: Optional[Dict[str, float]] = None,
+        usage: Optional[Dict[str, int]] = None
     ):
         """记录LLM决策过程"""
         decision_log = LLMDecisionLog(
@@ -255,9 +291,14 @@ class GameLogger:
             play_reason=play_reason,
             behavior=behavior,
             response_time=response_time,
-            error=error
+            error=error,
+            timings=dict(timings or {}),
+            usage=dict(usage or {})
         )
-        self.log_data.llm_decisions.append(asdict(decision_log))
+        record = asdict(decision_log)
+        self.log_data.llm_decisions.append(record)
+        self._record_metric("decision")
+        self._publish(DECISION, record, exclude=("prompt",))
 
     def log_llm_reflection(
         self,
@@ -280,7 +321,10 @@ class GameLogger:
             raw_response=raw_response,
             updated_opinions=updated_opinions
         )
-        self.log_data.llm_reflections.append(asdict(reflection_log))
+        record = asdict(reflection_log)
+        self.log_data.llm_reflections.append(record)
+        self._record_metric("reflection")
+        self._publish(REFLECTION, record, exclude=("prompt",))
 
     def log_community_cards(self, hand_number: int, stage: str, community_cards: List[Any]):
         """记录公共牌出现"""
@@ -290,7 +334,10 @@ class GameLogger:
             stage=stage,
             community_cards=[str(card) for card in community_cards]
         )
-        self.log_data.events.append(asdict(cards_log))
+        record = asdict(cards_log)
+        self.log_data.events.append(record)
+        self._record_metric("event")
+        self._publish(COMMUNITY_CARDS, record)
 
     def log_showdown(self, hand_number: int, community_cards: List[Any], players: List[Any]):
         """记录摊牌"""
@@ -308,7 +355,10 @@ class GameLogger:
                 for p in players if not p.folded
             ]
         )
-        self.log_data.events.append(asdict(showdown_log))
+        record = asdict(showdown_log)
+        self.log_data.events.append(record)
+        self._record_metric("event")
+        self._publish(SHOWDOWN, record)
 
     def log_hand_result(
         self,
@@ -357,7 +407,10 @@ class GameLogger:
             side_pots=side_pots or [],
             timestamp=datetime.now().isoformat()
         )
-        self.log_data.events.append(asdict(result_log))
+        record = asdict(result_log)
+        self.log_data.events.append(record)
+        self._record_metric("event")
+        self._publish(HAND_RESULT, record)
 
     def set_final_rankings(self, players: List[Any]):
         """设置最终排名"""
@@ -382,9 +435,13 @@ class GameLogger:
 
     def save(self) -> str:
         """保存日志到文件"""
+        start_time = time.time()
         filename = os.path.join(self.log_dir, f"enhanced_poker_game_{self.game_id}.json")
         with open(filename, 'w', encoding='utf-8') as f:
             json.dump(asdict(self.log_data), f, ensure_ascii=False, indent=2)
+        self.mark_persisted()
+        if self.metrics:
+            self.metrics.observe("log_save_seconds", time.time() - start_time)
         return filename
 
     def get_summary(self) -> Dict[str, Any]:
@@ -417,6 +474,7 @@ def convert_legacy_log(legacy_log: List[Dict[str, Any]], game_id: str) -> Enhanc
         if event.get("type") == 1:  # HandStartLog
             enhanced_log.small_blind = event.get("small_blind", 0)
             enhanced_log.big_blind = event.get("big_blind", 0)
+            enhanced_log.seed = event.get("seed")
             if event.get("players"):
                 enhanced_log.players = [
                     {
@@ -0,0 +1,324 @@
+# hand_evaluator.py
+# 基于整数编码的快速牌力评估与胜率（equity）计算，供日志分析、机器人玩家等离线场景使用
+
+import random
+from functools import lru_cache
+from itertools import combinations
+from typing import Iterable, List, Optional, Sequence, Tuple
+from engine_info import Card, Suit
+
+try:
+    import numpy as np
+except ImportError:  # 批量评估在未安装 numpy 时逐手调用 evaluate，结果相同
+    np = None
+
+# 牌的整数编码：card = (value - 2) * 4 + suit_index，取值 0-51
+SUITS = list(Suit)
+SUIT_INDEX = {suit: i for i, suit in enumerate(SUITS)}
+SUIT_SYMBOL_INDEX = {suit.value: i for i, suit in enumerate(SUITS)}
+VALUE_CHARS = {'J': 11, 'Q': 12, 'K': 13, 'A': 14}
+FULL_DECK = tuple(range(52))
+# 批量评估时少于该手数直接逐手评估（数组运算的固定开销在小批量时得不偿失）
+BATCH_MIN_ROWS = 16
+
+# 牌型类别，与 poker_engine.HandRank 的取值一致
+HIGH_CARD = 1
+ONE_PAIR = 2
+TWO_PAIR = 3
+THREE_OF_A_KIND = 4
+STRAIGHT = 5
+FLUSH = 6
+FULL_HOUSE = 7
+FOUR_OF_A_KIND = 8
+STRAIGHT_FLUSH = 9
+ROYAL_FLUSH = 10
+
+
+def card_to_int(card: Card) -> int:
+    return (card.value - 2) * 4 + SUIT_INDEX[card.suit]
+
+
+def parse_card(card_str: str) -> int:
+    """将日志中的牌面字符串（如 "♠A"、"♥10"）转为整数编码"""
+    suit = SUIT_SYMBOL_INDEX[card_str[0]]
+    value_str = card_str[1:]
+    value = VALUE_CHARS.get(value_str) or int(value_str)
+    return (value - 2) * 4 + suit
+
+
+def parse_cards(cards: Iterable[str]) -> List[int]:
+    return [parse_card(c) for c in cards]
+
+
+def int_to_card(card: int) -> Card:
+    return Card(SUITS[card % 4], card // 4 + 2)
+
+
+def _build_straight_table() -> List[int]:
+    """预计算 13 位点数掩码对应的最大顺子高张（0 表示不成顺）"""
+    table = [0] * (1 << 13)
+    for mask in range(1 << 13):
+        for high in range(14, 5, -1):
+            window = 0b11111 << (high - 6)
+            if mask & window == window:
+                table[mask] = high
+                break
+        else:
+            wheel = (1 << 12) | 0b1111  # A-2-3-4-5
+            if mask & wheel == wheel:
+                table[mask] = 5
+    return table
+
+
+_STRAIGHT_HIGH = _build_straight_table()
+
+
+def _top_ranks(mask: int, n: int) -> List[int]:
+    """从点数掩码中取出最大的 n 个点数"""
+    ranks = []
+    bit = 12
+    while bit >= 0 and len(ranks) < n:
+        if mask >> bit & 1:
+            ranks.append(bit + 2)
+        bit -= 1
+    return ranks
+
+
+def _encode(category: int, kickers: Sequence[int]) -> int:
+    code = category
+    for i in range(5):
+        code = (code << 4) | (kickers[i] if i < len(kickers) else 0)
+    return code
+
+
+def evaluate(cards: Sequence[int]) -> int:
+    """评估 5-7 张牌的最佳牌型，返回可直接比较大小的整数（越大越好）"""
+    counts = [0] * 13
+    suit_masks = [0, 0, 0, 0]
+    rank_mask = 0
+    for card in cards:
+        rank = card >> 2
+        counts[rank] += 1
+        suit_masks[card & 3] |= 1 << rank
+        rank_mask |= 1 << rank
+
+    for mask in suit_masks:
+        if bin(mask).count("1") >= 5:
+            high = _STRAIGHT_HIGH[mask]
+            if high == 14:
+                return _encode(ROYAL_FLUSH, [14])
+            if high:
+                return _encode(STRAIGHT_FLUSH, [high])
+            flush = _top_ranks(mask, 5)
+            break
+    else:
+        flush = None
+
+    quads, trips, pairs, singles = [], [], [], []
+    for rank in range(12, -1, -1):
+        count = counts[rank]
+        if count == 4:
+            quads.append(rank + 2)
+        elif count == 3:
+            trips.append(rank + 2)
+        elif count == 2:
+            pairs.append(rank + 2)
+        elif count == 1:
+            singles.append(rank + 2)
+
+    if quads:
+        kicker = max(trips + pairs + singles + quads[1:], default=0)
+        return _encode(FOUR_OF_A_KIND, [quads[0], kicker])
+    if trips and (len(trips) > 1 or pairs):
+        pair = max(trips[1:] + pairs)
+        return _encode(FULL_HOUSE, [trips[0], pair])
+    if flush:
+        return _encode(FLUSH, flush)
+    high = _STRAIGHT_HIGH[rank_mask]
+    if high:
+        return _encode(STRAIGHT, [high])
+    if trips:
+        return _encode(THREE_OF_A_KIND, [trips[0]] + singles[:2])
+    if len(pairs) >= 2:
+        kicker = max(pairs[2:] + singles, default=0)
+        return _encode(TWO_PAIR, [pairs[0], pairs[1], kicker])
+    if pairs:
+        return _encode(ONE_PAIR, [pairs[0]] + singles[:3])
+    return _encode(HIGH_CARD, singles[:5])
+
+
+def hand_category(code: int) -> int:
+    """从评估结果中取出牌型类别（对应 HandRank 的取值）"""
+    return code >> 20
+
+
+@lru_cache(maxsize=1)
+def _batch_tables():
+    """批量评估用的查找表（均以 13 位点数掩码为下标）：顺子高张、前 5 大点数的编码、去掉最高位后的掩码、位数"""
+    top5 = [0] * (1 << 13)
+    drop_top = [0] * (1 << 13)
+    for mask in range(1, 1 << 13):
+        top5[mask] = _encode(0, _top_ranks(mask, 5))
+        drop_top[mask] = mask & ~(1 << (mask.bit_length() - 1))
+    popcount = [bin(mask).count("1") for mask in range(1 << 13)]
+    return (np.array(_STRAIGHT_HIGH, dtype=np.int64), np.array(top5, dtype=np.int64),
+            np.array(drop_top, dtype=np.int64), np.array(popcount, dtype=np.int64))
+
+
+def _evaluate_batch_numpy(cards) -> "np.ndarray":
+    """evaluate 的向量化版本，逐项结果与 evaluate 完全一致"""
+    straight, top5, drop_top, popcount = _batch_tables()
+    ranks = cards >> 2
+    suits = cards & 3
+    bits = 1 << np.arange(13, dtype=np.int64)
+    rows = len(cards)
+    counts = np.bincount((np.arange(rows)[:, None] * 13 + ranks).ravel(), minlength=rows * 13).reshape(rows, 13)
+    rank_mask = (counts > 0) @ bits
+    quads = (counts == 4) @ bits
+    trips = (counts == 3) @ bits
+    pairs = (counts == 2) @ bits
+    singles = (counts == 1) @ bits
+
+    # 至多 7 张牌时最多只有一种花色能凑成同花
+    rank_bits = 1 << ranks
+    suit_masks = np.stack([np.where(suits == suit, rank_bits, 0).sum(axis=1) for suit in range(4)], axis=1)
+    flush = np.where(popcount[suit_masks] >= 5, suit_masks, 0).sum(axis=1)
+    straight_flush_high = straight[flush]
+    straight_high = straight[rank_mask]
+
+    # 与 evaluate 中的判断顺序一致；top5[m] >> 16 为掩码中的最大点数
+    conditions = [
+        straight_flush_high == 14,
+        straight_flush_high > 0,
+        quads > 0,
+        (trips > 0) & ((drop_top[trips] > 0) | (pairs > 0)),
+        flush > 0,
+        straight_high > 0,
+        trips > 0,
+        drop_top[pairs] > 0,
+        pairs > 0,
+    ]
+    choices = [
+        np.full(rows, _encode(ROYAL_FLUSH, [14]), dtype=np.int64),
+        STRAIGHT_FLUSH << 20 | straight_flush_high << 16,
+        FOUR_OF_A_KIND << 20 | (top5[quads] >> 16) << 16 | (top5[rank_mask & ~quads] >> 16) << 12,
+        FULL_HOUSE << 20 | (top5[trips] >> 16) << 16 | (top5[drop_top[trips] | pairs] >> 16) << 12,
+        FLUSH << 20 | top5[flush],
+        STRAIGHT << 20 | straight_high << 16,
+        THREE_OF_A_KIND << 20 | (top5[trips] >> 16) << 16 | (top5[singles] >> 12) << 8,
+        TWO_PAIR << 20 | (top5[pairs] >> 12) << 12 | (top5[drop_top[drop_top[pairs]] | singles] >> 16) << 8,
+        ONE_PAIR << 20 | (top5[pairs] >> 16) << 16 | (top5[singles] >> 8) << 4,
+    ]
+    return np.select(conditions, choices, HIGH_CARD << 20 | top5[singles])
+
+
+def evaluate_batch(cards) -> List[int]:
+    """一次评估多手牌，返回与 evaluate 相同的整数编码列表
+
+    Args:
+        cards: 形如 (N, 7) 的整数数组（也可以是等长列表的列表），每行是一名玩家的底牌加公共牌，
+            每行 5-7 张；可以混合来自多张牌桌的玩家
+    """
+    if np is None or len(cards) < BATCH_MIN_ROWS:
+        return [evaluate(row) for row in cards]
+    array = np.asarray(cards, dtype=np.int64)
+    if array.ndim != 2 or not 5 <= array.shape[1] <= 7:
+        raise ValueError(f"批量评估需要 (N, 5-7) 的牌数组，实际为 {array.shape}")
+    return _evaluate_batch_numpy(array).tolist()
+
+
+def _showdown_share(hero: Sequence[int], villains: Sequence[Sequence[int]], board: Sequence[int]) -> float:
+    """一次摊牌中英雄获得的底池份额（平分时按人数均分）"""
+    hero_code = evaluate(list(hero) + list(board))
+    best = hero_code
+    winners = 1
+    for villain in villains:
+        code = evaluate(list(villain) + list(board))
+        if code > best:
+            return 0.0
+        if code == best:
+            winners += 1
+    return 1.0 / winners
+
+
+@lru_cache(maxsize=200000)
+def _equity_cached(hero: Tuple[int, ...], board: Tuple[int, ...], villains: Tuple[Tuple[int, ...], ...],
+                   random_opponents: int, iterations: int, seed: int) -> float:
+    dead = set(hero) | set(board)
+    for villain in villains:
+        dead.update(villain)
+    remaining = [c for c in FULL_DECK if c not in dead]
+    missing = 5 - len(board)
+
+    # 对手手牌全部已知且剩余公共牌组合不多时，精确枚举
+    if random_opponents == 0:
+        runouts = 1
+        for i in range(missing):
+            runouts = runouts * (len(remaining) - i) // (i + 1)
+        if runouts <= iterations:
+            total = 0.0
+            for runout in combinations(remaining, missing):
+                total += _showdown_share(hero, villains, board + runout)
+            return total / runouts
+
+    rng = random.Random(seed)
+    need = missing + 2 * random_opponents
+    total = 0.0
+    for _ in range(iterations):
+        sample = rng.sample(remaining, need)
+        opponents = list(villains) + [sample[missing + 2 * i: missing + 2 * i + 2] for i in range(random_opponents)]
+        total += _showdown_share(hero, opponents, board + tuple(sample[:missing]))
+    return total / iterations
+
+
+def calculate_equity(hero: Sequence[int], board: Sequence[int] = (),
+                     villains: Sequence[Sequence[int]] = (), random_opponents: int = 0,
+                     iterations: int = 1000, seed: Optional[int] = None) -> float:
+    """计算英雄手牌的胜率（平局按份额计）
+
+    Args:
+        hero: 英雄的两张底牌（整数编码）
+        board: 已发出的公共牌
+        villains: 已知的对手手牌
+        random_opponents: 手牌未知（按随机范围处理）的对手数量
+        iterations: 蒙特卡洛采样次数；可精确枚举时作为枚举规模上限
+        seed: 采样随机种子，默认由输入牌面推导，保证结果可复现并可缓存
+    """
+    hero_key = tuple(sorted(hero))
+    board_key = tuple(sorted(board))
+    villain_key = tuple(sorted(tuple(sorted(v)) for v in villains))
+    if not villain_key and random_opponents == 0:
+        return 1.0
+    if seed is None:
+        seed = hash((hero_key, board_key, villain_key, random_opponents)) & 0xFFFFFFFF
+    return _equity_cached(hero_key, board_key, villain_key, random_opponents, iterations, seed)
+
+
+def calculate_equity_batch(hero: Sequence[int], board: Sequence[int] = (), random_opponents: int = 1,
+                           iterations: int = 1000, seed: Optional[int] = None) -> float:
+    """对随机范围的对手做蒙特卡洛胜率估计，所有采样一次交给向量化评估（平局按份额计）
+
+    与 calculate_equity 的采样序列不同，数值只在误差范围内一致；未安装 numpy 时退回 calculate_equity。
+    """
+    if np is None:
+        return calculate_equity(hero, board, random_opponents=random_opponents, iterations=iterations, seed=seed)
+    if random_opponents == 0:
+        return 1.0
+    dead = set(hero) | set(board)
+    remaining = np.array([c for c in FULL_DECK if c not in dead], dtype=np.int64)
+    missing = 5 - len(board)
+    if seed is None:
+        seed = hash((tuple(sorted(hero)), tuple(sorted(board)), random_opponents)) & 0xFFFFFFFF
+    rng = np.random.default_rng(seed)
+    # 每次采样各自打乱剩余的牌，前 missing 张补齐公共牌，之后每两张是一名对手的底牌
+    sample = remaining[rng.random((iterations, len(remaining))).argsort(axis=1)[:, :missing + 2 * random_opponents]]
+    full_board = np.concatenate([np.broadcast_to(np.array(board, dtype=np.int64), (iterations, len(board))),
+                                 sample[:, :missing]], axis=1)
+    hands = [np.broadcast_to(np.array(hero, dtype=np.int64), (iterations, 2))]
+    hands += [sample[:, missing + 2 * i: missing + 2 * i + 2] for i in range(random_opponents)]
+    codes = _evaluate_batch_numpy(np.concatenate([np.concatenate([hand, full_board], axis=1) for hand in hands]))
+    codes = codes.reshape(random_opponents + 1, iterations)
+    best = codes.max(axis=0)
+    winners = (codes == best).sum(axis=0)
+    return float(np.where(codes[0] == best, 1.0 / winners, 0.0).mean())
+
@@ -0,0 +1,240 @@
+# hand_features.py
+# 提示词用的牌力与听牌特征：成手类别、踢脚、同花/顺子听牌 outs、牌面结构、胜率区间；
+# 牌面结构每街计算一次、所有玩家共用，玩家特征按 (手数, 阶段, 玩家) 缓存
+
+from concurrent.futures import Executor, Future
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from engine_info import Card, GameStage
+from hand_evaluator import (_STRAIGHT_HIGH, FLUSH, HIGH_CARD, ONE_PAIR, STRAIGHT, calculate_equity_batch, card_to_int,
+                            evaluate, hand_category)
+
+CATEGORY_NAMES = {
+    1: "高牌", 2: "一对", 3: "两对", 4: "三条", 5: "顺子",
+    6: "同花", 7: "葫芦", 8: "四条", 9: "同花顺", 10: "皇家同花顺",
+}
+RANK_CHARS = {11: "J", 12: "Q", 13: "K", 14: "A"}
+
+# 胜率区间的上界与名称
+EQUITY_BUCKETS = ((0.2, "0-20%"), (0.4, "20-40%"), (0.6, "40-60%"), (0.8, "60-80%"), (1.01, "80-100%"))
+# 计算胜率的蒙特卡洛采样次数（对手手牌按随机范围处理）
+EQUITY_ITERATIONS = 1000
+
+
+def rank_str(rank: int) -> str:
+    return RANK_CHARS.get(rank, str(rank))
+
+
+def equity_bucket(equity: float) -> str:
+    for upper, name in EQUITY_BUCKETS:
+        if equity < upper:
+            return name
+    return EQUITY_BUCKETS[-1][1]
+
+
+@dataclass
+class BoardTexture:
+    """公共牌结构"""
+    paired: bool = False  # 公共牌有对子（或更多同点）
+    monotone: bool = False  # 公共牌全部同花色（至少3张）
+    flush_possible: bool = False  # 某花色已有3张及以上
+    two_tone: bool = False  # 还有牌要发且某花色恰有2张（存在同花听牌）
+    connected: bool = False  # 存在3张点数落在5个连续点数之内（可能成顺）
+
+    def describe(self) -> str:
+        parts = []
+        if self.paired:
+            parts.append("有对子")
+        if self.monotone:
+            parts.append("单一花色")
+        elif self.flush_possible:
+            parts.append("可成同花")
+        elif self.two_tone:
+            parts.append("有同花听牌")
+        if self.connected:
+            parts.append("连张可成顺")
+        return "、".join(parts) or "干燥"
+
+
+@dataclass
+class HandFeatures:
+    """一名玩家在某一街的牌力特征"""
+    made_hand: str = ""  # 成手类别
+    kickers: List[int] = field(default_factory=list)  # 牌型编码中的点数（依次比较）
+    board_plays: bool = False  # 成手完全来自公共牌，手牌没有改进
+    flush_draw: bool = False
+    straight_draw: str = ""  # "两头顺" / "卡顺" / ""
+    outs: int = 0  # 同花与顺子听牌合计的 outs（已去重）
+    equity: float = 0.0
+    opponents: int = 0
+
+    def describe(self) -> str:
+        made = f"{self.made_hand}({', '.join(rank_str(r) for r in self.kickers)})"
+        if self.board_plays:
+            made += "，来自公共牌"
+        parts = [f"成手 {made}"]
+        draws = [name for name in ("同花听牌" if self.flush_draw else "", self.straight_draw) if name]
+        if draws:
+            parts.append(f"听牌 {'+'.join(draws)}，共{self.outs}张outs")
+        if self.opponents:
+            parts.append(f"胜率约 {equity_bucket(self.equity)}（对{self.opponents}名对手）")
+        return "；".join(parts)
+
+
+def board_texture(board: Sequence[int]) -> BoardTexture:
+    """分析公共牌结构（整数编码）"""
+    if not board:
+        return BoardTexture()
+    ranks = [card >> 2 for card in board]
+    suit_counts = [0, 0, 0, 0]
+    for card in board:
+        suit_counts[card & 3] += 1
+    rank_mask = 0
+    for rank in ranks:
+        rank_mask |= 1 << rank
+    # 把 A 同时当作最小的点数，检查任意 5 个连续点数内是否有 3 张
+    wheel_mask = (rank_mask << 1) | (rank_mask >> 12 & 1)
+    connected = any(bin(wheel_mask >> low & 0b11111).count("1") >= 3 for low in range(10))
+    return BoardTexture(
+        paired=len(set(ranks)) < len(ranks),
+        monotone=len(board) >= 3 and max(suit_counts) == len(board),
+        flush_possible=max(suit_counts) >= 3,
+        two_tone=len(board) < 5 and max(suit_counts) == 2,
+        connected=connected,
+    )
+
+
+def _decode_kickers(code: int) -> List[int]:
+    kickers = [(code >> shift) & 0xF for shift in (16, 12, 8, 4, 0)]
+    return [k for k in kickers if k]
+
+
+def _straight_out_ranks(hole: Sequence[int], board: Sequence[int]) -> List[int]:
+    """补上后能让手牌组成顺子（且不是公共牌自己成顺）的点数"""
+    def mask_of(cards):
+        mask = 0
+        for card in cards:
+            mask |= 1 << (card >> 2)
+        return mask
+
+    hero_mask = mask_of(list(hole) + list(board))
+    board_mask = mask_of(board)
+    outs = []
+    for rank in range(13):
+        bit = 1 << rank
+        if hero_mask & bit:
+            continue
+        if _STRAIGHT_HIGH[hero_mask | bit] and not _STRAIGHT_HIGH[board_mask | bit]:
+            outs.append(rank)
+    return outs
+
+
+def hand_features(hole: Sequence[int], board: Sequence[int], opponents: int = 0,
+                  iterations: int = EQUITY_ITERATIONS) -> HandFeatures:
+    """计算一名玩家的牌力特征
+
+    Args:
+        hole: 两张底牌（整数编码）
+        board: 已发出的公共牌
+        opponents: 仍在牌局中的对手数，为 0 时不计算胜率
+        iterations: 胜率的采样次数
+    """
+    code = evaluate(list(hole) + list(board))
+    category = hand_category(code)
+    board_plays = bool(board) and hand_category(evaluate(board)) == category and category > HIGH_CARD
+    if not board and category == ONE_PAIR:
+        made_hand = "口袋对子"
+    elif not board:
+        made_hand = "同花高牌" if (hole[0] & 3) == (hole[1] & 3) else "高牌"
+    else:
+        made_hand = CATEGORY_NAMES[category]
+    features = HandFeatures(made_hand=made_hand, kickers=_decode_kickers(code), board_plays=board_plays,
+                            opponents=opponents)
+
+    # 只在还有牌要发的翻牌和转牌计算听牌
+    if 3 <= len(board) < 5:
+        cards = list(hole) + list(board)
+        out_cards = set()
+        if category < FLUSH:
+            for suit in range(4):
+                suited = [card for card in cards if card & 3 == suit]
+                if len(suited) == 4 and any(card & 3 == suit for card in hole):
+                    features.flush_draw = True
+                    out_cards.update(rank * 4 + suit for rank in range(13) if rank * 4 + suit not in suited)
+        if category < STRAIGHT:
+            ranks = _straight_out_ranks(hole, board)
+            if ranks:
+                features.straight_draw = "两头顺" if len(ranks) >= 2 else "卡顺"
+                out_cards.update(rank * 4 + suit for rank in ranks for suit in range(4))
+        features.outs = len(out_cards)
+
+    if opponents:
+        features.equity = calculate_equity_batch(hole, board, random_opponents=opponents, iterations=iterations)
+    return features
+
+
+class HandFeatureCache:
+    """按街缓存的特征：牌面结构按 (手数, 公共牌) 共用，玩家特征按 (手数, 阶段, 玩家) 计算一次
+
+    新的一手开始时丢弃之前的缓存。同一街内玩家再次行动时沿用该街第一次计算的结果（包括当时的对手数）。
+    键中带上牌面本身，复式赛重开牌桌、手数从头计数时不会取到上一轮的结果。
+    prefetch 可在线程池中提前计算，轮到该玩家时对手数未变才使用，结果与不预取时一致。
+    """
+
+    def __init__(self, iterations: int = EQUITY_ITERATIONS):
+        self.iterations = iterations
+        self._hand_number: Optional[int] = None
+        self._boards: Dict[Tuple, BoardTexture] = {}
+        self._players: Dict[Tuple, HandFeatures] = {}
+        self._pending: Dict[Tuple, Tuple[int, Future]] = {}  # 预取中的特征及预取时的对手数
+        self.hits = 0
+        self.misses = 0
+        self.prefetched = 0
+
+    def _check_hand(self, hand_number: int):
+        if hand_number != self._hand_number:
+            self._hand_number = hand_number
+            self._boards.clear()
+            self._players.clear()
+            self._pending.clear()
+
+    def board(self, hand_number: int, community_cards: List[Card]) -> BoardTexture:
+        self._check_hand(hand_number)
+        board = tuple(card_to_int(card) for card in community_cards)
+        texture = self._boards.get(board)
+        if texture is None:
+            texture = board_texture(board)
+            self._boards[board] = texture
+        return texture
+
+    def player(self, hand_number: int, stage: GameStage, player_name: str, hand: List[Card],
+               community_cards: List[Card], opponents: int) -> HandFeatures:
+        self._check_hand(hand_number)
+        hole = tuple(card_to_int(card) for card in hand)
+        key = (stage.value, player_name, hole)
+        features = self._players.get(key)
+        if features is not None:
+            self.hits += 1
+            return features
+        pending = self._pending.pop(key, None)
+        if pending is not None and pending[0] == opponents:
+            self.prefetched += 1
+            features = pending[1].result()
+        else:
+            self.misses += 1
+            features = hand_features(hole, [card_to_int(card) for card in community_cards],
+                                     opponents=opponents, iterations=self.iterations)
+        self._players[key] = features
+        return features
+
+    def prefetch(self, executor: Executor, hand_number: int, stage: GameStage, player_name: str, hand: List[Card],
+                 community_cards: List[Card], opponents: int):
+        """把玩家特征的计算提交到 executor（只在主线程调用，工作线程只做计算、不修改缓存）"""
+        self._check_hand(hand_number)
+        hole = tuple(card_to_int(card) for card in hand)
+        key = (stage.value, player_name, hole)
+        if key in self._players or key in self._pending:
+            return
+        board = [card_to_int(card) for card in community_cards]
+        self._pending[key] = (opponents, executor.submit(hand_features, hole, board, opponents, self.iterations))
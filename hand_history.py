@@ -0,0 +1,647 @@
+# hand_history.py
+# 紧凑的二进制手牌历史格式：整数编码的牌、varint 数值、单字节枚举和字符串表，并带有按手的偏移索引，可直接跳转到第 N 手
+
+import argparse
+import json
+import os
+import struct
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from engine_info import Action, GameStage
+from hand_evaluator import int_to_card
+from log_reader import iter_game_log
+
+# 文件格式：
+#   MAGIC
+#   记录区：按手连续存放的记录，每条记录以 1 字节类型开头（与 game_log 的 type 一致，0 表示内嵌 JSON）
+#   字符串表：varint 个数，之后每项为 varint 长度 + UTF-8 字节
+#   索引：varint 手数，之后每手为 (手牌编号, 记录区偏移, 记录条数)
+#   尾部：字符串表偏移 uint64、索引偏移 uint64、MAGIC
+# 记录按 hand_number 分手：盲注行动写在开局记录（type 1）之前，但已带有新一手的编号；
+# 发牌记录没有 hand_number，归入所在的手；最前面没有编号的记录归入编号为 0 的“手”。
+MAGIC = b"PKHH0001"
+_FOOTER = struct.Struct("<QQ")
+FOOTER_SIZE = _FOOTER.size + len(MAGIC)
+
+# 记录类型
+RECORD_JSON = 0
+RECORD_HAND_START = 1
+RECORD_STAGE = 2
+RECORD_ACTION = 3
+RECORD_SHOWDOWN = 4
+RECORD_POT_AWARD = 5
+
+# 枚举按定义顺序编码为单字节
+STAGES = [stage.value for stage in GameStage]
+ACTIONS = [action.value for action in Action]
+# 与 poker_engine.HandRank 的成员名一致（按取值 1-10 排列）
+HAND_RANKS = ["HIGH_CARD", "ONE_PAIR", "TWO_PAIR", "THREE_OF_A_KIND", "STRAIGHT", "FLUSH",
+              "FULL_HOUSE", "FOUR_OF_A_KIND", "STRAIGHT_FLUSH", "ROYAL_FLUSH"]
+_STAGE_CODES = {value: i for i, value in enumerate(STAGES)}
+_ACTION_CODES = {value: i for i, value in enumerate(ACTIONS)}
+_HAND_RANK_CODES = {value: i for i, value in enumerate(HAND_RANKS)}
+
+# 牌：0-51 为整数编码（与 hand_evaluator 相同），无法识别的牌面以 CARD_ESCAPE + 字符串编号保存
+CARD_STRINGS = [str(int_to_card(i)) for i in range(52)]
+_CARD_CODES = {card: i for i, card in enumerate(CARD_STRINGS)}
+CARD_ESCAPE = 0xFF
+
+_PLAYER_KEYS = frozenset(("name", "chips", "hand", "bet_in_round", "total_bet", "folded", "all_in", "is_active"))
+_HAND_START_KEYS = frozenset(("type", "hand_number", "dealer", "small_blind", "big_blind", "players"))
+_STAGE_KEYS = frozenset(("type", "stage", "community_cards"))
+_ACTION_KEYS = frozenset(("type", "hand_number", "stage", "player_name", "action", "amount", "pot",
+                          "player_chips", "behavior"))
+_SHOWDOWN_KEYS = frozenset(("type", "hand_number", "community_cards", "players"))
+_SHOWDOWN_PLAYER_KEYS = frozenset(("player_name", "hand", "hand_rank", "is_winner"))
+_POT_AWARD_KEYS = frozenset(("type", "hand_number", "pot", "side_pots", "winners"))
+_SIDE_POT_KEYS = frozenset(("pot_level", "pot_amount", "bet_threshold", "eligible_players", "winners",
+                            "award_per_winner"))
+_WINNER_KEYS = frozenset(("player_name", "amount"))
+
+
+class _Unencodable(Exception):
+    """记录与已知结构不完全一致，改用内嵌 JSON 保存"""
+
+
+# ---------- 基础编码 ----------
+
+def _write_uvarint(buf: bytearray, value: int):
+    while value >= 0x80:
+        buf.append((value & 0x7F) | 0x80)
+        value >>= 7
+    buf.append(value)
+
+
+def _write_varint(buf: bytearray, value: int):
+    """有符号整数使用 zigzag 编码"""
+    _write_uvarint(buf, value << 1 if value >= 0 else ((-value) << 1) - 1)
+
+
+def _read_uvarint(data: bytes, pos: int) -> Tuple[int, int]:
+    byte = data[pos]
+    if byte < 0x80:
+        return byte, pos + 1
+    result = byte & 0x7F
+    shift = 7
+    while True:
+        pos += 1
+        byte = data[pos]
+        result |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return result, pos + 1
+        shift += 7
+
+
+# 单字节 zigzag 值的解码表，绝大多数小数值无需进入通用路径
+_ZIGZAG_BYTE = [(value >> 1) if not value & 1 else -((value + 1) >> 1) for value in range(0x80)]
+
+
+def _read_varint(data: bytes, pos: int) -> Tuple[int, int]:
+    byte = data[pos]
+    if byte < 0x80:
+        return _ZIGZAG_BYTE[byte], pos + 1
+    value, pos = _read_uvarint(data, pos)
+    return (value >> 1) if not value & 1 else -((value + 1) >> 1), pos
+
+
+def _int(value: Any) -> int:
+    if type(value) is not int:
+        raise _Unencodable
+    return value
+
+
+def _bool(value: Any) -> bool:
+    if type(value) is not bool:
+        raise _Unencodable
+    return value
+
+
+def _check_keys(record: Dict[str, Any], keys: frozenset, optional: Tuple[str, ...] = ()):
+    if type(record) is not dict:
+        raise _Unencodable
+    if record.keys() != keys and not (optional and record.keys() - set(optional) == keys):
+        raise _Unencodable
+
+
+class _StringTable:
+    """写入时的字符串表，相同字符串只保存一次"""
+
+    def __init__(self):
+        self.ids: Dict[str, int] = {}
+        self.strings: List[str] = []
+
+    def id(self, value: Any) -> int:
+        if type(value) is not str:
+            raise _Unencodable
+        index = self.ids.get(value)
+        if index is None:
+            index = self.ids[value] = len(self.strings)
+            self.strings.append(value)
+        return index
+
+
+# ---------- 记录编码 ----------
+
+class _RecordEncoder:
+    def __init__(self):
+        self.strings = _StringTable()
+
+    def _cards(self, buf: bytearray, cards: Any):
+        if type(cards) is not list or len(cards) >= 0x80:
+            raise _Unencodable
+        buf.append(len(cards))
+        for card in cards:
+            code = _CARD_CODES.get(card) if type(card) is str else None
+            if code is None:
+                buf.append(CARD_ESCAPE)
+                _write_uvarint(buf, self.strings.id(card))
+            else:
+                buf.append(code)
+
+    def _names(self, buf: bytearray, names: Any):
+        if type(names) is not list:
+            raise _Unencodable
+        _write_uvarint(buf, len(names))
+        for name in names:
+            _write_uvarint(buf, self.strings.id(name))
+
+    def _optional_string(self, buf: bytearray, value: Any):
+        """None 记为 0，其余为字符串编号 + 1"""
+        _write_uvarint(buf, 0 if value is None else self.strings.id(value) + 1)
+
+    def encode(self, record: Dict[str, Any]) -> bytes:
+        buf = bytearray()
+        try:
+            record_type = record.get("type") if type(record) is dict else None
+            if record_type == RECORD_HAND_START:
+                self._hand_start(buf, record)
+            elif record_type == RECORD_STAGE:
+                self._stage(buf, record)
+            elif record_type == RECORD_ACTION:
+                self._action(buf, record)
+            elif record_type == RECORD_SHOWDOWN:
+                self._showdown(buf, record)
+            elif record_type == RECORD_POT_AWARD:
+                self._pot_award(buf, record)
+            else:
+                raise _Unencodable
+        except (_Unencodable, KeyError, TypeError):
+            buf = bytearray((RECORD_JSON,))
+            data = json.dumps(record, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+            _write_uvarint(buf, len(data))
+            buf += data
+        return bytes(buf)
+
+    def _hand_start(self, buf: bytearray, record: Dict[str, Any]):
+        _check_keys(record, _HAND_START_KEYS, ("seed", "deck_seed"))
+        flags = ("seed" in record) | ("deck_seed" in record) << 1
+        buf.append(RECORD_HAND_START)
+        buf.append(flags)
+        for key in ("hand_number", "dealer", "small_blind", "big_blind"):
+            _write_varint(buf, _int(record[key]))
+        if flags & 1:
+            _write_varint(buf, _int(record["seed"]))
+        if flags & 2:
+            _write_varint(buf, _int(record["deck_seed"]))
+        players = record["players"]
+        if type(players) is not list:
+            raise _Unencodable
+        _write_uvarint(buf, len(players))
+        for player in players:
+            _check_keys(player, _PLAYER_KEYS)
+            _write_uvarint(buf, self.strings.id(player["name"]))
+            _write_varint(buf, _int(player["chips"]))
+            _write_varint(buf, _int(player["bet_in_round"]))
+            _write_varint(buf, _int(player["total_bet"]))
+            buf.append(_bool(player["folded"]) | _bool(player["all_in"]) << 1 | _bool(player["is_active"]) << 2)
+            self._cards(buf, player["hand"])
+
+    def _stage(self, buf: bytearray, record: Dict[str, Any]):
+        _check_keys(record, _STAGE_KEYS)
+        buf.append(RECORD_STAGE)
+        buf.append(_STAGE_CODES[record["stage"]])
+        self._cards(buf, record["community_cards"])
+
+    def _action(self, buf: bytearray, record: Dict[str, Any]):
+        _check_keys(record, _ACTION_KEYS)
+        buf.append(RECORD_ACTION)
+        _write_varint(buf, _int(record["hand_number"]))
+        buf.append(_STAGE_CODES[record["stage"]])
+        buf.append(_ACTION_CODES[record["action"]])
+        _write_uvarint(buf, self.strings.id(record["player_name"]))
+        _write_varint(buf, _int(record["amount"]))
+        _write_varint(buf, _int(record["pot"]))
+        _write_varint(buf, _int(record["player_chips"]))
+        self._optional_string(buf, record["behavior"])
+
+    def _showdown(self, buf: bytearray, record: Dict[str, Any]):
+        _check_keys(record, _SHOWDOWN_KEYS)
+        buf.append(RECORD_SHOWDOWN)
+        _write_varint(buf, _int(record["hand_number"]))
+        self._cards(buf, record["community_cards"])
+        players = record["players"]
+        if type(players) is not list:
+            raise _Unencodable
+        _write_uvarint(buf, len(players))
+        for player in players:
+            _check_keys(player, _SHOWDOWN_PLAYER_KEYS)
+            _write_uvarint(buf, self.strings.id(player["player_name"]))
+            buf.append(_HAND_RANK_CODES[player["hand_rank"]])
+            buf.append(_bool(player["is_winner"]))
+            self._cards(buf, player["hand"])
+
+    def _pot_award(self, buf: bytearray, record: Dict[str, Any]):
+        _check_keys(record, _POT_AWARD_KEYS)
+        buf.append(RECORD_POT_AWARD)
+        _write_varint(buf, _int(record["hand_number"]))
+        _write_varint(buf, _int(record["pot"]))
+        side_pots = record["side_pots"]
+        if type(side_pots) is not list:
+            raise _Unencodable
+        _write_uvarint(buf, len(side_pots))
+        for side_pot in side_pots:
+            _check_keys(side_pot, _SIDE_POT_KEYS, ("refunded",))
+            # 第 0 位：是否带 refunded 字段，第 1 位：refunded 的取值
+            buf.append(("refunded" in side_pot) | _bool(side_pot.get("refunded", False)) << 1)
+            for key in ("pot_level", "pot_amount", "bet_threshold", "award_per_winner"):
+                _write_varint(buf, _int(side_pot[key]))
+            self._names(buf, side_pot["eligible_players"])
+            self._names(buf, side_pot["winners"])
+        winners = record["winners"]
+        if type(winners) is not list:
+            raise _Unencodable
+        _write_uvarint(buf, len(winners))
+        for winner in winners:
+            _check_keys(winner, _WINNER_KEYS)
+            _write_uvarint(buf, self.strings.id(winner["player_name"]))
+            _write_varint(buf, _int(winner["amount"]))
+
+
+# ---------- 记录解码 ----------
+
+class _RecordDecoder:
+    def __init__(self, strings: List[str]):
+        self.strings = strings
+
+    def _cards(self, data: bytes, pos: int) -> Tuple[List[str], int]:
+        count = data[pos]  # 牌数不超过 127，varint 只占一个字节
+        pos += 1
+        cards = []
+        for _ in range(count):
+            code = data[pos]
+            pos += 1
+            if code == CARD_ESCAPE:
+                index, pos = _read_uvarint(data, pos)
+                cards.append(self.strings[index])
+            else:
+                cards.append(CARD_STRINGS[code])
+        return cards, pos
+
+    def _names(self, data: bytes, pos: int) -> Tuple[List[str], int]:
+        count, pos = _read_uvarint(data, pos)
+        names = []
+        for _ in range(count):
+            index, pos = _read_uvarint(data, pos)
+            names.append(self.strings[index])
+        return names, pos
+
+    def decode(self, data: bytes, pos: int) -> Tuple[Dict[str, Any], int]:
+        """解码 pos 处的一条记录，返回 (记录, 下一条记录的位置)"""
+        record_type = data[pos]
+        pos += 1
+        if record_type == RECORD_ACTION:
+            return self._action(data, pos)
+        if record_type == RECORD_HAND_START:
+            return self._hand_start(data, pos)
+        if record_type == RECORD_STAGE:
+            cards, end = self._cards(data, pos + 1)
+            return {"type": RECORD_STAGE, "stage": STAGES[data[pos]], "community_cards": cards}, end
+        if record_type == RECORD_SHOWDOWN:
+            return self._showdown(data, pos)
+        if record_type == RECORD_POT_AWARD:
+            return self._pot_award(data, pos)
+        if record_type == RECORD_JSON:
+            length, pos = _read_uvarint(data, pos)
+            return json.loads(bytes(data[pos:pos + length]).decode("utf-8")), pos + length
+        raise ValueError(f"未知的记录类型: {record_type}")
+
+    def _hand_start(self, data: bytes, pos: int) -> Tuple[Dict[str, Any], int]:
+        flags = data[pos]
+        pos += 1
+        record = {"type": RECORD_HAND_START}
+        for key in ("hand_number", "dealer", "small_blind", "big_blind"):
+            record[key], pos = _read_varint(data, pos)
+        if flags & 1:
+            record["seed"], pos = _read_varint(data, pos)
+        if flags & 2:
+            record["deck_seed"], pos = _read_varint(data, pos)
+        count, pos = _read_uvarint(data, pos)
+        players = []
+        for _ in range(count):
+            name, pos = _read_uvarint(data, pos)
+            chips, pos = _read_varint(data, pos)
+            bet_in_round, pos = _read_varint(data, pos)
+            total_bet, pos = _read_varint(data, pos)
+            player_flags = data[pos]
+            hand, pos = self._cards(data, pos + 1)
+            players.append({
+                "name": self.strings[name],
+                "chips": chips,
+                "hand": hand,
+                "bet_in_round": bet_in_round,
+                "total_bet": total_bet,
+                "folded": bool(player_flags & 1),
+                "all_in": bool(player_flags & 2),
+                "is_active": bool(player_flags & 4)
+            })
+        record["players"] = players
+        return record, pos
+
+    def _action(self, data: bytes, pos: int) -> Tuple[Dict[str, Any], int]:
+        hand_number, pos = _read_varint(data, pos)
+        stage = STAGES[data[pos]]
+        action = ACTIONS[data[pos + 1]]
+        name, pos = _read_uvarint(data, pos + 2)
+        amount, pos = _read_varint(data, pos)
+        pot, pos = _read_varint(data, pos)
+        player_chips, pos = _read_varint(data, pos)
+        behavior, pos = _read_uvarint(data, pos)
+        return {
+            "type": RECORD_ACTION,
+            "hand_number": hand_number,
+            "stage": stage,
+            "player_name": self.strings[name],
+            "action": action,
+            "amount": amount,
+            "pot": pot,
+            "player_chips": player_chips,
+            "behavior": self.strings[behavior - 1] if behavior else None
+        }, pos
+
+    def _showdown(self, data: bytes, pos: int) -> Tuple[Dict[str, Any], int]:
+        hand_number, pos = _read_varint(data, pos)
+        community_cards, pos = self._cards(data, pos)
+        count, pos = _read_uvarint(data, pos)
+        players = []
+        for _ in range(count):
+            name, pos = _read_uvarint(data, pos)
+            hand_rank = HAND_RANKS[data[pos]]
+            is_winner = bool(data[pos + 1])
+            hand, pos = self._cards(data, pos + 2)
+            players.append({"player_name": self.strings[name], "hand": hand, "hand_rank": hand_rank,
+                            "is_winner": is_winner})
+        return {"type": RECORD_SHOWDOWN, "hand_number": hand_number, "community_cards": community_cards,
+                "players": players}, pos
+
+    def _pot_award(self, data: bytes, pos: int) -> Tuple[Dict[str, Any], int]:
+        hand_number, pos = _read_varint(data, pos)
+        pot, pos = _read_varint(data, pos)
+        count, pos = _read_uvarint(data, pos)
+        side_pots = []
+        for _ in range(count):
+            flags = data[pos]
+            pos += 1
+            pot_level, pos = _read_varint(data, pos)
+            pot_amount, pos = _read_varint(data, pos)
+            bet_threshold, pos = _read_varint(data, pos)
+            award_per_winner, pos = _read_varint(data, pos)
+            eligible_players, pos = self._names(data, pos)
+            winners, pos = self._names(data, pos)
+            side_pot = {"pot_level": pot_level, "pot_amount": pot_amount, "bet_threshold": bet_threshold,
+                        "eligible_players": eligible_players, "winners": winners}
+            if flags & 1:
+                side_pot["refunded"] = bool(flags & 2)
+            side_pot["award_per_winner"] = award_per_winner
+            side_pots.append(side_pot)
+        count, pos = _read_uvarint(data, pos)
+        winners = []
+        for _ in range(count):
+            name, pos = _read_uvarint(data, pos)
+            amount, pos = _read_varint(data, pos)
+            winners.append({"player_name": self.strings[name], "amount": amount})
+        return {"type": RECORD_POT_AWARD, "hand_number": hand_number, "pot": pot, "side_pots": side_pots,
+                "winners": winners}, pos
+
+
+# ---------- 读写 ----------
+
+class HandHistoryWriter:
+    """逐条写入手牌历史；字符串表和索引在 close 时写到文件末尾"""
+
+    def __init__(self, filename: str):
+        self.filename = filename
+        self._file: BinaryIO = open(filename, "wb")
+        self._file.write(MAGIC)
+        self._offset = len(MAGIC)
+        self._encoder = _RecordEncoder()
+        # 每手的 [手牌编号, 偏移, 记录条数]
+        self._index: List[List[int]] = []
+
+    def write(self, record: Dict[str, Any]):
+        current = self._index[-1][0] if self._index else 0
+        hand_number = record_hand_number(record, current)
+        if not self._index or hand_number != current:
+            self._index.append([hand_number, self._offset, 0])
+        data = self._encoder.encode(record)
+        self._file.write(data)
+        self._offset += len(data)
+        self._index[-1][2] += 1
+
+    def write_all(self, records: Iterable[Dict[str, Any]]):
+        for record in records:
+            self.write(record)
+
+    def close(self):
+        if self._file is None:
+            return
+        buf = bytearray()
+        strings = self._encoder.strings.strings
+        _write_uvarint(buf, len(strings))
+        for value in strings:
+            data = value.encode("utf-8")
+            _write_uvarint(buf, len(data))
+            buf += data
+        index_offset = self._offset + len(buf)
+        _write_uvarint(buf, len(self._index))
+        for hand_number, offset, count in self._index:
+            _write_varint(buf, hand_number)
+            _write_uvarint(buf, offset)
+            _write_uvarint(buf, count)
+        buf += _FOOTER.pack(self._offset, index_offset) + MAGIC
+        self._file.write(buf)
+        self._file.close()
+        self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def write_hand_history(filename: str, records: Iterable[Dict[str, Any]]):
+    """将 game_log 记录写为二进制手牌历史"""
+    with HandHistoryWriter(filename) as writer:
+        writer.write_all(records)
+
+
+class HandHistoryReader:
+    """二进制手牌历史读取器：打开时只读取字符串表和索引，按手随机访问"""
+
+    def __init__(self, filename: str):
+        self.filename = filename
+        with open(filename, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"不是有效的手牌历史文件: {filename}")
+            f.seek(0, os.SEEK_END)
+            size = f.tell()
+            f.seek(size - FOOTER_SIZE)
+            footer = f.read(FOOTER_SIZE)
+            if footer[_FOOTER.size:] != MAGIC:
+                raise ValueError(f"手牌历史文件不完整: {filename}")
+            self._records_end, index_offset = _FOOTER.unpack(footer[:_FOOTER.size])
+            f.seek(self._records_end)
+            tail = f.read(size - FOOTER_SIZE - self._records_end)
+
+        pos = 0
+        count, pos = _read_uvarint(tail, pos)
+        strings = []
+        for _ in range(count):
+            length, pos = _read_uvarint(tail, pos)
+            strings.append(tail[pos:pos + length].decode("utf-8"))
+            pos += length
+        self._decoder = _RecordDecoder(strings)
+
+        pos = index_offset - self._records_end
+        count, pos = _read_uvarint(tail, pos)
+        self.index: List[Tuple[int, int, int]] = []
+        for _ in range(count):
+            hand_number, pos = _read_varint(tail, pos)
+            offset, pos = _read_uvarint(tail, pos)
+            records, pos = _read_uvarint(tail, pos)
+            self.index.append((hand_number, offset, records))
+        # 手牌编号重复时（如拼接的日志）取第一次出现的位置
+        self._positions: Dict[int, int] = {}
+        for i, (hand_number, _, _) in enumerate(self.index):
+            self._positions.setdefault(hand_number, i)
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def hand_numbers(self) -> List[int]:
+        return [entry[0] for entry in self.index]
+
+    def _span(self, position: int) -> Tuple[int, int]:
+        start = self.index[position][1]
+        end = self.index[position + 1][1] if position + 1 < len(self.index) else self._records_end
+        return start, end
+
+    def _decode(self, data: bytes, count: int) -> List[Dict[str, Any]]:
+        decode = self._decoder.decode
+        records = []
+        pos = 0
+        for _ in range(count):
+            record, pos = decode(data, pos)
+            records.append(record)
+        return records
+
+    def read_hands(self, start: int, stop: Optional[int] = None) -> List[List[Dict[str, Any]]]:
+        """按索引位置读取 [start, stop) 范围内的若干手（一次读取连续字节）"""
+        stop = len(self.index) if stop is None else min(stop, len(self.index))
+        if start >= stop:
+            return []
+        begin = self._span(start)[0]
+        end = self._span(stop - 1)[1]
+        with open(self.filename, "rb") as f:
+            f.seek(begin)
+            data = f.read(end - begin)
+        hands = []
+        for position in range(start, stop):
+            hand_start, hand_end = self._span(position)
+            hands.append(self._decode(data[hand_start - begin:hand_end - begin], self.index[position][2]))
+        return hands
+
+    def read_hand(self, hand_number: int) -> List[Dict[str, Any]]:
+        """读取指定编号的一手牌的全部记录"""
+        position = self._positions.get(hand_number)
+        if position is None:
+            raise KeyError(f"手牌历史中没有第 {hand_number} 手")
+        return self.read_hands(position, position + 1)[0]
+
+    def iter_records(self, chunk_hands: int = 1024) -> Iterator[Dict[str, Any]]:
+        """按顺序产出全部记录，每次读取 chunk_hands 手"""
+        for start in range(0, len(self.index), chunk_hands):
+            for hand in self.read_hands(start, start + chunk_hands):
+                yield from hand
+
+    def read_all(self) -> List[Dict[str, Any]]:
+        return list(self.iter_records(chunk_hands=len(self.index) or 1))
+
+
+def read_hand_history(filename: str) -> List[Dict[str, Any]]:
+    return HandHistoryReader(filename).read_all()
+
+
+def record_hand_number(record: Dict[str, Any], current: int) -> int:
+    """记录所属的手牌编号；没有 hand_number 的记录（如发牌）属于当前这一手"""
+    hand_number = record.get("hand_number")
+    return hand_number if type(hand_number) is int else current
+
+
+def select_hand(records: Iterable[Dict[str, Any]], hand_number: int) -> Iterator[Dict[str, Any]]:
+    """从按顺序排列的记录流中筛选出指定的一手"""
+    current = 0
+    found = False
+    for record in records:
+        current = record_hand_number(record, current)
+        if current == hand_number:
+            found = True
+            yield record
+        elif found:
+            return
+
+
+# ---------- JSON 转换 ----------
+
+def json_to_hand_history(json_file: str, output_file: str):
+    """将旧版 JSON 游戏日志（poker_game_*.json）流式转换为二进制手牌历史"""
+    write_hand_history(output_file, iter_game_log(json_file))
+
+
+def hand_history_to_json(input_file: str, output_file: str):
+    """将二进制手牌历史导出为与 PokerTable.save_game_log 相同格式的 JSON"""
+    with open(output_file, 'w', encoding='utf-8') as f:
+        json.dump(read_hand_history(input_file), f, ensure_ascii=False, indent=2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="二进制手牌历史转换工具")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    to_binary = subparsers.add_parser("to-binary", help="JSON 游戏日志转为二进制手牌历史")
+    to_binary.add_argument("input")
+    to_binary.add_argument("output")
+    to_json = subparsers.add_parser("to-json", help="二进制手牌历史导出为 JSON")
+    to_json.add_argument("input")
+    to_json.add_argument("output")
+    info = subparsers.add_parser("info", help="查看手牌历史的手数与大小")
+    info.add_argument("input")
+    args = parser.parse_args()
+
+    if args.command == "to-binary":
+        json_to_hand_history(args.input, args.output)
+        print(f"已转换: {args.input} ({os.path.getsize(args.input)} 字节) -> "
+              f"{args.output} ({os.path.getsize(args.output)} 字节)")
+    elif args.command == "to-json":
+        hand_history_to_json(args.input, args.output)
+        print(f"已导出: {args.output}")
+    else:
+        reader = HandHistoryReader(args.input)
+        numbers = reader.hand_numbers()
+        print(f"文件: {args.input}")
+        print(f"大小: {os.path.getsize(args.input)} 字节")
+        print(f"手数: {len(reader)}" + (f" (第 {numbers[0]} - {numbers[-1]} 手)" if numbers else ""))
+        print(f"字符串表: {len(reader._decoder.strings)} 项")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+# llm_scheduler.py
+# 多牌桌共用模型端点时的LLM请求调度：按模型与端点限制并发，牌桌之间轮转分配，决策优先于反思，并输出排队指标
+
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, Iterator, Optional
+
+from metrics import MetricsRegistry
+
+DECISION = "decision"
+REFLECTION = "reflection"
+# 调度优先级从高到低
+PRIORITIES = (DECISION, REFLECTION)
+
+
+@dataclass
+class _Ticket:
+    """一次排队中的请求"""
+    model: str
+    endpoint: str
+    table: str
+    kind: str
+    enqueued: float
+    granted: bool = False
+
+
+class LLMScheduler:
+    """LLM请求调度器，由多个 GameController（每个对应一张牌桌）共享
+
+    每次请求先 acquire 一个名额，请求结束后 release。名额同时受所属模型和所属端点（base_url）的并发上限约束。
+    有空闲名额时按优先级分配：决策先于反思；同一优先级内在各牌桌之间轮转，每轮每张牌桌最多得到一个名额，
+    请求多的牌桌不会挤占其他牌桌。反思最多只能用到上限减去 decision_reserve 个名额，始终为决策留出余量。
+
+    Args:
+        model_limits: 各模型的并发上限（按 model_name）
+        endpoint_limits: 各端点的并发上限（按 base_url）
+        default_model_limit: 未单独配置的模型的并发上限，0 表示不限制
+        default_endpoint_limit: 未单独配置的端点的并发上限，0 表示不限制
+        decision_reserve: 为决策保留的名额数（上限不大于该值时不保留）
+        metrics: 指标注册表；未传入时由第一个使用该调度器的 GameController 注入它的注册表
+    """
+
+    def __init__(self, model_limits: Optional[Dict[str, int]] = None,
+                 endpoint_limits: Optional[Dict[str, int]] = None, default_model_limit: int = 0,
+                 default_endpoint_limit: int = 0, decision_reserve: int = 1,
+                 metrics: Optional[MetricsRegistry] = None):
+        self.model_limits = dict(model_limits or {})
+        self.endpoint_limits = dict(endpoint_limits or {})
+        self.default_model_limit = default_model_limit
+        self.default_endpoint_limit = default_endpoint_limit
+        self.decision_reserve = decision_reserve
+        self.metrics = metrics
+        self._cond = threading.Condition()
+        # 每个优先级下按牌桌排队，OrderedDict 的顺序即轮转顺序
+        self._queues: Dict[str, "OrderedDict[str, Deque[_Ticket]]"] = {kind: OrderedDict() for kind in PRIORITIES}
+        self._model_in_flight: Dict[str, int] = {}
+        self._endpoint_in_flight: Dict[str, int] = {}
+        self.max_in_flight: Dict[str, int] = {}  # 各端点出现过的最大并发数
+        self.granted = {kind: 0 for kind in PRIORITIES}
+
+    def _limit(self, limits: Dict[str, int], default: int, key: str) -> int:
+        return limits.get(key, default)
+
+    def _has_capacity(self, ticket: _Ticket) -> bool:
+        for in_flight, limit in (
+                (self._model_in_flight.get(ticket.model, 0),
+                 self._limit(self.model_limits, self.default_model_limit, ticket.model)),
+                (self._endpoint_in_flight.get(ticket.endpoint, 0),
+                 self._limit(self.endpoint_limits, self.default_endpoint_limit, ticket.endpoint))):
+            if not limit:
+                continue
+            if ticket.kind != DECISION and limit > self.decision_reserve:
+                limit -= self.decision_reserve
+            if in_flight >= limit:
+                return False
+        return True
+
+    def _grant(self, ticket: _Ticket):
+        ticket.granted = True
+        self._model_in_flight[ticket.model] = self._model_in_flight.get(ticket.model, 0) + 1
+        in_flight = self._endpoint_in_flight.get(ticket.endpoint, 0) + 1
+        self._endpoint_in_flight[ticket.endpoint] = in_flight
+        self.max_in_flight[ticket.endpoint] = max(self.max_in_flight.get(ticket.endpoint, 0), in_flight)
+        self.granted[ticket.kind] += 1
+
+    def _dispatch(self):
+        """在持有锁时分配空闲名额：按优先级，同一优先级内从轮转队首的牌桌开始，每次分配后该牌桌移到队尾"""
+        granted = False
+        for kind in PRIORITIES:
+            tables = self._queues[kind]
+            progress = True
+            while progress:
+                progress = False
+                for table, queue in tables.items():
+                    # 同一牌桌内按先后顺序，跳过所需模型或端点已满的请求，避免阻塞其他端点的请求
+                    ticket = next((t for t in queue if self._has_capacity(t)), None)
+                    if ticket is None:
+                        continue
+                    queue.remove(ticket)
+                    self._grant(ticket)
+                    if queue:
+                        tables.move_to_end(table)
+                    else:
+                        del tables[table]
+                    granted = progress = True
+                    break
+        if granted:
+            self._cond.notify_all()
+            self._update_gauges()
+
+    def _update_gauges(self):
+        if self.metrics is None:
+            return
+        for kind in PRIORITIES:
+            depth = sum(len(queue) for queue in self._queues[kind].values())
+            self.metrics.set_gauge("llm_queue_depth", depth, {"kind": kind})
+        for model, in_flight in self._model_in_flight.items():
+            self.metrics.set_gauge("llm_model_in_flight", in_flight, {"model": model})
+        for endpoint, in_flight in self._endpoint_in_flight.items():
+            self.metrics.set_gauge("llm_endpoint_in_flight", in_flight, {"endpoint": endpoint})
+
+    def acquire(self, model: str, endpoint: str, table: str = "", kind: str = DECISION) -> _Ticket:
+        """排队直到得到名额，返回的凭据需交给 release"""
+        if kind not in self._queues:
+            raise ValueError(f"未知的请求类型: {kind}")
+        ticket = _Ticket(model=model, endpoint=endpoint, table=table, kind=kind, enqueued=time.time())
+        with self._cond:
+            self._queues[kind].setdefault(table, deque()).append(ticket)
+            self._update_gauges()
+            self._dispatch()
+            while not ticket.granted:
+                self._cond.wait()
+        if self.metrics is not None:
+            self.metrics.observe("llm_queue_wait_seconds", time.time() - ticket.enqueued,
+                                 {"kind": kind, "model": model, "endpoint": endpoint})
+        return ticket
+
+    def release(self, ticket: _Ticket):
+        """请求结束（无论成功与否）后归还名额"""
+        with self._cond:
+            self._model_in_flight[ticket.model] -= 1
+            self._endpoint_in_flight[ticket.endpoint] -= 1
+            self._update_gauges()
+            self._dispatch()
+
+    @contextmanager
+    def slot(self, model: str, endpoint: str, table: str = "", kind: str = DECISION) -> Iterator[None]:
+        ticket = self.acquire(model, endpoint, table, kind)
+        try:
+            yield
+        finally:
+            self.release(ticket)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                "queued": {kind: sum(len(queue) for queue in self._queues[kind].values()) for kind in PRIORITIES},
+                "granted": dict(self.granted),
+                "model_in_flight": dict(self._model_in_flight),
+                "endpoint_in_flight": dict(self._endpoint_in_flight),
+                "max_in_flight": dict(self.max_in_flight),
+            }
@@ -0,0 +1,253 @@
+# log_reader.py
+# 流式日志读取器：逐条读取超大增强日志/旧版日志，支持字段投影，内存占用与文件大小无关
+
+import json
+import re
+from json.decoder import scanstring
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+# 增强日志中的大数组字段
+LOG_SECTIONS = ("events", "llm_decisions", "llm_reflections")
+
+# 决策/反思中体积较大的文本字段，分析时通常不需要
+DECISION_TEXT_FIELDS = ("prompt", "raw_response", "reasoning_content")
+REFLECTION_TEXT_FIELDS = ("prompt", "raw_response", "game_result")
+
+_STRUCT_RE = re.compile(r'["{}\[\]]')
+# 字符串内容：普通字符或完整的转义序列，匹配在结束引号或缓冲区末尾（含未完成的转义符）处停止
+_STRING_BODY_RE = re.compile(r'(?:[^"\\]+|\\.)*', re.DOTALL)
+_WHITESPACE = " \t\r\n"
+
+
+class _JsonScanner:
+    """基于缓冲区的增量JSON扫描器
+
+    只在需要时解码值；跳过的值按块扫描，缓冲区只保留当前块，很长的字符串也不会被整体载入内存。
+    """
+
+    def __init__(self, f, chunk_size: int = 1 << 16):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+        self._capture: Optional[List[str]] = None
+        self._capture_pos = 0
+
+    def _fill(self) -> bool:
+        """读取下一块数据，丢弃已消费的部分；文件结束时返回 False"""
+        if self.eof:
+            return False
+        chunk = self.f.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        if self._capture is not None:
+            self._capture.append(self.buf[self._capture_pos:self.pos])
+            self._capture_pos = 0
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        """跳过空白并返回下一个字符，文件结束时返回空串"""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, char: str):
+        if self.peek() != char:
+            raise ValueError(f"JSON 格式错误: 期望 '{char}'，位置附近内容: {self.buf[self.pos:self.pos + 20]!r}")
+        self.pos += 1
+
+    def _skip_string(self):
+        try:
+            # 字符串在当前缓冲区内结束时使用标准库的C实现扫描，速度接近 json.load
+            _, self.pos = scanstring(self.buf, self.pos + 1, False)
+            return
+        except ValueError:
+            pass
+        # 字符串跨越了缓冲区边界：逐块查找结束引号，已扫描的部分随 _fill 丢弃
+        self.pos += 1
+        while True:
+            self.pos = _STRING_BODY_RE.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf) and self.buf[self.pos] == '"':
+                self.pos += 1
+                return
+            # 缓冲区在字符串中间结束（末尾未完成的转义符会保留到下一块）
+            if not self._fill():
+                raise ValueError("JSON 字符串未结束")
+
+    def _skip_container(self):
+        depth = 0
+        while True:
+            match = _STRUCT_RE.search(self.buf, self.pos)
+            if match is None:
+                self.pos = len(self.buf)
+                if not self._fill():
+                    raise ValueError("JSON 数组或对象未结束")
+                continue
+            char = match.group()
+            if char == '"':
+                self.pos = match.start()
+                self._skip_string()
+                continue
+            self.pos = match.end()
+            if char in "{[":
+                depth += 1
+            else:
+                depth -= 1
+                if depth == 0:
+                    return
+
+    def skip_value(self):
+        char = self.peek()
+        if char == '"':
+            self._skip_string()
+        elif char in "{[":
+            self._skip_container()
+        elif char == "":
+            raise ValueError("JSON 数据意外结束")
+        else:
+            # 数字、true/false/null
+            while True:
+                while self.pos < len(self.buf) and self.buf[self.pos] not in ",}] \t\r\n":
+                    self.pos += 1
+                if self.pos < len(self.buf) or not self._fill():
+                    return
+
+    def read_value(self) -> Any:
+        """完整解码下一个值"""
+        self.peek()
+        self._capture = []
+        self._capture_pos = self.pos
+        try:
+            self.skip_value()
+            self._capture.append(self.buf[self._capture_pos:self.pos])
+            return json.loads("".join(self._capture))
+        finally:
+            self._capture = None
+
+    def iter_object_keys(self) -> Iterator[str]:
+        """遍历对象的键；调用方必须在每次迭代中读取或跳过对应的值"""
+        self.expect("{")
+        if self.peek() == "}":
+            self.pos += 1
+            return
+        while True:
+            key = self.read_value()
+            self.expect(":")
+            yield key
+            char = self.peek()
+            self.pos += 1
+            if char == "}":
+                return
+            if char != ",":
+                raise ValueError("JSON 对象格式错误")
+
+    def iter_array(self) -> Iterator[None]:
+        """遍历数组元素；调用方必须在每次迭代中读取或跳过当前元素"""
+        self.expect("[")
+        if self.peek() == "]":
+            self.pos += 1
+            return
+        while True:
+            yield None
+            char = self.peek()
+            self.pos += 1
+            if char == "]":
+                return
+            if char != ",":
+                raise ValueError("JSON 数组格式错误")
+
+    def read_projected(self, fields: Optional[Iterable[str]] = None,
+                       exclude: Optional[Iterable[str]] = None) -> Any:
+        """读取一个值；如果是对象，只解码需要的顶层字段"""
+        if self.peek() != "{" or (fields is None and not exclude):
+            return self.read_value()
+        fields = set(fields) if fields is not None else None
+        exclude = set(exclude or ())
+        result = {}
+        for key in self.iter_object_keys():
+            if (fields is None or key in fields) and key not in exclude:
+                result[key] = self.read_value()
+            else:
+                self.skip_value()
+        return result
+
+
+class EnhancedLogReader:
+    """增强日志（enhanced_poker_game_*.json）的流式读取器"""
+
+    def __init__(self, filename: str, chunk_size: int = 1 << 16):
+        self.filename = filename
+        self.chunk_size = chunk_size
+
+    def _open(self):
+        return open(self.filename, 'r', encoding='utf-8')
+
+    def iter_section(self, section: str, fields: Optional[Iterable[str]] = None,
+                     exclude: Optional[Iterable[str]] = None) -> Iterator[Dict[str, Any]]:
+        """逐条产出指定数组字段（events/llm_decisions/llm_reflections）中的记录
+
+        Args:
+            section: 顶层数组字段名
+            fields: 只保留这些字段，None 表示保留全部
+            exclude: 跳过这些字段（不解码）
+        """
+        with self._open() as f:
+            scanner = _JsonScanner(f, self.chunk_size)
+            for key in scanner.iter_object_keys():
+                if key != section:
+                    scanner.skip_value()
+                    continue
+                if scanner.peek() != "[":
+                    scanner.skip_value()
+                    return
+                for _ in scanner.iter_array():
+                    yield scanner.read_projected(fields, exclude)
+                return
+
+    def iter_events(self, fields: Optional[Iterable[str]] = None,
+                    exclude: Optional[Iterable[str]] = None) -> Iterator[Dict[str, Any]]:
+        return self.iter_section("events", fields, exclude)
+
+    def iter_decisions(self, fields: Optional[Iterable[str]] = None,
+                       exclude: Optional[Iterable[str]] = None) -> Iterator[Dict[str, Any]]:
+        return self.iter_section("llm_decisions", fields, exclude)
+
+    def iter_reflections(self, fields: Optional[Iterable[str]] = None,
+                         exclude: Optional[Iterable[str]] = None) -> Iterator[Dict[str, Any]]:
+        return self.iter_section("llm_reflections", fields, exclude)
+
+    def read_metadata(self, keys: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+        """读取除大数组以外的顶层字段（game_id、players、final_rankings 等）
+
+        指定 keys 时，读到全部所需字段后立即停止扫描。
+        """
+        wanted = set(keys) if keys is not None else None
+        metadata = {}
+        with self._open() as f:
+            scanner = _JsonScanner(f, self.chunk_size)
+            for key in scanner.iter_object_keys():
+                if key in LOG_SECTIONS or (wanted is not None and key not in wanted):
+                    scanner.skip_value()
+                    continue
+                metadata[key] = scanner.read_value()
+                if wanted is not None and wanted.issubset(metadata):
+                    break
+        return metadata
+
+
+def iter_game_log(filename: str, fields: Optional[Iterable[str]] = None,
+                  exclude: Optional[Iterable[str]] = None,
+                  chunk_size: int = 1 << 16) -> Iterator[Dict[str, Any]]:
+    """逐条读取旧版游戏日志（poker_game_*.json，顶层为数组）"""
+    with open(filename, 'r', encoding='utf-8') as f:
+        scanner = _JsonScanner(f, chunk_size)
+        for _ in scanner.iter_array():
+            yield scanner.read_projected(fields, exclude)
@@ -0,0 +1,326 @@
+# log_server.py
+# 回放前端使用的分页日志服务：按需提供对局元信息、按手分页的事件/决策摘要以及单条决策的完整文本，支持 gzip 与 ETag 缓存
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from analyze_logs import LogAnalyzer
+from hand_history import HandHistoryReader
+from log_reader import DECISION_TEXT_FIELDS, EnhancedLogReader
+
+# 反思的 game_result 在列表中直接展示，只有提示词和原始响应按需加载
+REFLECTION_DETAIL_FIELDS = ("prompt", "raw_response")
+
+# 每页默认/最大手数
+DEFAULT_PAGE_HANDS = 20
+MAX_PAGE_HANDS = 200
+# 小于该字节数的响应不压缩
+GZIP_MIN_BYTES = 1024
+
+_GAME_ID_RE = re.compile(r"^[A-Za-z0-9_\-]+$")
+_ROUTES = [
+    ("games", re.compile(r"^/api/games/?$")),
+    ("game", re.compile(r"^/api/games/([^/]+)/?$")),
+    ("hands", re.compile(r"^/api/games/([^/]+)/hands/?$")),
+    ("decision", re.compile(r"^/api/games/([^/]+)/decisions/(\d+)/?$")),
+    ("reflection", re.compile(r"^/api/games/([^/]+)/reflections/(\d+)/?$")),
+    ("hand_history", re.compile(r"^/api/games/([^/]+)/hand_history/(-?\d+)/?$")),
+]
+
+
+def _file_version(path: str) -> str:
+    stat = os.stat(path)
+    return f"{stat.st_mtime_ns:x}-{stat.st_size:x}"
+
+
+class GameIndex:
+    """单局增强日志的分页索引
+
+    事件以及去掉大文本字段的决策/反思摘要按手分组常驻内存；大文本字段写入临时文件，按编号读取，
+    内存占用与提示词总长度无关。日志文件被重写（如对局仍在进行）时由 LogServer 重新建立索引。
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.version = _file_version(path)
+        self._text_file = tempfile.TemporaryFile()
+        self._text_lock = threading.Lock()
+        reader = EnhancedLogReader(path)
+        self.metadata = reader.read_metadata()
+
+        hands: Dict[int, Dict[str, List[Dict[str, Any]]]] = {}
+
+        def bucket(record: Dict[str, Any]) -> Dict[str, List[Dict[str, Any]]]:
+            hand_number = record.get("hand_number") or 0
+            if hand_number not in hands:
+                hands[hand_number] = {"events": [], "llm_decisions": [], "llm_reflections": []}
+            return hands[hand_number]
+
+        for event in reader.iter_events():
+            bucket(event)["events"].append(event)
+
+        # 每条决策/反思：(摘要, 文本在临时文件中的偏移, 长度)
+        self._decisions: List[Tuple[Dict[str, Any], int, int]] = []
+        for index, decision in enumerate(reader.iter_decisions()):
+            decision["index"] = index
+            self._decisions.append((decision, *self._spool(decision, DECISION_TEXT_FIELDS)))
+            bucket(decision)["llm_decisions"].append(decision)
+
+        self._reflections: List[Tuple[Dict[str, Any], int, int]] = []
+        for index, reflection in enumerate(reader.iter_reflections()):
+            reflection["index"] = index
+            self._reflections.append((reflection, *self._spool(reflection, REFLECTION_DETAIL_FIELDS)))
+            bucket(reflection)["llm_reflections"].append(reflection)
+
+        self.hand_numbers = sorted(hands)
+        self._hands = hands
+
+    def _spool(self, record: Dict[str, Any], fields: Tuple[str, ...]) -> Tuple[int, int]:
+        """把大文本字段从记录中移出并追加到临时文件"""
+        text = {name: record.pop(name) for name in fields if name in record}
+        data = json.dumps(text, ensure_ascii=False).encode("utf-8")
+        offset = self._text_file.seek(0, os.SEEK_END)
+        self._text_file.write(data)
+        return offset, len(data)
+
+    def _load_text(self, offset: int, length: int) -> Dict[str, Any]:
+        with self._text_lock:
+            self._text_file.seek(offset)
+            return json.loads(self._text_file.read(length).decode("utf-8"))
+
+    def summary(self) -> Dict[str, Any]:
+        """对局元信息以及每手的条目数，前端据此决定按页加载的范围"""
+        hands = []
+        first_decision = first_reflection = 0
+        for hand_number in self.hand_numbers:
+            hand = self._hands[hand_number]
+            hands.append({
+                "hand_number": hand_number,
+                "events": len(hand["events"]),
+                "first_decision": first_decision,
+                "decisions": len(hand["llm_decisions"]),
+                "first_reflection": first_reflection,
+                "reflections": len(hand["llm_reflections"]),
+            })
+            first_decision += len(hand["llm_decisions"])
+            first_reflection += len(hand["llm_reflections"])
+        return {
+            **self.metadata,
+            "total_hands": len(hands),
+            "total_events": sum(hand["events"] for hand in hands),
+            "total_decisions": len(self._decisions),
+            "total_reflections": len(self._reflections),
+            "hands": hands,
+        }
+
+    def hands_page(self, offset: int, limit: int) -> Dict[str, Any]:
+        """第 offset 手起（按手的序号，而非手牌编号）的 limit 手：事件、决策摘要与反思摘要"""
+        selected = self.hand_numbers[offset:offset + limit]
+        page = {"offset": offset, "hands": selected, "events": [], "llm_decisions": [], "llm_reflections": []}
+        for hand_number in selected:
+            for key in ("events", "llm_decisions", "llm_reflections"):
+                page[key].extend(self._hands[hand_number][key])
+        return page
+
+    def decision(self, index: int) -> Optional[Dict[str, Any]]:
+        if not 0 <= index < len(self._decisions):
+            return None
+        summary, offset, length = self._decisions[index]
+        return {**summary, **self._load_text(offset, length)}
+
+    def reflection(self, index: int) -> Optional[Dict[str, Any]]:
+        if not 0 <= index < len(self._reflections):
+            return None
+        summary, offset, length = self._reflections[index]
+        return {**summary, **self._load_text(offset, length)}
+
+    def close(self):
+        self._text_file.close()
+
+
+class LogServer:
+    """在后台线程中提供回放用的分页日志接口
+
+    接口（均为 GET，返回 JSON）：
+        /api/games                              对局列表
+        /api/games/<id>                         元信息与每手索引
+        /api/games/<id>/hands?offset=&limit=    按手分页的事件与决策/反思摘要
+        /api/games/<id>/decisions/<n>           第 n 条决策（含提示词、原始响应、推理内容）
+        /api/games/<id>/reflections/<n>         第 n 条反思（含提示词、原始响应）
+        /api/games/<id>/hand_history/<手牌编号>  二进制手牌历史（.pkh）中的一手旧版日志记录
+    """
+
+    def __init__(self, log_dir: str = "game_logs", port: int = 8090, host: str = "127.0.0.1"):
+        self.analyzer = LogAnalyzer(log_dir)
+        self.host = host
+        self.port = port
+        self._indexes: Dict[str, GameIndex] = {}
+        self._lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def get_index(self, game_id: str) -> GameIndex:
+        """获取对局索引，日志文件有变化时重新建立"""
+        path = self.analyzer.open_reader(game_id).filename
+        with self._lock:
+            index = self._indexes.get(game_id)
+            if index is None or index.version != _file_version(path):
+                if index is not None:
+                    index.close()
+                index = self._indexes[game_id] = GameIndex(path)
+            return index
+
+    def list_games(self) -> List[Dict[str, Any]]:
+        games = []
+        for path in sorted(self.analyzer.list_enhanced_logs()):
+            metadata = EnhancedLogReader(path).read_metadata(("game_id", "start_time", "end_time", "players"))
+            games.append({**metadata, "size": os.path.getsize(path)})
+        return games
+
+    def _version(self, game_id: str) -> str:
+        return _file_version(self.analyzer.open_reader(game_id).filename)
+
+    def handle(self, path: str, query: Dict[str, List[str]]) -> Tuple[int, Any, Optional[str]]:
+        """路由请求，返回 (状态码, 响应数据, ETag 的版本来源)；版本来源为 None 时按响应内容计算 ETag"""
+        for name, pattern in _ROUTES:
+            match = pattern.match(path)
+            if match:
+                break
+        else:
+            return 404, {"error": "not found"}, None
+
+        if name == "games":
+            return 200, self.list_games(), None
+        game_id = match.group(1)
+        if not _GAME_ID_RE.match(game_id):
+            return 404, {"error": "not found"}, None
+
+        if name == "hand_history":
+            filename = os.path.join(self.analyzer.log_dir, f"poker_game_{game_id}.pkh")
+            if not os.path.exists(filename):
+                return 404, {"error": f"没有对局 {game_id} 的手牌历史"}, None
+            reader = HandHistoryReader(filename)
+            hand_number = int(match.group(2))
+            if hand_number not in reader.hand_numbers():
+                return 404, {"error": f"没有第 {hand_number} 手"}, None
+            return 200, reader.read_hand(hand_number), _file_version(filename)
+
+        try:
+            index = self.get_index(game_id)
+        except FileNotFoundError as e:
+            return 404, {"error": str(e)}, None
+
+        if name == "game":
+            return 200, index.summary(), index.version
+        if name == "hands":
+            try:
+                offset = max(0, int(query.get("offset", ["0"])[0]))
+                limit = min(MAX_PAGE_HANDS, max(1, int(query.get("limit", [str(DEFAULT_PAGE_HANDS)])[0])))
+            except ValueError:
+                return 400, {"error": "offset/limit 必须为整数"}, None
+            return 200, index.hands_page(offset, limit), index.version
+        record = index.decision(int(match.group(2))) if name == "decision" else index.reflection(int(match.group(2)))
+        if record is None:
+            return 404, {"error": "not found"}, None
+        return 200, record, index.version
+
+    def start(self) -> int:
+        """启动服务，返回实际监听的端口（port 为 0 时由系统分配）"""
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                url = urlsplit(self.path)
+                try:
+                    status, payload, version = server.handle(url.path, parse_qs(url.query))
+                except Exception as e:
+                    status, payload, version = 500, {"error": str(e)}, None
+
+                body = None
+                if version is not None:
+                    etag = hashlib.sha1(f"{version}:{url.path}?{url.query}".encode("utf-8")).hexdigest()[:20]
+                else:
+                    body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+                    etag = hashlib.sha1(body).hexdigest()[:20]
+                etag = f'"{etag}"'
+
+                if status == 200 and self.headers.get("If-None-Match") == etag:
+                    self.send_response(304)
+                    self._common_headers(etag)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+
+                if body is None:
+                    body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+                gzipped = len(body) >= GZIP_MIN_BYTES and "gzip" in self.headers.get("Accept-Encoding", "")
+                if gzipped:
+                    body = gzip.compress(body, compresslevel=6)
+                self.send_response(status)
+                self._common_headers(etag if status == 200 else None)
+                self.send_header("Content-Type", "application/json; charset=utf-8")
+                if gzipped:
+                    self.send_header("Content-Encoding", "gzip")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _common_headers(self, etag: Optional[str]):
+                # 前端开发服务器与日志服务不同端口，允许跨域读取
+                self.send_header("Access-Control-Allow-Origin", "*")
+                self.send_header("Access-Control-Expose-Headers", "ETag")
+                self.send_header("Vary", "Accept-Encoding")
+                self.send_header("Cache-Control", "no-cache")
+                if etag:
+                    self.send_header("ETag", etag)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, name="log-server", daemon=True)
+        self._thread.start()
+        return self.port
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+        with self._lock:
+            for index in self._indexes.values():
+                index.close()
+            self._indexes.clear()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="回放前端使用的分页日志服务")
+    parser.add_argument("--log-dir", default="game_logs")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8090)
+    args = parser.parse_args()
+
+    server = LogServer(args.log_dir, port=args.port, host=args.host)
+    server.start()
+    print(f"日志服务已启动: http://{server.host}:{server.port}/api/games")
+    try:
+        server._thread.join()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
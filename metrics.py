@@ -0,0 +1,198 @@
+# metrics.py
+# 运行时指标采集与本地HTTP指标端点（Prometheus文本格式 / JSON）
+
+import json
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+# 直方图只保留最近的样本用于计算分位数，避免长时间运行时内存增长
+HISTOGRAM_WINDOW = 2048
+PERCENTILES = (0.5, 0.9, 0.99)
+
+
+def _label_key(labels: Optional[Dict[str, Any]]) -> LabelKey:
+    if not labels:
+        return ()
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(key: LabelKey, extra: Optional[Dict[str, str]] = None) -> str:
+    items = list(key) + sorted((extra or {}).items())
+    if not items:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape_label(v)}"' for k, v in items) + "}"
+
+
+class _Histogram:
+    """计数、求和以及最近样本窗口"""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.samples: Deque[float] = deque(maxlen=HISTOGRAM_WINDOW)
+
+    def observe(self, value: float):
+        self.count += 1
+        self.total += value
+        self.samples.append(value)
+
+    def percentiles(self) -> Dict[str, float]:
+        if not self.samples:
+            return {}
+        ordered = sorted(self.samples)
+        return {f"p{int(q * 100)}": ordered[min(len(ordered) - 1, int(q * len(ordered)))] for q in PERCENTILES}
+
+
+class MetricsRegistry:
+    """线程安全的指标注册表，支持计数器、仪表盘（含回调）和直方图"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[LabelKey, float]] = {}
+        self._gauges: Dict[str, Dict[LabelKey, float]] = {}
+        self._gauge_callbacks: Dict[str, Callable[[], float]] = {}
+        self._histograms: Dict[str, Dict[LabelKey, _Histogram]] = {}
+        self.start_time = time.time()
+
+    def inc(self, name: str, value: float = 1, labels: Optional[Dict[str, Any]] = None):
+        """计数器累加"""
+        key = _label_key(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def set_gauge(self, name: str, value: float, labels: Optional[Dict[str, Any]] = None):
+        """设置仪表盘当前值"""
+        with self._lock:
+            self._gauges.setdefault(name, {})[_label_key(labels)] = value
+
+    def register_gauge(self, name: str, callback: Callable[[], float]):
+        """注册在读取时计算的仪表盘（如队列深度、每小时手数）"""
+        with self._lock:
+            self._gauge_callbacks[name] = callback
+
+    def observe(self, name: str, value: float, labels: Optional[Dict[str, Any]] = None):
+        """记录一次观测值（延迟、底池大小等）"""
+        key = _label_key(labels)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = _Histogram()
+            histogram.observe(value)
+
+    def get_counter(self, name: str, labels: Optional[Dict[str, Any]] = None) -> float:
+        with self._lock:
+            return self._counters.get(name, {}).get(_label_key(labels), 0)
+
+    def _callback_values(self) -> Dict[str, float]:
+        values = {}
+        for name, callback in list(self._gauge_callbacks.items()):
+            try:
+                values[name] = float(callback())
+            except Exception:
+                continue
+        return values
+
+    def snapshot(self) -> Dict[str, Any]:
+        """以JSON友好的结构返回全部指标"""
+        callback_values = self._callback_values()
+        with self._lock:
+            def series(data: Dict[LabelKey, Any], render) -> List[Dict[str, Any]]:
+                return [{"labels": dict(key), **render(value)} for key, value in data.items()]
+
+            return {
+                "uptime_seconds": time.time() - self.start_time,
+                "counters": {name: series(data, lambda v: {"value": v}) for name, data in self._counters.items()},
+                "gauges": {
+                    **{name: series(data, lambda v: {"value": v}) for name, data in self._gauges.items()},
+                    **{name: [{"labels": {}, "value": v}] for name, v in callback_values.items()},
+                },
+                "histograms": {
+                    name: series(data, lambda h: {"count": h.count, "sum": h.total, **h.percentiles()})
+                    for name, data in self._histograms.items()
+                },
+            }
+
+    def to_prometheus(self, prefix: str = "poker_") -> str:
+        """以Prometheus文本格式输出全部指标"""
+        callback_values = self._callback_values()
+        lines = []
+        with self._lock:
+            for name, data in sorted(self._counters.items()):
+                lines.append(f"# TYPE {prefix}{name} counter")
+                for key, value in data.items():
+                    lines.append(f"{prefix}{name}{_format_labels(key)} {value}")
+            gauges = {name: dict(data) for name, data in self._gauges.items()}
+            for name, value in callback_values.items():
+                gauges[name] = {(): value}
+            for name, data in sorted(gauges.items()):
+                lines.append(f"# TYPE {prefix}{name} gauge")
+                for key, value in data.items():
+                    lines.append(f"{prefix}{name}{_format_labels(key)} {value}")
+            for name, data in sorted(self._histograms.items()):
+                lines.append(f"# TYPE {prefix}{name} summary")
+                for key, histogram in data.items():
+                    for quantile, value in zip(PERCENTILES, histogram.percentiles().values()):
+                        lines.append(f"{prefix}{name}{_format_labels(key, {'quantile': str(quantile)})} {value}")
+                    lines.append(f"{prefix}{name}_count{_format_labels(key)} {histogram.count}")
+                    lines.append(f"{prefix}{name}_sum{_format_labels(key)} {histogram.total}")
+        return "\n".join(lines) + "\n"
+
+
+class MetricsServer:
+    """在后台线程中提供 /metrics（Prometheus）和 /metrics.json 的本地HTTP端点"""
+
+    def __init__(self, registry: MetricsRegistry, port: int = 9109, host: str = "127.0.0.1"):
+        self.registry = registry
+        self.host = host
+        self.port = port
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> int:
+        """启动服务，返回实际监听的端口（port 为 0 时由系统分配）"""
+        registry = self.registry
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                path = self.path.split("?", 1)[0]
+                if path == "/metrics":
+                    body = registry.to_prometheus().encode("utf-8")
+                    content_type = "text/plain; version=0.0.4; charset=utf-8"
+                elif path == "/metrics.json":
+                    body = json.dumps(registry.snapshot(), ensure_ascii=False).encode("utf-8")
+                    content_type = "application/json; charset=utf-8"
+                else:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass  # 不在对局输出中打印访问日志
+
+        self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, name="metrics-server", daemon=True)
+        self._thread.start()
+        return self.port
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
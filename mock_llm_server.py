@@ -0,0 +1,475 @@
+# mock_llm_server.py
+# 本地模拟LLM服务：兼容 OpenAI /v1/chat/completions 与 Anthropic /v1/messages 接口，
+# 按脚本策略返回合法的决策/反思内容，可配置延迟分布、错误率、429限流和流式分块，用于无网络、零花费的端到端压测
+
+import argparse
+import asyncio
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+# 决策提示词中合法行动那一行（见 LLMPlayer.get_self_current_round_info / LegalActions.describe）
+_LEGAL_LINE_RE = re.compile(r"你当前可选的行动：([^\n]*)")
+_LEGAL_ITEM_RE = re.compile(r"(FOLD|CHECK|CALL|RAISE|ALL_IN)(?:\((?:需投入|投入)(\d+)(?:-(\d+))?\))?")
+
+_REFLECTION_TEXTS = [
+    "本轮对手整体偏被动，跟注频率高而主动下注少，有好牌时应加大价值下注尺度；面对突然的大额加注要收紧范围，位置靠后时可以更多地偷取盲注。",
+    "激进型对手在翻牌后持续下注的频率很高，但转牌后常放弃，可以用中等牌力跟注一条街再观察；短筹码玩家倾向全押，需用更强的牌跟注。",
+    "多数玩家在翻牌前过于松散，应提高开局加注的牌力要求并在有利位置隔离弱玩家；被动跟注者很少诈唬，面对他们的加注应果断弃掉边缘牌。",
+]
+
+
+@dataclass
+class MockServerConfig:
+    """模拟服务配置
+
+    延迟分布 latency_distribution 可选 fixed / uniform / lognormal / exponential，
+    latency_ms 为中位（或固定）延迟，latency_jitter 控制分布宽度。
+    """
+    host: str = "127.0.0.1"
+    port: int = 8765
+    latency_distribution: str = "lognormal"
+    latency_ms: float = 800.0
+    latency_jitter: float = 0.5
+    error_rate: float = 0.0  # 返回 500 的概率
+    rate_limit_rate: float = 0.0  # 返回 429 的概率
+    retry_after: float = 1.0  # 429 响应中的 retry-after 秒数
+    chunk_size: int = 16  # 流式输出时每个分块的字符数
+    chunk_delay_ms: float = 20.0  # 流式分块之间的间隔
+    raise_probability: float = 0.15  # 脚本策略选择加注的概率
+    fold_probability: float = 0.25  # 面对下注时弃牌的概率
+    seed: int = 0
+
+
+class ScriptedPolicy:
+    """从提示词或结构化输出约束中解析合法行动并给出确定性的决策
+
+    同一提示词总是得到同一决策，便于在不同客户端配置之间对比。
+    """
+
+    def __init__(self, config: MockServerConfig):
+        self.config = config
+
+    def _rng(self, prompt: str) -> random.Random:
+        digest = hashlib.sha256(f"{self.config.seed}:{prompt}".encode("utf-8")).digest()
+        return random.Random(int.from_bytes(digest[:8], "big"))
+
+    @staticmethod
+    def parse_legal_actions(prompt: str, schema: Optional[Dict[str, Any]] = None) -> Dict[str, Tuple[int, int]]:
+        """返回 {行动名: (最小投入, 最大投入)}，解析失败时为空"""
+        legal: Dict[str, Tuple[int, int]] = {}
+        # 多轮会话中以最后一条消息里的可选行动为准
+        matches = list(_LEGAL_LINE_RE.finditer(prompt))
+        match = matches[-1] if matches else None
+        if match:
+            for name, low, high in _LEGAL_ITEM_RE.findall(match.group(1)):
+                low_value = int(low) if low else 0
+                legal[name] = (low_value, int(high) if high else low_value)
+        if schema:
+            enum = schema.get("properties", {}).get("action", {}).get("enum")
+            if enum:
+                legal = {name: legal.get(name, (0, 0)) for name in enum}
+        return legal
+
+    def is_decision(self, prompt: str, schema: Optional[Dict[str, Any]] = None) -> bool:
+        return bool(schema) or _LEGAL_LINE_RE.search(prompt) is not None
+
+    def decide(self, prompt: str, schema: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        rng = self._rng(prompt)
+        legal = self.parse_legal_actions(prompt, schema)
+        if not legal:
+            return {"action": "CHECK", "amount": 0, "play_reason": "模拟服务：未识别到合法行动", "behavior": "面无表情"}
+
+        if "RAISE" in legal and rng.random() < self.config.raise_probability:
+            low, high = legal["RAISE"]
+            amount = rng.randint(low, max(low, min(high, low * 3)))
+            return {"action": "RAISE", "amount": amount, "play_reason": "模拟服务：主动加注施压", "behavior": "自信地推出筹码"}
+        if "CHECK" in legal:
+            return {"action": "CHECK", "amount": 0, "play_reason": "模拟服务：免费看牌", "behavior": "轻敲桌面"}
+        if "CALL" in legal and rng.random() >= self.config.fold_probability:
+            return {"action": "CALL", "amount": legal["CALL"][0], "play_reason": "模拟服务：赔率合适，跟注", "behavior": "平静地跟注"}
+        if "FOLD" in legal:
+            return {"action": "FOLD", "amount": 0, "play_reason": "模拟服务：牌力不足，弃牌", "behavior": "摇头弃牌"}
+        name = next(iter(legal))
+        return {"action": name, "amount": legal[name][0], "play_reason": "模拟服务：唯一可选行动", "behavior": "无奈"}
+
+    def reflect(self, prompt: str) -> str:
+        return self._rng(prompt).choice(_REFLECTION_TEXTS)
+
+
+def _estimate_tokens(text: str) -> int:
+    return max(1, len(text) // 2)
+
+
+def _prompt_text(messages: List[Dict[str, Any]], system: Any = None) -> str:
+    """把消息列表拼成纯文本（content 可以是字符串或内容块列表）"""
+    parts = []
+    for item in ([{"content": system}] if system else []) + list(messages or []):
+        content = item.get("content")
+        if isinstance(content, str):
+            parts.append(content)
+        elif isinstance(content, list):
+            parts.extend(block.get("text", "") for block in content if isinstance(block, dict))
+    return "\n".join(parts)
+
+
+def _cache_prefixes(messages: List[Dict[str, Any]], system: Any = None) -> List[Tuple[str, bool]]:
+    """Anthropic 请求中每个内容块结束处的前缀文本，以及该块是否带 cache_control 断点"""
+    prefixes, parts = [], []
+    for item in ([{"content": system}] if system else []) + list(messages or []):
+        content = item.get("content")
+        blocks = [{"text": content}] if isinstance(content, str) else content or []
+        for block in blocks:
+            if not isinstance(block, dict):
+                continue
+            parts.append(block.get("text", ""))
+            prefixes.append(("\n".join(parts), bool(block.get("cache_control"))))
+    return prefixes
+
+
+class MockLLMServer:
+    """基于 asyncio 的模拟LLM HTTP服务（HTTP/1.1，支持长连接与分块传输的SSE流式输出）"""
+
+    def __init__(self, config: Optional[MockServerConfig] = None):
+        self.config = config or MockServerConfig()
+        self.policy = ScriptedPolicy(self.config)
+        self.rng = random.Random(self.config.seed)
+        self.stats: Dict[str, int] = {"requests": 0, "decisions": 0, "reflections": 0, "streamed": 0,
+                                      "errors": 0, "rate_limited": 0, "connections": 0}
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._connections = set()
+        self._cached_prefixes = set()  # 模拟服务端的提示词前缀缓存
+
+    @property
+    def base_url(self) -> str:
+        """OpenAI 客户端使用 f"{base_url}/v1"，Anthropic 客户端直接使用 base_url"""
+        return f"http://{self.config.host}:{self.config.port}"
+
+    def _latency(self) -> float:
+        """按配置的分布采样一次响应延迟（秒）"""
+        config = self.config
+        median = config.latency_ms / 1000.0
+        if config.latency_distribution == "fixed" or median <= 0:
+            return max(0.0, median)
+        if config.latency_distribution == "uniform":
+            spread = median * config.latency_jitter
+            return max(0.0, self.rng.uniform(median - spread, median + spread))
+        if config.latency_distribution == "exponential":
+            return self.rng.expovariate(1.0 / median)
+        return self.rng.lognormvariate(0.0, config.latency_jitter) * median
+
+    # ---------- HTTP 基础 ----------
+
+    async def _read_request(self, reader: asyncio.StreamReader) -> Optional[Tuple[str, str, Dict[str, str], bytes]]:
+        try:
+            head = await reader.readuntil(b"\r\n\r\n")
+        except (asyncio.IncompleteReadError, ConnectionError):
+            return None
+        lines = head.decode("latin-1").split("\r\n")
+        method, path, _ = lines[0].split(" ", 2)
+        headers = {}
+        for line in lines[1:]:
+            if ":" in line:
+                key, value = line.split(":", 1)
+                headers[key.strip().lower()] = value.strip()
+        body = await reader.readexactly(int(headers.get("content-length", 0) or 0))
+        return method, path.split("?", 1)[0], headers, body
+
+    @staticmethod
+    async def _send(writer: asyncio.StreamWriter, status: int, payload: Any,
+                    headers: Optional[Dict[str, str]] = None):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        reason = {200: "OK", 404: "Not Found", 400: "Bad Request", 429: "Too Many Requests",
+                  500: "Internal Server Error"}.get(status, "OK")
+        head = [f"HTTP/1.1 {status} {reason}", "Content-Type: application/json",
+                f"Content-Length: {len(body)}", "Connection: keep-alive"]
+        head += [f"{k}: {v}" for k, v in (headers or {}).items()]
+        writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + body)
+        await writer.drain()
+
+    @staticmethod
+    async def _start_stream(writer: asyncio.StreamWriter):
+        head = ["HTTP/1.1 200 OK", "Content-Type: text/event-stream", "Cache-Control: no-cache",
+                "Transfer-Encoding: chunked", "Connection: keep-alive"]
+        writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1"))
+        await writer.drain()
+
+    @staticmethod
+    async def _send_event(writer: asyncio.StreamWriter, data: Any, event: Optional[str] = None):
+        text = (f"event: {event}\n" if event else "") + \
+               f"data: {data if isinstance(data, str) else json.dumps(data, ensure_ascii=False)}\n\n"
+        chunk = text.encode("utf-8")
+        writer.write(f"{len(chunk):X}\r\n".encode("latin-1") + chunk + b"\r\n")
+        await writer.drain()
+
+    @staticmethod
+    async def _end_stream(writer: asyncio.StreamWriter):
+        writer.write(b"0\r\n\r\n")
+        await writer.drain()
+
+    def _chunks(self, text: str) -> List[str]:
+        size = max(1, self.config.chunk_size)
+        return [text[i:i + size] for i in range(0, len(text), size)] or [""]
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.stats["connections"] += 1
+        task = asyncio.current_task()
+        self._connections.add(task)
+        try:
+            while True:
+                request = await self._read_request(reader)
+                if request is None:
+                    break
+                method, path, headers, body = request
+                if headers.get("connection", "").lower() == "close":
+                    await self._dispatch(writer, method, path, body)
+                    break
+                await self._dispatch(writer, method, path, body)
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.CancelledError):
+            pass
+        finally:
+            self._connections.discard(task)
+            writer.close()
+
+    async def _dispatch(self, writer: asyncio.StreamWriter, method: str, path: str, body: bytes):
+        if method == "GET" and path in ("/health", "/stats"):
+            await self._send(writer, 200, {"status": "ok", **self.stats})
+            return
+        if method != "POST" or path not in ("/v1/chat/completions", "/chat/completions", "/v1/messages"):
+            await self._send(writer, 404, {"error": {"message": f"未知接口: {method} {path}"}})
+            return
+        anthropic = path.endswith("/messages")
+        try:
+            payload = json.loads(body or b"{}")
+        except ValueError:
+            await self._send(writer, 400, {"error": {"message": "请求体不是合法JSON"}})
+            return
+
+        self.stats["requests"] += 1
+        await asyncio.sleep(self._latency())
+
+        roll = self.rng.random()
+        if roll < self.config.rate_limit_rate:
+            self.stats["rate_limited"] += 1
+            error = ({"type": "error", "error": {"type": "rate_limit_error", "message": "模拟限流"}} if anthropic
+                     else {"error": {"message": "模拟限流", "type": "rate_limit_error", "code": "rate_limit_exceeded"}})
+            await self._send(writer, 429, error, {"retry-after": str(self.config.retry_after)})
+            return
+        if roll < self.config.rate_limit_rate + self.config.error_rate:
+            self.stats["errors"] += 1
+            error = ({"type": "error", "error": {"type": "api_error", "message": "模拟服务端错误"}} if anthropic
+                     else {"error": {"message": "模拟服务端错误", "type": "server_error", "code": None}})
+            await self._send(writer, 500, error)
+            return
+
+        if anthropic:
+            await self._respond_anthropic(writer, payload)
+        else:
+            await self._respond_openai(writer, payload)
+
+    # ---------- 接口实现 ----------
+
+    def _generate(self, prompt: str, schema: Optional[Dict[str, Any]]) -> Tuple[bool, str, Any]:
+        """返回 (是否为决策, 文本内容, 决策字典)"""
+        if self.policy.is_decision(prompt, schema):
+            self.stats["decisions"] += 1
+            decision = self.policy.decide(prompt, schema)
+            return True, json.dumps(decision, ensure_ascii=False), decision
+        self.stats["reflections"] += 1
+        return False, self.policy.reflect(prompt), None
+
+    async def _respond_openai(self, writer: asyncio.StreamWriter, payload: Dict[str, Any]):
+        prompt = _prompt_text(payload.get("messages", []))
+        response_format = payload.get("response_format") or {}
+        schema = (response_format.get("json_schema") or {}).get("schema")
+        _, content, _ = self._generate(prompt, schema)
+        model = payload.get("model", "mock")
+        response_id = f"chatcmpl-{uuid.uuid4().hex[:24]}"
+        created = int(time.time())
+        usage = {"prompt_tokens": _estimate_tokens(prompt), "completion_tokens": _estimate_tokens(content)}
+        usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+        # 模拟自动前缀缓存：按消息边界取之前出现过的最长前缀作为缓存命中
+        messages = payload.get("messages") or []
+        prefixes = [_prompt_text(messages[:end]) for end in range(1, len(messages) + 1)]
+        hit = next((prefix for prefix in reversed(prefixes) if prefix in self._cached_prefixes), "")
+        if hit:
+            usage["prompt_tokens_details"] = {"cached_tokens": _estimate_tokens(hit)}
+        self._cached_prefixes.update(prefixes)
+
+        if not payload.get("stream"):
+            await self._send(writer, 200, {
+                "id": response_id, "object": "chat.completion", "created": created, "model": model,
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": content},
+                             "finish_reason": "stop"}],
+                "usage": usage,
+            })
+            return
+
+        self.stats["streamed"] += 1
+        await self._start_stream(writer)
+
+        def chunk(delta: Dict[str, Any], finish_reason: Optional[str] = None) -> Dict[str, Any]:
+            return {"id": response_id, "object": "chat.completion.chunk", "created": created, "model": model,
+                    "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}]}
+
+        await self._send_event(writer, chunk({"role": "assistant", "content": ""}))
+        for piece in self._chunks(content):
+            await asyncio.sleep(self.config.chunk_delay_ms / 1000.0)
+            await self._send_event(writer, chunk({"content": piece}))
+        await self._send_event(writer, chunk({}, "stop"))
+        await self._send_event(writer, "[DONE]")
+        await self._end_stream(writer)
+
+    async def _respond_anthropic(self, writer: asyncio.StreamWriter, payload: Dict[str, Any]):
+        prompt = _prompt_text(payload.get("messages", []), payload.get("system"))
+        tool_choice = payload.get("tool_choice") or {}
+        tool = next((t for t in payload.get("tools", []) if t.get("name") == tool_choice.get("name")), None)
+        schema = tool.get("input_schema") if tool else None
+        is_decision, content, decision = self._generate(prompt, schema)
+        model = payload.get("model", "mock")
+        message_id = f"msg_{uuid.uuid4().hex[:24]}"
+        usage = {"input_tokens": _estimate_tokens(prompt), "output_tokens": _estimate_tokens(content)}
+        # 模拟 cache_control：从最后一个断点向前查找已缓存的最长前缀，断点之前未命中的部分写入缓存；
+        # input_tokens 只含未缓存部分
+        prefixes = _cache_prefixes(payload.get("messages", []), payload.get("system"))
+        breakpoints = [i for i, (_, is_breakpoint) in enumerate(prefixes) if is_breakpoint]
+        if breakpoints:
+            candidates = [prefix for prefix, _ in prefixes[:breakpoints[-1] + 1]]
+            hit = next((prefix for prefix in reversed(candidates) if prefix in self._cached_prefixes), "")
+            cached = _estimate_tokens(hit) if hit else 0
+            written = _estimate_tokens(candidates[-1]) - cached if candidates[-1] != hit else 0
+            self._cached_prefixes.update(prefixes[i][0] for i in breakpoints)
+            usage["cache_read_input_tokens"] = cached
+            usage["cache_creation_input_tokens"] = written
+            usage["input_tokens"] = max(0, usage["input_tokens"] - cached - written)
+        use_tool = tool is not None and is_decision
+        if use_tool:
+            block = {"type": "tool_use", "id": f"toolu_{uuid.uuid4().hex[:24]}", "name": tool["name"], "input": decision}
+        else:
+            block = {"type": "text", "text": content}
+        stop_reason = "tool_use" if use_tool else "end_turn"
+
+        if not payload.get("stream"):
+            await self._send(writer, 200, {
+                "id": message_id, "type": "message", "role": "assistant", "model": model,
+                "content": [block], "stop_reason": stop_reason, "stop_sequence": None, "usage": usage,
+            })
+            return
+
+        self.stats["streamed"] += 1
+        await self._start_stream(writer)
+        await self._send_event(writer, {"type": "message_start", "message": {
+            "id": message_id, "type": "message", "role": "assistant", "model": model, "content": [],
+            "stop_reason": None, "stop_sequence": None, "usage": {**usage, "output_tokens": 0}}}, "message_start")
+        start_block = {**block, "input": {}} if use_tool else {"type": "text", "text": ""}
+        await self._send_event(writer, {"type": "content_block_start", "index": 0, "content_block": start_block},
+                               "content_block_start")
+        for piece in self._chunks(content):
+            await asyncio.sleep(self.config.chunk_delay_ms / 1000.0)
+            delta = ({"type": "input_json_delta", "partial_json": piece} if use_tool
+                     else {"type": "text_delta", "text": piece})
+            await self._send_event(writer, {"type": "content_block_delta", "index": 0, "delta": delta},
+                                   "content_block_delta")
+        await self._send_event(writer, {"type": "content_block_stop", "index": 0}, "content_block_stop")
+        await self._send_event(writer, {"type": "message_delta",
+                                        "delta": {"stop_reason": stop_reason, "stop_sequence": None},
+                                        "usage": {"output_tokens": usage["output_tokens"]}}, "message_delta")
+        await self._send_event(writer, {"type": "message_stop"}, "message_stop")
+        await self._end_stream(writer)
+
+    # ---------- 生命周期 ----------
+
+    async def start(self) -> int:
+        """在当前事件循环中启动服务，返回实际端口（port 为 0 时由系统分配）"""
+        self._server = await asyncio.start_server(self._handle, self.config.host, self.config.port)
+        self.config.port = self._server.sockets[0].getsockname()[1]
+        return self.config.port
+
+    async def serve_forever(self):
+        if self._server is None:
+            await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    def start_in_thread(self) -> str:
+        """在后台线程中运行服务，返回 base_url；适合在同一进程中跑对局压测"""
+        started = threading.Event()
+
+        def run():
+            self._loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(self._loop)
+            self._loop.run_until_complete(self.start())
+            started.set()
+            self._loop.run_forever()
+
+        self._thread = threading.Thread(target=run, name="mock-llm-server", daemon=True)
+        self._thread.start()
+        started.wait()
+        return self.base_url
+
+    def stop(self):
+        """停止后台线程中的服务"""
+        if self._loop is None:
+            return
+
+        async def shutdown():
+            self._server.close()
+            # 客户端连接池中的长连接不会主动断开，需要取消对应的处理任务
+            for task in list(self._connections):
+                task.cancel()
+            await asyncio.gather(*self._connections, return_exceptions=True)
+            await self._server.wait_closed()
+
+        asyncio.run_coroutine_threadsafe(shutdown(), self._loop).result(timeout=5)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5)
+        self._loop = None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="本地模拟LLM服务（OpenAI/Anthropic兼容）")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-distribution", default="lognormal",
+                        choices=["fixed", "uniform", "lognormal", "exponential"])
+    parser.add_argument("--latency-ms", type=float, default=800.0, help="中位（或固定）延迟，毫秒")
+    parser.add_argument("--latency-jitter", type=float, default=0.5, help="延迟分布宽度")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="返回500的概率")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="返回429的概率")
+    parser.add_argument("--retry-after", type=float, default=1.0)
+    parser.add_argument("--chunk-size", type=int, default=16, help="流式输出每块字符数")
+    parser.add_argument("--chunk-delay-ms", type=float, default=20.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    config = MockServerConfig(
+        host=args.host, port=args.port, latency_distribution=args.latency_distribution,
+        latency_ms=args.latency_ms, latency_jitter=args.latency_jitter, error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate, retry_after=args.retry_after, chunk_size=args.chunk_size,
+        chunk_delay_ms=args.chunk_delay_ms, seed=args.seed
+    )
+    server = MockLLMServer(config)
+
+    async def run():
+        await server.start()
+        print(f"模拟LLM服务已启动: {server.base_url}")
+        print(f"  OpenAI 客户端 base_url: {server.base_url}/v1")
+        print(f"  Anthropic 客户端 base_url: {server.base_url}")
+        await server.serve_forever()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
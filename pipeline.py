@@ -0,0 +1,134 @@
+# pipeline.py
+# 决策流水线：在阻塞的LLM决策请求期间，用线程池并行完成不依赖它的工作——
+# 上一手反思的LLM请求异步进行，只在该玩家下一次决策（以及保存日志/检查点）之前等待；每街开始时预先计算各玩家的牌力特征
+
+import copy
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, replace
+from typing import Any, Deque, Dict, Optional
+
+from ai_player import AIPlayer
+from game_info import GameInfoState, GameResult
+from hand_features import HandFeatureCache
+from poker_engine import PokerTable
+from profiling import phase
+
+
+def snapshot_state(game_state: GameInfoState) -> GameInfoState:
+    """复制反思用到的可变部分，牌桌进入下一手后后台反思看到的仍是这一手结束时的状态"""
+    return replace(
+        game_state,
+        hand=list(game_state.hand),
+        community_cards=list(game_state.community_cards),
+        players_info=copy.deepcopy(game_state.players_info),
+        action_history=list(game_state.action_history),
+        player_stats=copy.deepcopy(game_state.player_stats),
+    )
+
+
+@dataclass
+class _PendingReflection:
+    ai_player: AIPlayer
+    future: Future
+    applied: bool = False  # 记忆是否已更新（日志要等之前提交的反思都记录后才写）
+
+
+class DecisionPipeline:
+    """把反思和特征计算与决策请求重叠执行
+
+    反思只会改变该玩家自己的记忆，因此其LLM请求可以与下一手中其他玩家的决策并行；同一玩家的反思在其下一次决策前
+    等待完成，决策看到的记忆与串行执行时相同。更新记忆、写日志和推送事件都在控制器线程中进行，反思日志按提交顺序写入。
+    日志与检查点读取全部记录和记忆，保存前需调用 drain()；锦标赛结束时调用 shutdown() 关闭线程池。
+
+    Args:
+        max_workers: 线程池大小
+        metrics: 指标注册表，记录决策前等待反思的时间
+        profiler: 分阶段耗时分析器，反思耗时仍记在 reflection 阶段，等待时间记在 reflection_wait 阶段
+    """
+
+    def __init__(self, max_workers: int = 4, metrics: Optional[Any] = None, profiler: Optional[Any] = None):
+        self.max_workers = max_workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self.metrics = metrics
+        self.profiler = profiler
+        self._reflections: Deque[_PendingReflection] = deque()
+        self.reflections = 0
+        self.prefetches = 0
+        self.wait_seconds = 0.0
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        """线程池在第一次使用时创建，shutdown 之后再使用会重新创建（复式赛每轮结束都会 shutdown）"""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="pipeline")
+        return self._executor
+
+    def _request(self, ai_player: AIPlayer, game_state: GameInfoState, game_result: GameResult) -> Any:
+        with phase(self.profiler, "reflection"):
+            return ai_player.request_reflection(game_state, game_result)
+
+    def submit_reflection(self, ai_player: AIPlayer, game_state: GameInfoState, game_result: GameResult):
+        """在后台请求反思；同一玩家的上一次反思先完成，保证记忆按手牌顺序更新"""
+        self.wait_for(ai_player.name)
+        future = self.executor.submit(self._request, ai_player, snapshot_state(game_state), game_result)
+        self._reflections.append(_PendingReflection(ai_player, future))
+        self.reflections += 1
+
+    def _apply(self, pending: _PendingReflection):
+        if pending.applied:
+            return
+        start = time.time()
+        with phase(self.profiler, "reflection_wait"):
+            outcome = pending.future.result()
+        waited = time.time() - start
+        self.wait_seconds += waited
+        if self.metrics:
+            self.metrics.observe("pipeline_wait_seconds", waited, {"player": pending.ai_player.name})
+        pending.ai_player.apply_reflection(outcome)
+        pending.applied = True
+
+    def _log_ready(self):
+        """按提交顺序记录已更新记忆的反思，遇到尚未完成的为止"""
+        while self._reflections and self._reflections[0].applied:
+            pending = self._reflections.popleft()
+            pending.ai_player.log_reflection(pending.future.result())
+
+    def wait_for(self, player_name: str):
+        """等待该玩家尚未完成的反思并更新其记忆，之前提交的反思都已更新时一并写入日志"""
+        for pending in self._reflections:
+            if pending.ai_player.name == player_name:
+                self._apply(pending)
+        self._log_ready()
+
+    def drain(self):
+        """等待全部后台反思完成，更新记忆并按提交顺序写入日志"""
+        for pending in self._reflections:
+            self._apply(pending)
+        self._log_ready()
+
+    def prefetch_features(self, features: HandFeatureCache, table: PokerTable):
+        """为本街还会行动的玩家提前计算牌力特征（对手数按本街开始时在场的玩家计）"""
+        in_hand = [p for p in table.players if p.is_active and not p.folded]
+        for player in in_hand:
+            if player.all_in:
+                continue
+            features.prefetch(self.executor, table.hand_number, table.stage, player.name, player.hand,
+                              table.community_cards, len(in_hand) - 1)
+            self.prefetches += 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "reflections": self.reflections,
+            "pending_reflections": len(self._reflections),
+            "prefetches": self.prefetches,
+            "wait_seconds": self.wait_seconds,
+        }
+
+    def shutdown(self):
+        """完成全部反思并关闭线程池"""
+        self.drain()
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
@@ -0,0 +1,242 @@
+# player_stats.py
+# 对手统计：由 PokerTable.log_action 逐条喂入行动，增量维护每名玩家的 VPIP/PFR/3-bet/AF/WTSD/c-bet 计数，
+# 可保存为小型 JSON 存储在多场锦标赛之间累积，也可从旧版游戏日志重新统计
+
+import json
+import os
+from dataclasses import asdict, dataclass, field, fields
+from typing import Any, Dict, Iterable, Optional, Set
+
+STATS_VERSION = 1
+
+# 翻牌前的主动行动（盲注不算）
+VOLUNTARY_ACTIONS = ("call", "raise", "all-in")
+BLIND_ACTIONS = ("small-blind", "big-blind")
+
+
+@dataclass
+class PlayerStats:
+    """一名玩家的累计计数；比例在读取时计算"""
+    hands: int = 0  # 参与的手数
+    vpip: int = 0  # 翻牌前主动入池的手数
+    pfr: int = 0  # 翻牌前加注的手数
+    three_bet: int = 0  # 面对一次加注时再加注的手数
+    three_bet_opportunities: int = 0
+    postflop_aggressive: int = 0  # 翻牌后下注/加注次数
+    postflop_calls: int = 0  # 翻牌后跟注次数
+    saw_flop: int = 0
+    showdowns: int = 0  # 看到翻牌后走到摊牌的手数
+    cbet: int = 0  # 翻牌前最后加注者在翻牌圈率先下注
+    cbet_opportunities: int = 0
+
+    @staticmethod
+    def _rate(count: int, total: int) -> float:
+        return count / total if total else 0.0
+
+    @property
+    def vpip_rate(self) -> float:
+        return self._rate(self.vpip, self.hands)
+
+    @property
+    def pfr_rate(self) -> float:
+        return self._rate(self.pfr, self.hands)
+
+    @property
+    def three_bet_rate(self) -> float:
+        return self._rate(self.three_bet, self.three_bet_opportunities)
+
+    @property
+    def aggression_factor(self) -> float:
+        """(下注+加注)/跟注；没有跟注时返回下注加注次数本身"""
+        return self.postflop_aggressive / self.postflop_calls if self.postflop_calls else float(self.postflop_aggressive)
+
+    @property
+    def wtsd_rate(self) -> float:
+        return self._rate(self.showdowns, self.saw_flop)
+
+    @property
+    def cbet_rate(self) -> float:
+        return self._rate(self.cbet, self.cbet_opportunities)
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            **asdict(self),
+            "vpip_rate": self.vpip_rate,
+            "pfr_rate": self.pfr_rate,
+            "three_bet_rate": self.three_bet_rate,
+            "aggression_factor": self.aggression_factor,
+            "wtsd_rate": self.wtsd_rate,
+            "cbet_rate": self.cbet_rate,
+        }
+
+    def describe(self) -> str:
+        """用于提示词的一行统计"""
+        return (f"{self.hands}手 VPIP {self.vpip_rate:.0%} PFR {self.pfr_rate:.0%} 3bet {self.three_bet_rate:.0%} "
+                f"AF {self.aggression_factor:.1f} WTSD {self.wtsd_rate:.0%} c-bet {self.cbet_rate:.0%}")
+
+
+@dataclass
+class _HandState:
+    """当前这一手的临时状态（只在手内使用，不持久化）"""
+    hand_number: int
+    stage: str = "preflop"
+    players: Set[str] = field(default_factory=set)
+    folded: Set[str] = field(default_factory=set)
+    vpip: Set[str] = field(default_factory=set)
+    pfr: Set[str] = field(default_factory=set)
+    three_bet_seen: Set[str] = field(default_factory=set)
+    preflop_raises: int = 0
+    preflop_aggressor: Optional[str] = None
+    flop_counted: bool = False
+    flop_acted: Set[str] = field(default_factory=set)
+    flop_bet: bool = False
+    street_bets: Dict[str, int] = field(default_factory=dict)  # 本街每名玩家已投入的筹码
+    street_max: int = 0
+
+
+class PlayerStatsTracker:
+    """增量统计器：每条行动 O(1) 更新计数
+
+    行动按日志顺序喂入（盲注在前）；手数变化即视为新的一手。喂入的数据只用到旧版游戏日志中也有的字段，
+    因此实时对局（PokerTable.player_stats）与离线日志（feed_record）得到相同的结果。
+    """
+
+    def __init__(self, players: Optional[Dict[str, PlayerStats]] = None):
+        self.players: Dict[str, PlayerStats] = players or {}
+        self._hand: Optional[_HandState] = None
+
+    def get(self, player_name: str) -> Optional[PlayerStats]:
+        return self.players.get(player_name)
+
+    def _stats(self, player_name: str) -> PlayerStats:
+        stats = self.players.get(player_name)
+        if stats is None:
+            stats = self.players[player_name] = PlayerStats()
+        return stats
+
+    def _enter_stage(self, hand: _HandState, stage: str):
+        if stage == hand.stage:
+            return
+        hand.stage = stage
+        hand.street_bets = {}
+        hand.street_max = 0
+        # 第一次离开翻牌前时，仍在牌局中的玩家都看到了翻牌
+        if not hand.flop_counted:
+            hand.flop_counted = True
+            for name in hand.players - hand.folded:
+                self._stats(name).saw_flop += 1
+
+    def record_action(self, hand_number: int, stage: str, player_name: str, action: str, amount: int):
+        """喂入一条行动（stage/action 为日志中的字符串取值，amount 为实际投入的筹码）"""
+        hand = self._hand
+        if hand is None or hand.hand_number != hand_number:
+            hand = self._hand = _HandState(hand_number)
+        self._enter_stage(hand, stage)
+
+        stats = self._stats(player_name)
+        if player_name not in hand.players:
+            hand.players.add(player_name)
+            stats.hands += 1
+
+        previous_max = hand.street_max
+        committed = hand.street_bets.get(player_name, 0) + amount
+        hand.street_bets[player_name] = committed
+        hand.street_max = max(previous_max, committed)
+        if action == "fold":
+            hand.folded.add(player_name)
+        if action in BLIND_ACTIONS:
+            return
+        aggressive = action in ("raise", "all-in") and committed > previous_max
+
+        if stage == "preflop":
+            if player_name not in hand.three_bet_seen and hand.preflop_raises == 1 \
+                    and hand.preflop_aggressor != player_name:
+                hand.three_bet_seen.add(player_name)
+                stats.three_bet_opportunities += 1
+                if aggressive:
+                    stats.three_bet += 1
+            if action in VOLUNTARY_ACTIONS and amount > 0 and player_name not in hand.vpip:
+                hand.vpip.add(player_name)
+                stats.vpip += 1
+            if aggressive:
+                hand.preflop_raises += 1
+                hand.preflop_aggressor = player_name
+                if player_name not in hand.pfr:
+                    hand.pfr.add(player_name)
+                    stats.pfr += 1
+            return
+
+        if aggressive:
+            stats.postflop_aggressive += 1
+        elif action == "call" or (action == "all-in" and amount > 0):
+            stats.postflop_calls += 1
+
+        if stage == "flop" and player_name not in hand.flop_acted:
+            hand.flop_acted.add(player_name)
+            if player_name == hand.preflop_aggressor and not hand.flop_bet:
+                stats.cbet_opportunities += 1
+                if aggressive:
+                    stats.cbet += 1
+        if stage == "flop" and aggressive:
+            hand.flop_bet = True
+
+    def record_showdown(self, hand_number: int, player_names: Iterable[str]):
+        """喂入一次摊牌（参与摊牌的玩家）"""
+        hand = self._hand
+        if hand is None or hand.hand_number != hand_number:
+            hand = self._hand = _HandState(hand_number)
+        self._enter_stage(hand, "showdown")
+        for name in player_names:
+            self._stats(name).showdowns += 1
+
+    def feed_record(self, record: Dict[str, Any]):
+        """喂入一条旧版游戏日志记录（只处理行动与摊牌记录）"""
+        record_type = record.get("type")
+        if record_type == 3:
+            self.record_action(record["hand_number"], record["stage"], record["player_name"],
+                               record["action"], record["amount"])
+        elif record_type == 4:
+            self.record_showdown(record["hand_number"], [p["player_name"] for p in record["players"]])
+
+    def describe(self, player_name: str) -> str:
+        stats = self.players.get(player_name)
+        return stats.describe() if stats and stats.hands else ""
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        return {name: stats.summary() for name, stats in self.players.items()}
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"version": STATS_VERSION, "players": {name: asdict(stats) for name, stats in self.players.items()}}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "PlayerStatsTracker":
+        known = {f.name for f in fields(PlayerStats)}
+        players = {name: PlayerStats(**{k: v for k, v in counts.items() if k in known})
+                   for name, counts in data.get("players", {}).items()}
+        return cls(players)
+
+    @classmethod
+    def load(cls, path: str) -> "PlayerStatsTracker":
+        """读取统计存储；文件不存在时返回空的统计器"""
+        if not os.path.exists(path):
+            return cls()
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls.from_dict(json.load(f))
+
+    def save(self, path: str):
+        """写入统计存储（先写临时文件再替换，避免中断时损坏已有数据）"""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, path)
+
+
+def stats_from_records(records: Iterable[Dict[str, Any]]) -> PlayerStatsTracker:
+    """从旧版游戏日志记录重新统计"""
+    tracker = PlayerStatsTracker()
+    for record in records:
+        tracker.feed_record(record)
+    return tracker
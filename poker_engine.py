@@ -1,13 +1,18 @@
 # poker_engine.py
 # 德州扑克游戏引擎
 
+import hashlib
 import random
 import json
 import os
-from typing import List, Dict, Any, Tuple, Optional
+from dataclasses import dataclass
+from typing import List, Dict, Any, Tuple, Optional, Iterable
 from enum import Enum
-from game_info import GameAction, GameResult, GameWinnerInfo
+from game_info import GameAction, GameResult, GameWinnerInfo, LegalActions
 from engine_info import Card, Action, GameStage, Player, Suit
+from hand_evaluator import card_to_int, evaluate, hand_category
+from hand_history import write_hand_history
+from log_reader import iter_game_log
 
 
 class HandRank(Enum):
@@ -24,10 +29,25 @@ class HandRank(Enum):
     ROYAL_FLUSH = 10  # 皇家同花顺
 
 
+@dataclass
+class PendingShowdown:
+    """等待评估的摊牌：cards 的每一行是一名参与摊牌玩家的底牌加公共牌（整数编码）"""
+    hand_number: int
+    players: List[Player]
+    cards: List[List[int]]
+
+
+def derive_hand_seed(seed: int, hand_number: int) -> int:
+    """由牌桌种子和手数推导该手牌的洗牌种子（与之前的手牌无关，可直接定位任意一手）"""
+    digest = hashlib.sha256(f"{seed}:{hand_number}".encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big")
+
+
 class PokerTable:
     """德州扑克牌桌类"""
 
-    def __init__(self, small_blind: int = 5, big_blind: int = 10, max_players: int = 10):
+    def __init__(self, small_blind: int = 5, big_blind: int = 10, max_players: int = 10,
+                 seed: Optional[int] = None):
         self.players: List[Player] = []
         self.deck: List[Card] = []
         self.community_cards: List[Card] = []
@@ -43,6 +63,13 @@ class PokerTable:
         self.action_history: List[GameAction] = []  # 行动历史
         self.game_log: List[Dict[str, Any]] = []  # 游戏日志
         self.game_result_log: Dict[int, GameResult] = {}
+        # 牌桌随机种子：未指定时随机生成，但总会记录到日志中，保证事后可以复现
+        self.seed = seed if seed is not None else random.SystemRandom().randrange(1 << 63)
+        # 摊牌调度器（见 showdown_scheduler.py）：设置后摊牌只登记，由调度器跨牌桌批量评估后再结算
+        self.showdown_scheduler = None
+        self.pending_showdown: Optional[PendingShowdown] = None
+        # 对手统计（见 player_stats.py），由GameController注入；每条行动与每次摊牌都会喂给它
+        self.player_stats = None
 
     def add_player(self, player: Player) -> bool:
         """添加玩家到牌桌"""
@@ -59,13 +86,18 @@ class PokerTable:
                 return True
         return False
 
-    def initialize_deck(self):
-        """初始化一副牌"""
-        self.deck = []
+    def hand_deck(self, hand_number: int) -> List[Card]:
+        """生成指定手数洗好的牌组（只依赖牌桌种子和手数）"""
+        deck = []
         for suit in Suit:
             for value in range(2, 15):  # 2-14 (2-A)
-                self.deck.append(Card(suit, value))
-        random.shuffle(self.deck)
+                deck.append(Card(suit, value))
+        random.Random(derive_hand_seed(self.seed, hand_number)).shuffle(deck)
+        return deck
+
+    def initialize_deck(self):
+        """初始化一副牌"""
+        self.deck = self.hand_deck(self.hand_number)
 
     def deal_hole_cards(self):
         """发放底牌给每个玩家"""
@@ -135,6 +167,35 @@ class PokerTable:
                 break
         return None
 
+    def legal_actions(self, player: Player) -> LegalActions:
+        """根据当前牌桌状态生成玩家的合法行动及加注范围"""
+        if player.folded or not player.is_active or player.all_in:
+            return LegalActions()
+
+        to_call = max(0, self.current_bet - player.bet_in_round)
+        actions = [Action.FOLD]
+        if to_call == 0:
+            actions.append(Action.CHECK)
+        else:
+            actions.append(Action.CALL)
+
+        min_raise = max(self.current_bet * 2, self.big_blind)
+        if player.chips >= min_raise:
+            actions.append(Action.RAISE)
+        if player.chips > 0:
+            actions.append(Action.ALL_IN)
+
+        return LegalActions(
+            actions=actions,
+            call_amount=min(to_call, player.chips),
+            min_raise=min_raise,
+            max_raise=player.chips
+        )
+
+    def coerce_action(self, player: Player, action: Action, amount: int = 0) -> Tuple[Action, int]:
+        """把玩家的行动修正为合法行动（规则见 LegalActions.coerce）"""
+        return self.legal_actions(player).coerce(action, amount)
+
     def process_action(self, player: Player, action: Action, amount: int = 0, behavior: str = "") -> bool:
         """处理玩家行动"""
         if player.folded or not player.is_active or player.all_in:
@@ -162,6 +223,7 @@ class PokerTable:
             return True
 
         elif action == Action.RAISE:
+            # 只拒绝低于当前注两倍或超过剩余筹码的加注；LegalActions 的大盲下限只用于提示与修正
             min_raise = self.current_bet * 2
             if amount < min_raise or amount > player.chips:
                 return False  # 加注金额无效
@@ -209,6 +271,15 @@ class PokerTable:
             "behavior": behavior
         }
         self.game_log.append(action_record)
+        if self.player_stats is not None:
+            self.player_stats.record_action(self.hand_number, self.stage.value, player.name, action.value, amount)
+
+    def current_hand_actions(self) -> List[GameAction]:
+        """获取当前这手牌的行动历史（从末尾向前查找，避免随对局变长而扫描全部历史）"""
+        start = len(self.action_history)
+        while start > 0 and self.action_history[start - 1].hand_number == self.hand_number:
+            start -= 1
+        return self.action_history[start:]
 
     def is_round_complete(self) -> bool:
         """检查当前回合是否结束"""
@@ -218,8 +289,7 @@ class PokerTable:
 
         # 检查所有未弃牌的玩家是否都已经行动并且下注相等或全押
         bet_amounts = set()
-        current_hand_actions = [action for action in self.action_history if
-                                action.hand_number == self.hand_number and action.stage == self.stage]
+        current_hand_actions = [action for action in self.current_hand_actions() if action.stage == self.stage]
         
         # 获取当前阶段中已经行动过的玩家名称集合
         acted_players = set(action.player_name for action in current_hand_actions)
@@ -495,51 +565,60 @@ class PokerTable:
 
     def showdown(self):
         """摊牌并确定赢家"""
+        if self.showdown_scheduler is not None:
+            self.showdown_scheduler.submit(self)
+            return
+        pending = self.prepare_showdown()
+        if pending is not None:
+            self.resolve_showdown([evaluate(cards) for cards in pending.cards])
+
+    def prepare_showdown(self) -> Optional[PendingShowdown]:
+        """登记摊牌；只剩一个玩家时直接获胜并返回 None，否则返回等待评估的牌"""
         active_players = [p for p in self.players if p.is_active and not p.folded]
         if len(active_players) <= 1:
             # 只有一个玩家，直接获胜
             winner = active_players[0]
             self.award_pot([winner])
-            return
-
-        # 评估每个玩家的牌型
-        player_hands = {}
-        for player in active_players:
-            player_hands[player.name] = self.evaluate_hand(player)
+            return None
 
-        # 找出最佳牌型的玩家
-        best_players = []
-        best_hand = None
+        board = [card_to_int(card) for card in self.community_cards]
+        self.pending_showdown = PendingShowdown(
+            hand_number=self.hand_number,
+            players=active_players,
+            cards=[[card_to_int(card) for card in player.hand] + board for player in active_players]
+        )
+        return self.pending_showdown
 
-        for player in active_players:
-            hand = player_hands[player.name]
-            if not best_hand or self.compare_hands(hand, best_hand) > 0:
-                best_hand = hand
-                best_players = [player]
-            elif self.compare_hands(hand, best_hand) == 0:
-                best_players.append(player)
+    def resolve_showdown(self, codes: List[int]):
+        """用评估结果（与 pending_showdown.cards 逐行对应）结算摊牌"""
+        pending = self.pending_showdown
+        best = max(codes)
+        best_players = [player for player, code in zip(pending.players, codes) if code == best]
 
         # 记录摊牌结果
         showdown_record = {
             "type": 4,
-            "hand_number": self.hand_number,
+            "hand_number": pending.hand_number,
             "community_cards": [str(card) for card in self.community_cards],
             "players": []
         }
 
-        for player in active_players:
+        for player, code in zip(pending.players, codes):
             player_record = {
                 "player_name": player.name,
                 "hand": [str(card) for card in player.hand],
-                "hand_rank": player_hands[player.name][0].name,
+                "hand_rank": HandRank(hand_category(code)).name,
                 "is_winner": player in best_players
             }
             showdown_record["players"].append(player_record)
 
         self.game_log.append(showdown_record)
+        if self.player_stats is not None:
+            self.player_stats.record_showdown(pending.hand_number, [player.name for player in pending.players])
 
-        # 分配奖池
+        # 分配奖池；结果记录完成后才清除待结算状态
         self.award_pot(best_players)
+        self.pending_showdown = None
 
     def award_pot(self, winners: List[Player]):
         """将奖池分配给赢家（支持边池计算）"""
@@ -650,6 +729,8 @@ class PokerTable:
 
     def start_new_hand(self):
         """开始新的一手牌"""
+        if self.pending_showdown is not None:
+            raise RuntimeError(f"第 {self.pending_showdown.hand_number} 手的摊牌尚未结算，请先调用摊牌调度器的 flush()")
         # 移动庄家位置到下一个活跃玩家
         current_pos = self.dealer_position
         while True:
@@ -685,6 +766,8 @@ class PokerTable:
             "dealer": self.dealer_position,
             "small_blind": self.small_blind,
             "big_blind": self.big_blind,
+            "seed": self.seed,
+            "deck_seed": derive_hand_seed(self.seed, self.hand_number),
             "players": [player.to_dict() for player in self.players]
         }
         self.game_log.append(hand_start_record)
@@ -694,6 +777,10 @@ class PokerTable:
         with open(filename, 'w', encoding='utf-8') as f:
             json.dump(self.game_log, f, ensure_ascii=False, indent=2)
 
+    def save_hand_history(self, filename: str):
+        """以紧凑的二进制手牌历史格式保存游戏日志（见 hand_history.py）"""
+        write_hand_history(filename, self.game_log)
+
     def load_game_log(self, filename: str) -> bool:
         """从文件加载游戏日志"""
         try:
@@ -704,14 +791,25 @@ class PokerTable:
             print(f"加载游戏日志失败: {e}")
             return False
 
-    def replay_game(self):
-        """根据游戏日志重放游戏"""
-        if not self.game_log:
-            print("没有游戏日志可供重放")
-            return
+    def iter_game_log(self, filename: str) -> Iterable[Dict[str, Any]]:
+        """流式读取游戏日志文件，逐条产出记录而不整体载入内存"""
+        return iter_game_log(filename)
+
+    def replay_game(self, records: Optional[Iterable[Dict[str, Any]]] = None, interactive: bool = True):
+        """根据游戏日志重放游戏
+
+        Args:
+            records: 要重放的日志记录，可以是 iter_game_log 返回的流式迭代器；默认使用已加载的 game_log
+            interactive: 每条记录后等待回车；为 False 时一次性输出（可在无终端环境下运行）
+        """
+        if records is None:
+            records = self.game_log
+            if not records:
+                print("没有游戏日志可供重放")
+                return
 
         print("开始重放游戏...")
-        for record in self.game_log:
+        for record in records:
             # 根据事件类型处理不同的记录
             event_type = record.get('type', 0)
 
@@ -779,4 +877,5 @@ class PokerTable:
                     print(f"牌型: {player['hand_rank']}")
 
             # 暂停一下，便于观察
-            input("按Enter键继续...")
+            if interactive:
+                input("按Enter键继续...")
@@ -0,0 +1,166 @@
+# profiling.py
+# 热点路径的分阶段计时与可选的 cProfile / pyinstrument 采样，默认关闭，由 GameController 按需开启
+
+import cProfile
+import io
+import json
+import pstats
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    from pyinstrument import Profiler as InstrumentProfiler
+except ImportError:  # pyinstrument 为可选依赖，未安装时只能使用 cProfile
+    InstrumentProfiler = None
+
+# 直方图桶的上界（秒），按数量级划分，覆盖从引擎内部操作到LLM网络请求的耗时范围
+HISTOGRAM_BOUNDS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0)
+
+
+def _percentile(ordered: List[float], q: float) -> float:
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class PhaseProfiler:
+    """按阶段（发牌、构建提示词、LLM网络、解析、process_action、日志、反思等）累计墙钟耗时
+
+    Args:
+        profile_hands: 在 (起始手, 结束手) 范围内（含两端）开启函数级采样，None 表示不采样
+        backend: 采样工具，"cprofile" 或 "pyinstrument"
+    """
+
+    def __init__(self, profile_hands: Optional[Tuple[int, int]] = None, backend: str = "cprofile"):
+        if backend == "pyinstrument" and InstrumentProfiler is None:
+            raise ImportError("使用 pyinstrument 采样需要先安装: pip install pyinstrument")
+        self.profile_hands = profile_hands
+        self.backend = backend
+        self._lock = threading.Lock()
+        self._samples: Dict[str, List[float]] = {}
+        self._sampler: Any = None
+        self._sampled_hands: List[int] = []
+        self._sample_result: Any = None
+
+    def record(self, name: str, seconds: float):
+        with self._lock:
+            self._samples.setdefault(name, []).append(seconds)
+
+    # ---------- 函数级采样 ----------
+
+    def _in_range(self, hand_number: int) -> bool:
+        return self.profile_hands is not None and self.profile_hands[0] <= hand_number <= self.profile_hands[1]
+
+    def begin_hand(self, hand_number: int):
+        """一手牌开始前调用，进入采样范围时启动采样器"""
+        if not self._in_range(hand_number):
+            return
+        self._sampled_hands.append(hand_number)
+        if self._sampler is not None:
+            return
+        if self.backend == "pyinstrument":
+            self._sampler = InstrumentProfiler()
+            self._sampler.start()
+        else:
+            self._sampler = cProfile.Profile()
+            self._sampler.enable()
+
+    def end_hand(self, hand_number: int):
+        """一手牌结束后调用，到达采样范围末尾时停止采样器"""
+        if self._sampler is not None and hand_number >= self.profile_hands[1]:
+            self._stop_sampler()
+
+    def _stop_sampler(self):
+        if self.backend == "pyinstrument":
+            self._sampler.stop()
+        else:
+            self._sampler.disable()
+        self._sample_result = self._sampler
+        self._sampler = None
+
+    # ---------- 汇总输出 ----------
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        """每个阶段的次数、总耗时、分位数以及直方图"""
+        with self._lock:
+            samples = {name: sorted(values) for name, values in self._samples.items()}
+        result = {}
+        for name, ordered in samples.items():
+            buckets = [0] * (len(HISTOGRAM_BOUNDS) + 1)
+            index = 0
+            for value in ordered:
+                while index < len(HISTOGRAM_BOUNDS) and value > HISTOGRAM_BOUNDS[index]:
+                    index += 1
+                buckets[index] += 1
+            total = sum(ordered)
+            result[name] = {
+                "count": len(ordered),
+                "total_seconds": total,
+                "mean_seconds": total / len(ordered),
+                "p50_seconds": _percentile(ordered, 0.5),
+                "p90_seconds": _percentile(ordered, 0.9),
+                "p99_seconds": _percentile(ordered, 0.99),
+                "max_seconds": ordered[-1],
+                "histogram": [{"le": bound, "count": count}
+                              for bound, count in zip(list(HISTOGRAM_BOUNDS) + ["+Inf"], buckets)],
+            }
+        return result
+
+    def format_summary(self) -> str:
+        """按总耗时从高到低排列的文本报表
+
+        阶段之间可以嵌套（如 decision 包含 prompt_build/llm_network/parse），占比以整场 tournament 耗时为分母。
+        """
+        summary = self.summary()
+        if "tournament" in summary:
+            grand_total = summary["tournament"]["total_seconds"] or 1.0
+        else:
+            grand_total = sum(item["total_seconds"] for item in summary.values()) or 1.0
+        lines = [f"{'阶段':<16}{'次数':>8}{'总耗时(s)':>12}{'占比':>8}{'p50(ms)':>10}{'p99(ms)':>10}"]
+        for name, item in sorted(summary.items(), key=lambda kv: kv[1]["total_seconds"], reverse=True):
+            lines.append(f"{name:<16}{item['count']:>8}{item['total_seconds']:>12.3f}"
+                         f"{item['total_seconds'] / grand_total:>8.1%}{item['p50_seconds'] * 1000:>10.2f}"
+                         f"{item['p99_seconds'] * 1000:>10.2f}")
+        return "\n".join(lines)
+
+    def write_report(self, filename: str) -> List[str]:
+        """写出阶段耗时报告（JSON）以及采样结果，返回写出的文件列表"""
+        if self._sampler is not None:
+            self._stop_sampler()
+        written = [filename]
+        report = {"phases": self.summary(), "profiled_hands": self._sampled_hands}
+        base = filename[:-5] if filename.endswith(".json") else filename
+
+        if self._sample_result is not None and self.backend == "pyinstrument":
+            html_file = f"{base}.html"
+            with open(html_file, 'w', encoding='utf-8') as f:
+                f.write(self._sample_result.output_html())
+            written.append(html_file)
+        elif self._sample_result is not None:
+            prof_file = f"{base}.prof"
+            self._sample_result.dump_stats(prof_file)
+            written.append(prof_file)
+            stream = io.StringIO()
+            pstats.Stats(self._sample_result, stream=stream).sort_stats("cumulative").print_stats(30)
+            report["top_functions"] = stream.getvalue()
+
+        with open(filename, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        return written
+
+
+@contextmanager
+def phase(profiler: Optional[PhaseProfiler], name: str, timings: Optional[Dict[str, float]] = None):
+    """统计 with 块的耗时：计入分析器（未开启时为 None，调用方无需判断），并可累加到 timings 字典"""
+    if profiler is None and timings is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        if timings is not None:
+            timings[name] = timings.get(name, 0.0) + elapsed
+        if profiler is not None:
+            profiler.record(name, elapsed)
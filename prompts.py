@@ -1,5 +1,79 @@
 # prompts.py
-# 存储德州扑克AI玩家的提示语模板
+# 存储德州扑克AI玩家的提示语模板，以及按缓存友好顺序组装决策提示词的 PromptLayout
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Union
+
+DECISION_SYSTEM_PROMPT_PATH = "prompt/decision_system_prompt.txt"
+DECISION_MEMORY_PROMPT_PATH = "prompt/decision_memory_prompt.txt"
+DECISION_STATE_PROMPT_PATH = "prompt/decision_state_prompt.txt"
+DECISION_DELTA_PROMPT_PATH = "prompt/decision_delta_prompt.txt"
+
+# Anthropic 的缓存断点；低于模型最小可缓存长度的前缀不会被缓存，但不影响请求
+CACHE_CONTROL = {"type": "ephemeral"}
+
+
+@dataclass
+class PromptLayout:
+    """按变化频率从低到高排列的提示词
+
+    system 为所有决策共用的静态指令，memory 为只在反思后才变化的对手印象，state 为每次决策的局面。
+    固定的部分始终在前，服务端的前缀缓存（OpenAI 自动前缀缓存、Anthropic cache_control）才能命中。
+    多轮会话模式下 history 为本手之前的对话轮次（第一条 user 消息已包含对手印象），state 只是增量局面。
+    """
+    system: str
+    memory: str
+    state: str
+    history: List[Dict[str, Any]] = field(default_factory=list)
+    cache_state: bool = False  # 多轮会话中本次消息会成为下一轮的前缀，在其末尾也放一个缓存断点
+
+    def user_parts(self) -> List[str]:
+        return [part for part in (self.memory, self.state) if part]
+
+    def user_message(self) -> str:
+        """本次请求新增的 user 消息"""
+        return "\n\n".join(self.user_parts())
+
+    def user_turn(self) -> Dict[str, Any]:
+        """作为历史轮次保存的本次 user 消息（parts 保留分块，Anthropic 重发时内容块与原请求一致才能命中缓存）"""
+        return {"role": "user", "content": self.user_message(), "parts": self.user_parts()}
+
+    def text(self) -> str:
+        """拼接后的完整文本（用于日志与不区分消息角色的调用方）"""
+        parts = [self.system] + [turn["content"] for turn in self.history] + self.user_parts()
+        return "\n\n".join(part for part in parts if part)
+
+    def openai_messages(self) -> List[Dict[str, Any]]:
+        """system 消息 + 历史轮次 + 本次 user 消息，保证相邻两次请求的公共前缀尽量长"""
+        history = [{"role": turn["role"], "content": turn["content"]} for turn in self.history]
+        return [{"role": "system", "content": self.system}, *history,
+                {"role": "user", "content": self.user_message()}]
+
+    def anthropic_request(self) -> Dict[str, Any]:
+        """返回 messages.create 的 system 与 messages 参数
+
+        在 system 与 memory 之后各放一个缓存断点；cache_state 时在本次消息末尾再放一个，
+        下一轮请求会从这里向前查找并命中之前的全部对话。
+        """
+        messages = [{"role": turn["role"],
+                     "content": [{"type": "text", "text": part} for part in turn.get("parts", [turn["content"]])]}
+                    for turn in self.history]
+        content = []
+        if self.memory:
+            content.append({"type": "text", "text": self.memory, "cache_control": CACHE_CONTROL})
+        content.append({"type": "text", "text": self.state})
+        if self.cache_state:
+            content[-1]["cache_control"] = CACHE_CONTROL
+        messages.append({"role": "user", "content": content})
+        return {
+            "system": [{"type": "text", "text": self.system, "cache_control": CACHE_CONTROL}],
+            "messages": messages,
+        }
+
+
+def prompt_text(prompt: Union[str, PromptLayout]) -> str:
+    return prompt.text() if isinstance(prompt, PromptLayout) else prompt
+
 
 def get_decision_prompt(hand, community_cards, pot, current_bet, player_bet, player_chips, 
                        min_raise, stage, players_info, position, dealer_position, action_history):
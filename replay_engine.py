@@ -0,0 +1,291 @@
+# replay_engine.py
+# 无交互的快速回放引擎：从旧版游戏日志重建任意 (手牌, 步骤) 处的牌桌状态，支持跳转、筛选与批量导出
+
+import json
+import os
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, field, replace
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from hand_history import HandHistoryReader, record_hand_number
+from log_reader import iter_game_log
+
+# 最近访问过的手牌记录缓存数量（反复跳转同一段牌局时不必重新读取）
+HAND_CACHE_SIZE = 64
+
+
+@dataclass
+class PlayerState:
+    """回放中的玩家状态"""
+    name: str
+    chips: int
+    hand: List[str] = field(default_factory=list)
+    bet_in_round: int = 0
+    total_bet: int = 0
+    folded: bool = False
+    all_in: bool = False
+    is_active: bool = True
+    hand_rank: str = ""  # 摊牌后才有
+
+
+@dataclass
+class TableState:
+    """回放中的牌桌状态"""
+    hand_number: int = 0
+    dealer: int = 0
+    small_blind: int = 0
+    big_blind: int = 0
+    stage: str = "preflop"
+    community_cards: List[str] = field(default_factory=list)
+    pot: int = 0  # 结算后保留本手的最终底池
+    current_bet: int = 0
+    players: List[PlayerState] = field(default_factory=list)
+    last_action: Optional[Dict[str, Any]] = None
+    winners: List[Dict[str, Any]] = field(default_factory=list)
+
+    def player(self, name: str) -> Optional[PlayerState]:
+        return next((p for p in self.players if p.name == name), None)
+
+    def copy(self) -> "TableState":
+        return replace(
+            self,
+            community_cards=list(self.community_cards),
+            players=[replace(p, hand=list(p.hand)) for p in self.players],
+            winners=list(self.winners),
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+@dataclass
+class ReplayStep:
+    """回放中的一步：第 index 条记录应用后的状态"""
+    hand_number: int
+    index: int
+    record: Dict[str, Any]
+    state: TableState
+
+
+def order_hand_records(records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """把开局记录移到最前面（日志中盲注行动写在开局记录之前），作为这一手的第 0 步"""
+    for i, record in enumerate(records):
+        if record.get("type") == 1:
+            return [record] + records[:i] + records[i + 1:]
+    return list(records)
+
+
+def initial_state(hand_start: Dict[str, Any], blinds: Iterable[Dict[str, Any]] = ()) -> TableState:
+    """根据开局记录建立这一手的起始状态
+
+    开局记录中的玩家信息是下完盲注之后的快照，这里扣除盲注还原到下盲注之前，之后按顺序应用盲注记录即可得到快照本身。
+    """
+    state = TableState(
+        hand_number=hand_start["hand_number"],
+        dealer=hand_start["dealer"],
+        small_blind=hand_start["small_blind"],
+        big_blind=hand_start["big_blind"],
+        players=[PlayerState(
+            name=p["name"], chips=p["chips"], hand=list(p["hand"]), bet_in_round=p["bet_in_round"],
+            total_bet=p["total_bet"], folded=p["folded"], all_in=p["all_in"], is_active=p["is_active"]
+        ) for p in hand_start["players"]],
+    )
+    for blind in blinds:
+        player = state.player(blind["player_name"])
+        if player is not None:
+            player.chips += blind["amount"]
+            player.bet_in_round -= blind["amount"]
+            player.total_bet -= blind["amount"]
+            player.all_in = False
+    return state
+
+
+def apply_record(state: TableState, record: Dict[str, Any]):
+    """把一条日志记录应用到状态上（原地修改）"""
+    record_type = record.get("type")
+    if record_type == 3:
+        player = state.player(record["player_name"])
+        if player is not None:
+            amount = record["amount"]
+            player.chips = record["player_chips"]
+            player.bet_in_round += amount
+            player.total_bet += amount
+            if record["action"] == "fold":
+                player.folded = True
+            elif player.chips == 0:
+                player.all_in = True
+            state.current_bet = max(state.current_bet, player.bet_in_round)
+        state.pot = record["pot"]
+        state.stage = record["stage"]
+        state.last_action = record
+    elif record_type == 2:
+        state.stage = record["stage"]
+        state.community_cards = list(record["community_cards"])
+        state.current_bet = 0
+        for player in state.players:
+            player.bet_in_round = 0
+    elif record_type == 4:
+        state.stage = "showdown"
+        state.community_cards = list(record["community_cards"])
+        for item in record["players"]:
+            player = state.player(item["player_name"])
+            if player is not None:
+                player.hand = list(item["hand"])
+                player.hand_rank = item["hand_rank"]
+    elif record_type == 5:
+        for winner in record["winners"]:
+            player = state.player(winner["player_name"])
+            if player is not None:
+                player.chips += winner["amount"]
+        # 没有赢家的边池退还给有资格参与的玩家，余数给第一个玩家
+        for side_pot in record.get("side_pots", []):
+            if not side_pot.get("refunded"):
+                continue
+            eligible = [state.player(name) for name in side_pot["eligible_players"]]
+            eligible = [p for p in eligible if p is not None]
+            for player in eligible:
+                player.chips += side_pot["award_per_winner"]
+            if eligible:
+                eligible[0].chips += side_pot["pot_amount"] - side_pot["award_per_winner"] * len(eligible)
+        state.pot = record["pot"]
+        state.winners = list(record["winners"])
+
+
+class ReplayEngine:
+    """回放引擎
+
+    每手的开局记录包含全部玩家的筹码与手牌，相当于一个完整的状态快照，因此跳转到 (手牌, 步骤) 只需从该手的
+    开局快照开始应用不超过一手的记录。二进制手牌历史（.pkh）按索引只读取目标手牌；JSON 日志在打开时按手分组。
+
+    Args:
+        source: HandHistoryReader，或按顺序排列的日志记录
+    """
+
+    def __init__(self, source: Any):
+        self._reader: Optional[HandHistoryReader] = None
+        self._hands: Dict[int, List[Dict[str, Any]]] = {}
+        self._cache: "OrderedDict[int, List[Dict[str, Any]]]" = OrderedDict()
+        if isinstance(source, HandHistoryReader):
+            self._reader = source
+            self._numbers = [n for n in source.hand_numbers() if n]
+        else:
+            current = 0
+            for record in source:
+                current = record_hand_number(record, current)
+                self._hands.setdefault(current, []).append(record)
+            self._numbers = [n for n in self._hands if n]
+
+    @classmethod
+    def open(cls, filename: str) -> "ReplayEngine":
+        """打开 poker_game_*.pkh 或 poker_game_*.json"""
+        if filename.endswith(".pkh"):
+            return cls(HandHistoryReader(filename))
+        return cls(iter_game_log(filename))
+
+    @classmethod
+    def open_game(cls, log_dir: str, game_id: str) -> "ReplayEngine":
+        """按游戏ID打开日志，优先使用二进制手牌历史"""
+        base = os.path.join(log_dir, f"poker_game_{game_id}")
+        return cls.open(f"{base}.pkh" if os.path.exists(f"{base}.pkh") else f"{base}.json")
+
+    def hand_numbers(self) -> List[int]:
+        return list(self._numbers)
+
+    def hand_records(self, hand_number: int) -> List[Dict[str, Any]]:
+        """一手牌按回放顺序排列的记录（第 0 条为开局记录）"""
+        records = self._cache.get(hand_number)
+        if records is not None:
+            self._cache.move_to_end(hand_number)
+            return records
+        if self._reader is not None:
+            raw = self._reader.read_hand(hand_number)
+        elif hand_number in self._hands:
+            raw = self._hands[hand_number]
+        else:
+            raise KeyError(f"日志中没有第 {hand_number} 手")
+        records = order_hand_records(raw)
+        self._cache[hand_number] = records
+        if len(self._cache) > HAND_CACHE_SIZE:
+            self._cache.popitem(last=False)
+        return records
+
+    def _start(self, records: List[Dict[str, Any]]) -> TableState:
+        if not records or records[0].get("type") != 1:
+            raise ValueError("这一手缺少开局记录，无法重建状态")
+        blinds = [r for r in records[1:] if r.get("type") == 3 and r.get("action") in ("small-blind", "big-blind")]
+        return initial_state(records[0], blinds)
+
+    def state_at(self, hand_number: int, step: Optional[int] = None) -> TableState:
+        """第 hand_number 手应用完第 step 条记录后的状态；step 为 None 表示这一手结束时"""
+        records = self.hand_records(hand_number)
+        state = self._start(records)
+        end = len(records) if step is None else min(step + 1, len(records))
+        for record in records[1:end]:
+            apply_record(state, record)
+        return state
+
+    def iter_steps(self, hands: Optional[Iterable[int]] = None) -> Iterator[ReplayStep]:
+        """逐步回放；每一步的 state 是同一个被原地修改的对象，需要保存时请调用 state.copy()"""
+        for hand_number in (self._numbers if hands is None else hands):
+            records = self.hand_records(hand_number)
+            state = self._start(records)
+            yield ReplayStep(hand_number, 0, records[0], state)
+            for index in range(1, len(records)):
+                apply_record(state, records[index])
+                yield ReplayStep(hand_number, index, records[index], state)
+
+    def filter(self, player: Optional[str] = None, stage: Optional[str] = None,
+               action: Optional[str] = None, min_pot: Optional[int] = None, max_pot: Optional[int] = None,
+               hands: Optional[Iterable[int]] = None) -> Iterator[ReplayStep]:
+        """筛选回放步骤，产出的状态为独立副本
+
+        Args:
+            player: 只保留该玩家的行动
+            stage: 只保留该阶段（preflop/flop/turn/river/showdown）
+            action: 只保留该行动（fold/check/call/raise/all-in 等）
+            min_pot: 底池不小于该值
+            max_pot: 底池不大于该值
+            hands: 只回放这些手牌
+        """
+        for step in self.iter_steps(hands):
+            record = step.record
+            state = step.state
+            if player is not None and record.get("player_name") != player:
+                continue
+            if action is not None and record.get("action") != action:
+                continue
+            if stage is not None and state.stage != stage:
+                continue
+            if min_pot is not None and state.pot < min_pot:
+                continue
+            if max_pot is not None and state.pot > max_pot:
+                continue
+            yield ReplayStep(step.hand_number, step.index, record, state.copy())
+
+    def export(self, filename: str, steps: Optional[Iterable[ReplayStep]] = None) -> int:
+        """把回放步骤（默认全部）以 JSON Lines 格式批量导出，返回导出的条数"""
+        count = 0
+        with open(filename, 'w', encoding='utf-8') as f:
+            for step in (self.iter_steps() if steps is None else steps):
+                f.write(json.dumps({"hand_number": step.hand_number, "index": step.index, "record": step.record,
+                                    "state": step.state.to_dict()}, ensure_ascii=False))
+                f.write("\n")
+                count += 1
+        return count
+
+
+def format_state(state: TableState) -> str:
+    """牌桌状态的文本描述"""
+    lines = [f"第 {state.hand_number} 手 | 阶段: {state.stage} | 底池: {state.pot} | 当前注: {state.current_bet}",
+             f"公共牌: {', '.join(state.community_cards) or '无'}"]
+    for player in state.players:
+        status = "(已弃牌)" if player.folded else "(全押)" if player.all_in else "" if player.is_active else "(出局)"
+        rank = f" {player.hand_rank}" if player.hand_rank else ""
+        lines.append(f"  {player.name} {status}: 筹码 {player.chips}, 本轮 {player.bet_in_round}, "
+                     f"本手 {player.total_bet}, 手牌 {', '.join(player.hand)}{rank}")
+    if state.last_action:
+        action = state.last_action
+        lines.append(f"最近行动: {action['player_name']} {action['action']} {action['amount']}")
+    if state.winners:
+        lines.append("赢家: " + ", ".join(f"{w['player_name']} +{w['amount']}" for w in state.winners))
+    return "\n".join(lines)
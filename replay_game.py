@@ -1,9 +1,47 @@
+import argparse
+
 from game_controller import GameController
+from replay_engine import ReplayEngine, format_state
 
 
 def main():
-    gc = GameController()
-    gc.replay_game("f99e53c9")
+    parser = argparse.ArgumentParser(description="游戏回放工具")
+    parser.add_argument("game_id", nargs="?", default="f99e53c9")
+    parser.add_argument("--log-dir", default="game_logs")
+    parser.add_argument("--hand", type=int, help="只回放指定的一手")
+    parser.add_argument("--step", type=int, help="与 --hand 一起使用，输出该手第 step 步之后的牌桌状态")
+    parser.add_argument("--player", help="只列出该玩家的行动")
+    parser.add_argument("--stage", help="只列出该阶段的记录")
+    parser.add_argument("--action", help="只列出该行动")
+    parser.add_argument("--min-pot", type=int, help="只列出底池不小于该值的记录")
+    parser.add_argument("--export", help="把（筛选后的）回放步骤导出为 JSON Lines 文件")
+    parser.add_argument("--no-pause", action="store_true", help="逐条输出时不等待回车")
+    args = parser.parse_args()
+
+    filtering = any(value is not None for value in (args.player, args.stage, args.action, args.min_pot))
+    if args.step is None and not filtering and not args.export:
+        gc = GameController()
+        gc.log_dir = args.log_dir
+        gc.replay_game(args.game_id, hand_number=args.hand, interactive=not args.no_pause)
+        return
+
+    engine = ReplayEngine.open_game(args.log_dir, args.game_id)
+    if args.step is not None:
+        if args.hand is None:
+            parser.error("--step 需要与 --hand 一起使用")
+        print(format_state(engine.state_at(args.hand, args.step)))
+        return
+
+    hands = [args.hand] if args.hand is not None else None
+    steps = engine.filter(player=args.player, stage=args.stage, action=args.action, min_pot=args.min_pot,
+                          hands=hands)
+    if args.export:
+        count = engine.export(args.export, steps)
+        print(f"已导出 {count} 步到: {args.export}")
+        return
+    for step in steps:
+        print(f"\n--- 第 {step.hand_number} 手 第 {step.index} 步 ---")
+        print(format_state(step.state))
 
 
 if __name__ == '__main__':
@@ -0,0 +1,171 @@
+# sequential_stats.py
+# 对局过程中的序贯统计：逐手更新各玩家 bb/100 及置信区间，并用序贯概率比检验（SPRT）判断两两排名是否已确定
+
+import math
+from itertools import combinations
+from statistics import NormalDist
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class RunningStats:
+    """Welford 在线均值/方差"""
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+
+    def add(self, value: float):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+
+    @property
+    def variance(self) -> float:
+        return self._m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def total(self) -> float:
+        return self.mean * self.count
+
+
+class PairwiseSPRT:
+    """两名玩家每手盈亏差（单位：大盲）的序贯检验
+
+    检验 H0: 均值 = -delta 与 H1: 均值 = +delta（delta 为可区分的最小效应），方差用样本方差代替。
+    对数似然比越过上界判定 a 更强，越过下界判定 b 更强。
+    """
+
+    def __init__(self, a: str, b: str, delta: float, alpha: float, beta: float):
+        self.a = a
+        self.b = b
+        self.delta = delta
+        self.upper = math.log((1 - beta) / alpha)
+        self.lower = math.log(beta / (1 - alpha))
+        self.diffs = RunningStats()
+        self.winner: Optional[str] = None
+        self.decided_at: Optional[int] = None
+
+    def update(self, diff: float, min_hands: int):
+        self.diffs.add(diff)
+        if self.winner is not None or self.diffs.count < min_hands:
+            return
+        llr = self.llr()
+        if llr >= self.upper:
+            self.winner, self.decided_at = self.a, self.diffs.count
+        elif llr <= self.lower:
+            self.winner, self.decided_at = self.b, self.diffs.count
+
+    def llr(self) -> float:
+        variance = self.diffs.variance
+        if variance <= 0:
+            return 0.0
+        return 2 * self.delta * self.diffs.total / variance
+
+
+class SequentialComparator:
+    """逐手跟踪玩家盈亏，判断指定玩家之间的排名是否已在统计上确定
+
+    Args:
+        big_blind: 大盲注，用于换算 bb/100
+        players: 需要比较的玩家名，None 表示比较所有出现过的玩家
+        min_effect_bb100: 认为有意义的最小胜率差（bb/100），越小需要的手数越多
+        alpha: 误判 a 更强的概率上限
+        beta: 误判 b 更强的概率上限
+        confidence: 置信区间的置信水平
+        min_hands: 至少经过多少手才允许下结论（避免方差估计过早不稳定）
+    """
+
+    def __init__(self, big_blind: int, players: Optional[List[str]] = None, min_effect_bb100: float = 10.0,
+                 alpha: float = 0.05, beta: float = 0.05, confidence: float = 0.95, min_hands: int = 30):
+        self.big_blind = big_blind
+        self.players = list(players) if players else None
+        self.delta = min_effect_bb100 / 100.0
+        self.alpha = alpha
+        self.beta = beta
+        self.z = NormalDist().inv_cdf(0.5 + confidence / 2)
+        self.confidence = confidence
+        self.min_hands = min_hands
+        self.hands = 0
+        self.stats: Dict[str, RunningStats] = {}
+        self.tests: Dict[Tuple[str, str], PairwiseSPRT] = {}
+
+    def _tracked(self, names) -> List[str]:
+        return [name for name in names if self.players is None or name in self.players]
+
+    def update(self, chip_deltas: Dict[str, int]):
+        """加入一手牌的结果；chip_deltas 只应包含这手开始时仍在桌上的玩家"""
+        self.hands += 1
+        results = {name: delta / self.big_blind for name, delta in chip_deltas.items()}
+        tracked = self._tracked(results)
+        for name in tracked:
+            self.stats.setdefault(name, RunningStats()).add(results[name])
+        for a, b in combinations(sorted(tracked), 2):
+            test = self.tests.get((a, b))
+            if test is None:
+                test = self.tests[(a, b)] = PairwiseSPRT(a, b, self.delta, self.alpha, self.beta)
+            test.update(results[a] - results[b], self.min_hands)
+
+    def eliminate(self, name: str):
+        """玩家输光筹码出局：与其相关的未决比较直接判对方胜出"""
+        for test in self.tests.values():
+            if test.winner is None and name in (test.a, test.b):
+                test.winner = test.b if name == test.a else test.a
+                test.decided_at = test.diffs.count
+
+    def interval(self, name: str) -> Tuple[float, float, float]:
+        """返回 (bb/100, 下界, 上界)"""
+        stats = self.stats.get(name)
+        if stats is None or stats.count == 0:
+            return 0.0, float("-inf"), float("inf")
+        mean = stats.mean * 100
+        if stats.count < 2:
+            return mean, float("-inf"), float("inf")
+        half = self.z * math.sqrt(stats.variance / stats.count) * 100
+        return mean, mean - half, mean + half
+
+    def is_settled(self) -> bool:
+        """所有需要比较的玩家两两之间都已得出结论"""
+        names = self.players or list(self.stats)
+        if len(names) < 2:
+            return False
+        for a, b in combinations(sorted(names), 2):
+            test = self.tests.get((a, b))
+            if test is None or test.winner is None:
+                return False
+        return True
+
+    def ranking(self) -> List[str]:
+        """按已判定的两两胜负次数排序，平局时按 bb/100 排序"""
+        wins = {name: 0 for name in self.stats}
+        for test in self.tests.values():
+            if test.winner:
+                wins[test.winner] += 1
+        return sorted(wins, key=lambda name: (wins[name], self.interval(name)[0]), reverse=True)
+
+    def report(self) -> Dict[str, Any]:
+        players = {}
+        for name in self.ranking():
+            mean, low, high = self.interval(name)
+            players[name] = {"hands": self.stats[name].count, "bb_per_100": mean,
+                             "ci_low": low, "ci_high": high}
+        return {
+            "hands": self.hands,
+            "settled": self.is_settled(),
+            "confidence": self.confidence,
+            "min_effect_bb100": self.delta * 100,
+            "players": players,
+            "pairs": [{"a": t.a, "b": t.b, "hands": t.diffs.count, "llr": t.llr(),
+                       "winner": t.winner, "decided_at": t.decided_at} for t in self.tests.values()],
+        }
+
+    def format_report(self) -> str:
+        lines = []
+        for name, item in self.report()["players"].items():
+            lines.append(f"{name}: {item['bb_per_100']:+.1f} bb/100 "
+                         f"({self.confidence:.0%} CI {item['ci_low']:+.1f} ~ {item['ci_high']:+.1f}, {item['hands']} 手)")
+        for test in self.tests.values():
+            verdict = f"{test.winner} 更强 (第 {test.decided_at} 手判定)" if test.winner else "尚未确定"
+            lines.append(f"{test.a} vs {test.b}: {verdict}")
+        return "\n".join(lines)
@@ -0,0 +1,98 @@
+# showdown_scheduler.py
+# 跨牌桌的摊牌调度：同时推进大量牌桌（自我对弈模拟）时，先登记各桌的摊牌，再一次性批量评估并结算
+
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from hand_evaluator import evaluate_batch
+from poker_engine import PendingShowdown, PokerTable
+
+
+class ShowdownScheduler:
+    """收集多张牌桌的待评估摊牌，攒够 batch_size 名玩家（或调用 flush）时合并为一次 evaluate_batch
+
+    用法：给每张牌桌设置 table.showdown_scheduler = scheduler，之后牌桌摊牌时只登记、暂不结算；
+    驱动方在这些牌桌开始下一手之前调用 flush()（未结算的牌桌调用 start_new_hand 会报错）。
+    GameController(showdown_scheduler=...) 摊牌后调用 wait(table)，只等待本桌的结果：多个控制器在各自线程中
+    共用同一个调度器时，摊牌会在调度器中积累，直到待评估玩家数达到 batch_size 或最早的登记已等待 max_wait 秒，
+    才由当时到达阈值的线程合并结算。登记、结算与等待都在锁内进行。
+
+    Args:
+        batch_size: 待评估玩家数达到该值时自动结算，0 表示只在 flush() 或等待超时时结算；
+            为 1 时每次摊牌立即结算，与不设置调度器的结果完全相同
+        max_wait: wait() 最多等待其他牌桌登记摊牌的秒数，0 表示不等待、立即结算已登记的摊牌
+            （单个控制器时不会产生批量，多牌桌并行时设为几毫秒即可攒出批次）
+    """
+
+    def __init__(self, batch_size: int = 0, max_wait: float = 0.0):
+        self.batch_size = batch_size
+        self.max_wait = max_wait
+        self._cond = threading.Condition(threading.RLock())
+        self._pending: List[PokerTable] = []
+        self._rows = 0
+        self._oldest: Optional[float] = None  # 当前批次中最早一次登记的时间
+        self.showdowns = 0
+        self.batches = 0
+        self.evaluations = 0
+
+    def submit(self, table: PokerTable):
+        """登记一张牌桌的摊牌；只剩一个玩家时牌桌直接结算，不进入批次"""
+        with self._cond:
+            pending = table.prepare_showdown()
+            if pending is None:
+                return
+            if not self._pending:
+                self._oldest = time.monotonic()
+            self._pending.append(table)
+            self._rows += len(pending.cards)
+            if self.batch_size and self._rows >= self.batch_size:
+                self.flush()
+
+    @property
+    def pending(self) -> int:
+        """尚未结算的牌桌数"""
+        return len(self._pending)
+
+    def _is_pending(self, table: PokerTable) -> bool:
+        return any(t is table for t in self._pending)
+
+    def wait(self, table: PokerTable):
+        """等待该牌桌的摊牌结算完成；批次到达 max_wait 时限仍未结算时由本线程结算整批"""
+        with self._cond:
+            while self._is_pending(table):
+                remaining = self._oldest + self.max_wait - time.monotonic()
+                if remaining <= 0:
+                    self.flush()
+                else:
+                    self._cond.wait(remaining)
+
+    def flush(self) -> int:
+        """批量评估并结算所有已登记的摊牌，返回结算的牌桌数"""
+        with self._cond:
+            if not self._pending:
+                return 0
+            tables, self._pending = self._pending, []
+            self._rows = 0
+            self._oldest = None
+            showdowns: List[PendingShowdown] = [table.pending_showdown for table in tables]
+            codes = evaluate_batch([cards for showdown in showdowns for cards in showdown.cards])
+            start = 0
+            for table, showdown in zip(tables, showdowns):
+                end = start + len(showdown.cards)
+                table.resolve_showdown(codes[start:end])
+                start = end
+            self.showdowns += len(tables)
+            self.batches += 1
+            self.evaluations += len(codes)
+            self._cond.notify_all()
+            return len(tables)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                "showdowns": self.showdowns,
+                "batches": self.batches,
+                "evaluations": self.evaluations,
+                "pending": len(self._pending),
+            }